@@ -6,4 +6,11 @@ cd /app/models/db_schemes/minirag/
 alembic upgrade head
 cd /app
 
+# embedded vector store shared by the uvicorn workers : one broker process owns it (restarted if it dies)
+# (the env file values may keep their quotes)
+if [ "${VECTOR_DB_BACKEND//\"/}" = "BROKER" ]; then
+    echo "Starting the vector db broker..."
+    (while true; do python -m stores.vectordb.VectorDBBroker; sleep 1; done) &
+fi
+
 exec "$@"
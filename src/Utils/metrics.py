@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram , generate_latest , CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Histogram , Gauge , generate_latest , CONTENT_TYPE_LATEST
 from fastapi import FastAPI, Request , Response
 from starlette.middleware.base import BaseHTTPMiddleware
 import time
@@ -6,6 +6,23 @@ import time
 # define metrics 
 REQUEST_COUNT = Counter('request_count', 'Total number of requests', ['method', 'endpoint','status'])
 REQUEST_LATENCY = Histogram('request_latency_seconds', 'Latency of requests in seconds', ['method', 'endpoint'])
+# time spent parsing one file inside the parse pool (without the time waiting for a free process)
+FILE_PARSE_LATENCY = Histogram('file_parse_seconds', 'Time spent parsing a file in seconds', ['file_type'],
+                               buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+# /index/push pipeline : chunks handled by every stage (fetch / embed / insert) , time per batch and queues filling
+INDEXING_STAGE_CHUNKS = Counter('indexing_pipeline_chunks_total', 'Chunks handled by an indexing pipeline stage', ['stage'])
+INDEXING_STAGE_LATENCY = Histogram('indexing_pipeline_batch_seconds', 'Time spent on one batch by an indexing pipeline stage in seconds', ['stage'])
+INDEXING_QUEUE_DEPTH = Gauge('indexing_pipeline_queue_depth', 'Batches waiting between two indexing pipeline stages', ['queue'])
+# embedding cache (models/EmbeddingCacheModel.py) : texts served from the cache / sent to the provider
+EMBEDDING_CACHE_HITS = Counter('embedding_cache_hits_total', 'Texts whose embedding was found in the cache', ['backend', 'model'])
+EMBEDDING_CACHE_MISSES = Counter('embedding_cache_misses_total', 'Texts embedded by the provider after a cache miss', ['backend', 'model'])
+# rate governor of every provider model (stores/llm/RateGovernor.py) : adaptive concurrency , waits , retries and circuit breaker
+LLM_GOVERNOR_CONCURRENCY_LIMIT = Gauge('llm_governor_concurrency_limit', 'Requests allowed in flight by the rate governor', ['backend', 'model'])
+LLM_GOVERNOR_IN_FLIGHT = Gauge('llm_governor_in_flight', 'Requests in flight through the rate governor', ['backend', 'model'])
+LLM_GOVERNOR_WAIT = Histogram('llm_governor_wait_seconds', 'Time a request waited for the rate windows and a free slot in seconds', ['backend', 'model'])
+LLM_GOVERNOR_RETRIES = Counter('llm_governor_retries_total', 'Requests retried by the rate governor', ['backend', 'model', 'reason'])
+LLM_GOVERNOR_REJECTED = Counter('llm_governor_rejected_total', 'Requests rejected while the circuit was open', ['backend', 'model'])
+LLM_GOVERNOR_CIRCUIT_STATE = Gauge('llm_governor_circuit_state', 'Circuit breaker state (0 closed , 1 half open , 2 open)', ['backend', 'model'])
 
 class PrometheusMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -0,0 +1,80 @@
+# Chunk insertion benchmark , needs the postgres database configured in .env , run it from src/ :
+#   python -m benchmarks.chunk_insert_benchmark --rows 100000 --batch-size 1000
+#
+# compares the ORM path (session.add_all of DataChunk objects) with the bulk paths of ChunkModel:
+# multi-row INSERT ... RETURNING chunk_id and COPY (copy_records_to_table).
+# the rows are written under a temporary asset and removed at the end.
+
+from helpers.config import get_settings
+from models.ChunkModel import ChunkModel
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.db_schemes import DataChunk , Asset
+from models.enums.AssetTypeEnum import AssetTypeEnum
+from sqlalchemy.ext.asyncio import create_async_engine , AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import delete
+import argparse
+import asyncio
+import time
+
+def make_rows(count: int , project_id: int , asset_id: int):
+    return [
+        {
+            "chunk_text": f"benchmark chunk {i} " * 20,
+            "chunk_metadata": {"start_offset": i * 400, "end_offset": i * 400 + 400},
+            "chunk_order": i + 1,
+            "chunk_project_id": project_id,
+            "chunk_asset_id": asset_id,
+        }
+        for i in range(count)
+    ]
+
+async def run(name , insert_batch , rows , batch_size: int):
+    start_time = time.perf_counter()
+    for i in range(0 , len(rows) , batch_size):
+        await insert_batch(rows[i:i+batch_size])
+    elapsed = time.perf_counter() - start_time
+    print(f"{name:<16} {len(rows):>10} rows {elapsed:>8.2f}s {len(rows) / elapsed:>12.0f} rows/s")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Chunk insertion benchmark")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--project-id", type=int, default=999999)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    postgres_conn = f"postgresql+asyncpg://{settings.POSTGRES_USERNAME}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_MAIN_DATABASE}"
+    db_engine = create_async_engine(postgres_conn)
+    db_client = sessionmaker(db_engine , class_=AsyncSession , expire_on_commit=False)
+
+    project_model = await ProjectModel.create_instance(db_client=db_client)
+    project = await project_model.get_project_or_create_one(project_id=args.project_id)
+    asset_model = await AssetModel.create_instance(db_client=db_client)
+    asset = await asset_model.create_asset(asset=Asset(
+        asset_project_id=project.project_id,
+        asset_type=AssetTypeEnum.FILE.value,
+        asset_name="chunk_insert_benchmark",
+        asset_size=0
+    ))
+    chunk_model = await ChunkModel.create_instance(db_client=db_client)
+    rows = make_rows(count=args.rows , project_id=project.project_id , asset_id=asset.asset_id)
+
+    async def orm_insert(batch):
+        await chunk_model.insert_multiple_chunks([DataChunk(**row) for row in batch])
+
+    try:
+        await run("orm add_all", orm_insert, rows, args.batch_size)
+        await run("insert returning", chunk_model.insert_chunk_rows, rows, args.batch_size)
+        await run("copy", chunk_model.copy_chunk_rows, rows, args.batch_size)
+    finally:
+        async with db_client() as session:
+            async with session.begin():
+                await session.execute(delete(DataChunk).where(DataChunk.chunk_asset_id == asset.asset_id))
+                await session.execute(delete(Asset).where(Asset.asset_id == asset.asset_id))
+            await session.commit()
+        await db_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
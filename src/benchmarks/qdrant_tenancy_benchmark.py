@@ -0,0 +1,114 @@
+# Qdrant layouts benchmark , run it from src/ :
+#   python -m benchmarks.qdrant_tenancy_benchmark --projects 10000 --points 20 --dimension 384
+#   python -m benchmarks.qdrant_tenancy_benchmark --url http://localhost:6333
+#
+# "collections" is one collection per project (collection_{size}_{project_id}) , "tenants" is the multi tenant
+# layout of QdrantDBProvider (VECTOR_DB_QDRANT_MULTI_TENANT) : one shared collection with a project_id tenant index.
+# each layout runs in its own process , on a temporary embedded storage or on the --url server.
+# embedded : the memory is the peak resident size of that process and the disk is the size of the storage
+# (the embedded storage scans instead of using hnsw , its latencies are not those of a server).
+# server : only the latencies are measured here , read the memory of the qdrant container next to it.
+
+from stores.vectordb.providers.QdrantDBProvider import QdrantDBProvider
+from stores.vectordb.VectorDBEnums import DistanceMethodEnums
+import multiprocessing
+import argparse
+import asyncio
+import random
+import resource
+import shutil
+import tempfile
+import time
+import os
+
+def random_vector(dimension: int , rng: random.Random):
+    return [rng.random() - 0.5 for _ in range(dimension)]
+
+def get_directory_size(path: str):
+    return sum(
+        os.path.getsize(os.path.join(root , file_name))
+        for root , _ , files in os.walk(path)
+        for file_name in files
+    )
+
+async def run_layout(layout: str , args , storage_path: str):
+    rng = random.Random(7)
+    provider = QdrantDBProvider(
+        db_client=storage_path,
+        default_vector_size=args.dimension,
+        distance_method=DistanceMethodEnums.COSINE.value,
+        url=args.url,
+        multi_tenant=(layout == "tenants")
+    )
+    await provider.connect()
+    collection_names = [f"collection_{args.dimension}_{project_id}" for project_id in range(args.projects)]
+
+    try:
+        start_time = time.perf_counter()
+        for project_id , collection_name in enumerate(collection_names):
+            _ = await provider.create_collection(collection_name=collection_name , embedding_size=args.dimension)
+            _ = await provider.upsert_many(
+                collection_name=collection_name,
+                texts=[f"project {project_id} chunk {i}" for i in range(args.points)],
+                vectors=[random_vector(args.dimension , rng) for _ in range(args.points)],
+                record_ids=list(range(project_id * args.points , (project_id + 1) * args.points))
+            )
+        load_time = time.perf_counter() - start_time
+
+        latencies = []
+        for _ in range(args.queries):
+            collection_name = rng.choice(collection_names)
+            vector = random_vector(args.dimension , rng)
+            start_time = time.perf_counter()
+            _ = await provider.search_by_vector(collection_name=collection_name , vector=vector , limit=args.limit)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        latencies.sort()
+        percentile = lambda p: latencies[min(len(latencies) - 1 , int(len(latencies) * p))]
+
+        memory , disk = "-" , "-"
+        if args.url is None:
+            # ru_maxrss is in KB on linux
+            memory = f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}MB"
+            disk = f"{get_directory_size(storage_path) / (1024 * 1024):.0f}MB"
+        print(f"{layout:<12} load {load_time:>8.1f}s  search p50 {percentile(0.5):>7.2f}ms "
+              f"p95 {percentile(0.95):>7.2f}ms p99 {percentile(0.99):>7.2f}ms  rss {memory:>8}  disk {disk:>8}")
+    finally:
+        if args.url is not None and layout == "collections":
+            for collection_name in collection_names:
+                _ = await provider.delete_collection(collection_name=collection_name)
+        elif args.url is not None:
+            # the shared collection of the multi tenant layout
+            _ = await provider.client.delete_collection(collection_name=f"collection_{args.dimension}")
+        await provider.disconnect()
+
+def run_layout_process(layout: str , args):
+    storage_path = tempfile.mkdtemp(prefix=f"qdrant_{layout}_")
+    try:
+        asyncio.run(run_layout(layout=layout , args=args , storage_path=storage_path))
+    finally:
+        shutil.rmtree(storage_path , ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-project collections vs multi tenant collection benchmark")
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--points", type=int, default=20, help="points per project")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--url", type=str, default=None, help="qdrant server , embedded storage when unset")
+    parser.add_argument("--layout", choices=["collections", "tenants", "both"], default="both")
+    args = parser.parse_args()
+
+    print(f"{args.projects} projects x {args.points} points , dimension {args.dimension} , "
+          f"{args.queries} queries , {'server ' + args.url if args.url else 'embedded storage'}")
+
+    layouts = ["collections", "tenants"] if args.layout == "both" else [args.layout]
+    # a fresh process per layout , the resident size of one does not leak into the other
+    context = multiprocessing.get_context("spawn")
+    for layout in layouts:
+        process = context.Process(target=run_layout_process , args=(layout , args))
+        process.start()
+        process.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Micro-benchmark of the splitters , run it from src/ :
+#   python -m benchmarks.splitter_benchmark --size-mb 20 --chunk-size 1000 --overlap 100
+#
+# "simple" is the previous line based splitter of ProcessController (copied below as the baseline),
+# the other rows are the offset based splitters of splitters/.
+
+from splitters import SplitterFactory
+from splitters.SplitterEnums import SplitterEnums
+from splitters.BaseSplitter import Document
+from typing import List
+import argparse
+import random
+import time
+
+WORDS = ["retrieval", "augmented", "generation", "vector", "chunk", "embedding", "index",
+         "query", "answer", "document", "page", "token", "model", "search", "the", "of", "a"]
+
+def generate_pages(size_mb: float , page_size: int = 3000 , seed: int = 7):
+    random.seed(seed)
+    target_size = int(size_mb * 1024 * 1024)
+    pages = []
+    total_size = 0
+    while total_size < target_size:
+        lines = []
+        page_length = 0
+        while page_length < page_size:
+            line = " ".join(random.choice(WORDS) for _ in range(random.randint(3, 18)))
+            line += random.choice([".", ". ", "", ":"])
+            lines.append(line)
+            page_length += len(line) + 1
+            if random.random() < 0.1:
+                lines.append("")
+        page = "\n".join(lines)
+        pages.append(page)
+        total_size += len(page)
+    return pages
+
+# process_simple_splitter of ProcessController as it was before the splitters/ package (commit a94e425) ,
+# copied verbatim so the baseline keeps its original cost (one join of the whole text , one list of chunks)
+class BaselineProcessController:
+    def process_simple_splitter(self , texts:List[str] , metadatas:List[dict] , chunk_size: int = 100 , splitter_tag : str = "\n"):
+        
+        full_text = " ".join(texts)
+        # split by splitter_tag
+        lines = [ doc for doc in full_text.split(splitter_tag) if len(doc.strip()) > 1 ]
+        
+        chunks = []
+        current_chunk = ""
+        
+        for line in lines:
+            current_chunk += line + splitter_tag
+            if len(current_chunk) >= chunk_size:
+                chunks.append(
+                    Document(page_content=current_chunk.strip(), 
+                             metadata={})
+                )
+                current_chunk = ""
+        
+        if len(current_chunk) >= 0 :
+            chunks.append(
+                Document(page_content=current_chunk.strip(), 
+                         metadata={})
+            )
+        
+        return chunks
+
+def run(name , split , pages , repeat: int):
+    total_size = sum(len(page) for page in pages)
+    best_time = None
+    chunks_count = 0
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        chunks_count = sum(1 for _ in split(pages))
+        elapsed = time.perf_counter() - start_time
+        best_time = elapsed if best_time is None else min(best_time , elapsed)
+    throughput = total_size / (1024 * 1024) / best_time
+    print(f"{name:<12} {chunks_count:>10} chunks {best_time:>8.3f}s {throughput:>10.1f} MB/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Splitters throughput benchmark")
+    parser.add_argument("--size-mb", type=float, default=20)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = generate_pages(size_mb=args.size_mb)
+    print(f"{len(pages)} pages , {args.size_mb} MB , chunk_size={args.chunk_size} , overlap={args.overlap}")
+
+    factory = SplitterFactory()
+    baseline = BaselineProcessController()
+    run(
+        "simple",
+        lambda texts: baseline.process_simple_splitter(texts=texts, metadatas=[{}] * len(texts), chunk_size=args.chunk_size),
+        pages,
+        args.repeat
+    )
+    # the token mode needs the embedding model tokenizer (see Settings) , it is not part of this comparison
+    for mode in [SplitterEnums.CHARACTER , SplitterEnums.SEPARATOR]:
+        run(
+            mode.value,
+            lambda texts , mode=mode: factory.create(mode=mode.value, chunk_size=args.chunk_size, chunk_overlap=args.overlap).split_texts(texts),
+            pages,
+            args.repeat
+        )
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,44 @@ class DataController(BaseController):
             return False, f'{ResponseSignal.FILE_SIZE_EXCEEDED.value} {max_size / (1024 * 1024)} MB. Your actual file size is {file.size / (1024 * 1024)} MB.'
 
         return True, ResponseSignal.FILE_VALIDATED_SUCCESS.value
+    def validate_upload_session(self, content_type: str , file_size: int):
+        # resumable uploads have their own size limit , the ranges are checked as they arrive
+        allowed_TYPES = self.app_settings.FILE_ALLOWED_TYPES
+        max_size = self.app_settings.UPLOAD_SESSION_MAX_FILE_SIZE * 1024 * 1024
+
+        if content_type not in allowed_TYPES:
+            return False , ResponseSignal.FILE_TYPE_NOT_ALLOWED.value
+        if file_size <= 0 or file_size > max_size:
+            return False, f'{ResponseSignal.FILE_SIZE_EXCEEDED.value} {max_size / (1024 * 1024)} MB. Your actual file size is {file_size / (1024 * 1024)} MB.'
+
+        return True, ResponseSignal.FILE_VALIDATED_SUCCESS.value
+
+    def parse_content_range(self, content_range: str , file_size: int):
+        # "bytes <start>-<end>/<total>" , end is inclusive as in HTTP , returns [start , end) or None
+        if content_range is None:
+            return None
+        match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+|\*)', content_range.strip())
+        if match is None:
+            return None
+
+        start , end = int(match.group(1)) , int(match.group(2))
+        total = match.group(3)
+        if end < start or end >= file_size:
+            return None
+        if total != "*" and int(total) != file_size:
+            return None
+        return start , end + 1
+
+    def validate_upload_range(self, start: int , end: int):
+        max_range_size = self.app_settings.UPLOAD_SESSION_MAX_RANGE_SIZE * 1024 * 1024
+        if end - start > max_range_size:
+            return False, f'{ResponseSignal.UPLOAD_RANGE_SIZE_EXCEEDED.value} {max_range_size / (1024 * 1024)} MB.'
+        return True, ResponseSignal.FILE_VALIDATED_SUCCESS.value
+
+    def get_partial_file_path(self, file_id: str , project_id: str):
+        project_path = ProjectController().get_project_path(project_id)
+        return os.path.join(project_path, f"{file_id}.part")
+
     def generate_unique_file_name(self, original_file_name : str , project_id: str = None) -> str:
         random_key = self.generate_random_string()
         project_path = ProjectController().get_project_path(project_id)
@@ -1,17 +1,27 @@
 from .BaseController import BaseController
 from models.db_schemes import Project , DataChunk
 from stores.llm.LLMEnums import DocumentTypeEnum
+from Utils.metrics import EMBEDDING_CACHE_HITS , EMBEDDING_CACHE_MISSES
 from typing import List
+import hashlib
 import json
+import logging
+
+logger = logging.getLogger('uvicorn.error')
 
 
 class NLPController(BaseController):
-    def __init__(self , vectordb_client , generation_client , embedding_client , template_parser):
+    def __init__(self , vectordb_client , generation_client , embedding_client , template_parser ,
+                 embedding_cache = None , embedding_batcher = None):
         super().__init__()
         self.vectordb_client = vectordb_client
         self.generation_client = generation_client
         self.embedding_client = embedding_client
         self.template_parser = template_parser
+        # EmbeddingCacheModel , None when the cache is disabled
+        self.embedding_cache = embedding_cache
+        # EmbeddingBatcher in front of embedding_client for the document batches
+        self.embedding_batcher = embedding_batcher
         
     def create_collection_name(self , project_id: str):
         return f"collection_{self.embedding_client.embedding_size}_{project_id}".strip()
@@ -38,8 +48,6 @@ class NLPController(BaseController):
         texts = [chunk.chunk_text for chunk in chunks]
         metadata = [chunk.chunk_metadata for chunk in chunks]
         
-        vectors = self.embedding_client.embed_text(text=texts, document_type=DocumentTypeEnum.DOCUMENT.value)
-        
         # step 3 : create collection if not exits 
         
         _ = await self.vectordb_client.create_collection(
@@ -48,25 +56,83 @@ class NLPController(BaseController):
             do_reset=do_reset # error : the delete collection done already in create_collection in vectordbprovider PGvectorDBProvider or qdrantdbprovider
         )
 
-        # step4 : insert into vector db 
-        _ = await self.vectordb_client.insert_many(
+        # step4 : embed and insert into vector db 
+        return await self.index_texts_into_vector_db(
+            collection_name=collection_name,
+            texts=texts,
+            metadata=metadata,
+            chunks_ids=chunks_ids
+        )
+
+    async def index_texts_into_vector_db(self , collection_name:str , texts:List[str] , metadata:List[dict] , chunks_ids:List[int]):
+        # the collection must exist , used by the push endpoint and by the fused ingest jobs
+        # (the chunks come straight from the splitter , their text is not read back from the database)
+        vectors = await self.embed_documents(texts=texts)
+        if not vectors or len(vectors) != len(texts):
+            return False
+
+        # upsert on chunk_id : a retried batch does not duplicate its vectors
+        is_inserted = await self.vectordb_client.upsert_many(
             collection_name=collection_name,
             texts=texts,
             metadata=metadata,
             vectors=vectors,
             record_ids=chunks_ids,
         )
-        
-        
-        return True 
+        return is_inserted is not False
     
-    async def search_vector_db_collection(self , project:Project , text:str , limit:int =5):
+    async def embed_documents(self , texts:List[str]):
+        # the batcher splits big batches to the provider limits and embeds the parts concurrently
+        embedder = self.embedding_batcher if self.embedding_batcher is not None else self.embedding_client
+
+        if self.embedding_cache is None:
+            return await embedder.embed_text_async(
+                text=texts, document_type=DocumentTypeEnum.DOCUMENT.value
+            )
+
+        # only the texts missing from the cache go to the provider (once , even if repeated in the batch)
+        cache_key = {
+            "backend": self.app_settings.EMBEDDING_BACKEND,
+            "model_id": self.embedding_client.embedding_model_id,
+            "embedding_size": self.embedding_client.embedding_size,
+            "document_type": DocumentTypeEnum.DOCUMENT.value,
+        }
+        texts_hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+        vectors = await self.embedding_cache.get_vectors(**cache_key , texts_hashes=list(set(texts_hashes)))
+
+        missing_texts = {}
+        for text_hash , text in zip(texts_hashes , texts):
+            if text_hash not in vectors:
+                missing_texts[text_hash] = text
+
+        metric_labels = {"backend": cache_key["backend"], "model": str(cache_key["model_id"])}
+        EMBEDDING_CACHE_HITS.labels(**metric_labels).inc(len(texts) - len(missing_texts))
+        EMBEDDING_CACHE_MISSES.labels(**metric_labels).inc(len(missing_texts))
+
+        if len(missing_texts):
+            missing_vectors = await embedder.embed_text_async(
+                text=list(missing_texts.values()), document_type=DocumentTypeEnum.DOCUMENT.value
+            )
+            if not missing_vectors or len(missing_vectors) != len(missing_texts):
+                return None
+
+            new_vectors = dict(zip(missing_texts.keys() , missing_vectors))
+            try:
+                _ = await self.embedding_cache.put_vectors(**cache_key , vectors=new_vectors)
+            except Exception as e:
+                # a cache write failure never fails the indexing
+                logger.error(f"Error while writing the embedding cache: {e}")
+            vectors.update(new_vectors)
+
+        return [vectors[text_hash] for text_hash in texts_hashes]
+
+    async def search_vector_db_collection(self , project:Project , text:str , limit:int =5 , search_params:dict = None):
         #step 1 : get collection name
         query_vector = None
         collection_name = self.create_collection_name(project_id=project.project_id)
         
         #step 2 get text embedding vector 
-        vectors = self.embedding_client.embed_text(
+        vectors = await self.embedding_client.embed_text_async(
             text=text,
             document_type=DocumentTypeEnum.QUERY.value
         )
@@ -84,21 +150,23 @@ class NLPController(BaseController):
         results = await self.vectordb_client.search_by_vector(
             collection_name = collection_name,
             vector = query_vector,
-            limit = limit
+            limit = limit,
+            search_params = search_params
         )
         if not results :
             return False
         
         return results
         
-    async def answer_rag_question(self , project:Project , query:str , limit:int =5):
+    async def answer_rag_question(self , project:Project , query:str , limit:int =5 , search_params:dict = None):
         
         answer , full_prompt , chat_history  = None , None , None
         # step 1 : retrieve relevant documents
         retrieved_documents = await self.search_vector_db_collection(
             project=project,
             text=query,
-            limit=limit
+            limit=limit,
+            search_params=search_params
         )
         
         if not retrieved_documents or len(retrieved_documents) == 0:
@@ -142,7 +210,7 @@ class NLPController(BaseController):
         
         full_prompt = "\n\n".join([document_prompt , footer_prompt])
         
-        answer = self.generation_client.generate_text(
+        answer = await self.generation_client.generate_text_async(
             prompt=full_prompt,
             chat_history=chat_history
         )
@@ -5,15 +5,81 @@ from langchain_community.document_loaders import TextLoader
 from langchain_community.document_loaders import PyMuPDFLoader 
 from models import ProcessingEnum
 # from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List
-from dataclasses import dataclass
+from splitters import SplitterFactory
+from splitters.SplitterEnums import SplitterEnums
+from splitters.BaseSplitter import Document
+from typing import List , AsyncIterable
+import codecs
+import hashlib
+import fitz
+
+def get_loader_for_path(file_path: str):
+    file_ext = os.path.splitext(file_path)[-1]
+    if file_ext == ProcessingEnum.TEXT.value:
+        return TextLoader(file_path , encoding="utf-8")
+    elif file_ext == ProcessingEnum.PDF.value:
+        return PyMuPDFLoader(file_path)
+    else:
+        raise ValueError(f"Unsupported file type: {file_ext}")
+
+# the page loaders below are module level (not methods) so they can be pickled and sent to the parse pool processes.
+# each call returns one bounded batch of pages and the cursor to continue from (None at the end of the file),
+# so a file is never held in memory as a whole.
+
+def load_pdf_pages(file_path: str , start_page: int = 0 , max_pages: int = 8):
+    with fitz.open(file_path) as pdf:
+        total_pages = pdf.page_count
+        end_page = min(start_page + max_pages , total_pages)
+        pages = [
+            Document(
+                page_content=pdf[page_number].get_text(),
+                metadata={
+                    "source": file_path,
+                    "file_path": file_path,
+                    "page": page_number,
+                    "total_pages": total_pages,
+                }
+            )
+            for page_number in range(start_page , end_page)
+        ]
+    next_page = end_page if end_page < total_pages else None
+    return pages , next_page
+
+def load_text_block(file_path: str , offset: int = 0 , block_size: int = 512000):
+    file_size = os.path.getsize(file_path)
+    with open(file_path , "rb") as f:
+        f.seek(offset)
+        data = f.read(block_size)
+
+    at_eof = offset + len(data) >= file_size
+    if not at_eof:
+        # stop at the last complete line when there is one
+        last_line_end = data.rfind(b"\n")
+        if last_line_end >= 0:
+            data = data[:last_line_end + 1]
+
+    # the incremental decoder keeps back a multi-byte character cut by the block boundary
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    text = decoder.decode(data , final=at_eof)
+    consumed = len(data) - len(decoder.getstate()[0])
+
+    page = Document(
+        page_content=text,
+        metadata={
+            "source": file_path,
+            "offset": offset,
+        }
+    )
+    next_offset = None if at_eof else offset + consumed
+    return [page] , next_offset
+
+def hash_file(file_path: str , block_size: int = 512000):
+    file_hash = hashlib.sha256()
+    with open(file_path , "rb") as f:
+        while block := f.read(block_size):
+            file_hash.update(block)
+    return file_hash.hexdigest()
 
-# a custom Document class using Python's dataclass decorator to represent a text document with its content and metadata.
-# this decorator automatically generates special methods like __init__() and __repr__() for the class.
-@dataclass
-class Document:
-    page_content: str
-    metadata: dict
 class ProcessController(BaseController):
     def __init__(self , project_id: str):
         super().__init__()
@@ -23,20 +89,17 @@ class ProcessController(BaseController):
     def get_file_extension(self , file_id : str):
         return os.path.splitext(file_id)[-1]
     
+    def get_file_path(self , file_id : str):
+        return os.path.join(self.project_path, file_id)
+    
     def get_file_loader(self , file_id : str):
         
-        file_ext = self.get_file_extension(file_id = file_id)
-        file_path = os.path.join(self.project_path, file_id)
+        file_path = self.get_file_path(file_id = file_id)
         # check if the file esixts
         if not os.path.exists(file_path):
             return None
         
-        if file_ext == ProcessingEnum.TEXT.value:
-            return TextLoader(file_path , encoding="utf-8")
-        elif file_ext == ProcessingEnum.PDF.value:
-            return PyMuPDFLoader(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
+        return get_loader_for_path(file_path)
     
     def get_file_content(self , file_id : str):
         loader = self.get_file_loader(file_id=file_id)
@@ -44,7 +107,8 @@ class ProcessController(BaseController):
             return loader.load()
         return None
     
-    def process_file_content(self , file_content : list  , file_id : str , chunk_size: int = 100, chunk_overlap: int = 20):
+    def process_file_content(self , file_pages : AsyncIterable[Document] , file_id : str , chunk_size: int = 100, chunk_overlap: int = 20 ,
+                             splitter_mode: str = SplitterEnums.SEPARATOR.value):
         
         # text_splitter = RecursiveCharacterTextSplitter(
         #     chunk_size=chunk_size,
@@ -52,54 +116,33 @@ class ProcessController(BaseController):
         #     length_function=len,
         # )
         
-        file_content_texts = [
-            rec.page_content
-            for rec in file_content 
-        ]
-        
-        file_content_metadata = [
-            rec.metadata
-            for rec in file_content
-        ]
-        
         # chunks = text_splitter.create_documents(
         #     file_content_texts,
         #     metadatas=file_content_metadata
         # )
         
-        # our custom simple splitter
-        chunks = self.process_simple_splitter(
-            texts=file_content_texts,
-            metadatas=file_content_metadata,
-            chunk_size=chunk_size
+        # our custom splitters (splitters/) , they consume the pages as they are parsed
+        # and yield every chunk as soon as it is complete
+        splitter = SplitterFactory(config=self.app_settings).create(
+            mode=splitter_mode,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
         )
-        return chunks 
-    
-    def process_simple_splitter(self , texts:List[str] , metadatas:List[dict] , chunk_size: int = 100 , splitter_tag : str = "\n"):
-        
-        full_text = " ".join(texts)
-        # split by splitter_tag
-        lines = [ doc for doc in full_text.split(splitter_tag) if len(doc.strip()) > 1 ]
-        
-        chunks = []
-        current_chunk = ""
+        if splitter is None:
+            raise ValueError(f"Unsupported splitter mode: {splitter_mode}")
         
-        for line in lines:
-            current_chunk += line + splitter_tag
-            if len(current_chunk) >= chunk_size:
-                chunks.append(
-                    Document(page_content=current_chunk.strip(), 
-                             metadata={})
-                )
-                current_chunk = ""
-        
-        if len(current_chunk) >= 0 :
-            chunks.append(
-                Document(page_content=current_chunk.strip(), 
-                         metadata={})
-            )
-        
-        return chunks
-            
-        
-        
\ No newline at end of file
+        return splitter.split_pages(file_pages)
+
+    def get_processing_config(self , content_hash: str , chunk_size: int , chunk_overlap: int ,
+                              splitter_mode: str = SplitterEnums.SEPARATOR.value):
+        # everything that decides the chunks of an asset , stored in asset_config["processing"]
+        # an asset with the same config as its last processing is not chunked again
+        processing_config = {
+            "content_hash": content_hash,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "splitter_mode": splitter_mode,
+        }
+        if splitter_mode == SplitterEnums.TOKEN.value:
+            processing_config["tokenizer_model"] = self.app_settings.EMBEDDING_MODEL_ID
+        return processing_config
@@ -9,12 +9,35 @@ class Settings(BaseSettings):
     FILE_ALLOWED_TYPES: List[str]
     FILE_MAX_SIZE: int  # in MB
     FILE_DEFAULT_CHUNK_SIZE: int  # in bytes
+    UPLOAD_BATCH_MAX_FILES: int = 1000
+    UPLOAD_BATCH_WRITE_CONCURRENCY: int = 16
+    UPLOAD_SESSION_MAX_FILE_SIZE: int = 4096  # in MB
+    UPLOAD_SESSION_MAX_RANGE_SIZE: int = 64  # in MB
     POSTGRES_USERNAME: str
     POSTGRES_PASSWORD: str
     POSTGRES_HOST: str
     POSTGRES_PORT: int
     POSTGRES_MAIN_DATABASE: str
 
+    PROCESSING_WORKERS_COUNT: int = 2
+    PROCESSING_FILES_CONCURRENCY: int = 4
+    PROCESSING_WORKER_POLL_INTERVAL: float = 2.0  # in seconds
+    PROCESSING_JOB_STALE_TIMEOUT: int = 600  # in seconds
+    PROCESSING_JOB_MAX_ATTEMPTS: int = 3
+    PROCESSING_CHUNKS_BATCH_SIZE: int = 200
+
+    PARSE_POOL_WORKERS: int = 2
+    PARSE_POOL_MAX_IN_FLIGHT: int = 4
+    PARSE_POOL_MAX_FILES_PER_WORKER: int = 50
+    PARSE_PDF_PAGES_PER_BATCH: int = 8
+
+    INDEX_PUSH_PAGE_SIZE: int = 500
+    INDEX_PUSH_SERVER_CURSOR: bool = False
+    INDEX_PIPELINE_FETCH_CONCURRENCY: int = 1
+    INDEX_PIPELINE_EMBED_CONCURRENCY: int = 4
+    INDEX_PIPELINE_INSERT_CONCURRENCY: int = 2
+    INDEX_PIPELINE_QUEUE_SIZE: int = 8
+
     GENERATION_BACKEND: str
     EMBEDDING_BACKEND: str
     
@@ -24,11 +47,37 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str=None
     PERPLEXITY_API_KEY: str=None
     
+    # connection pool of the async LLM / embedding clients
+    LLM_HTTP_MAX_CONNECTIONS: int = 200
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    LLM_HTTP_TIMEOUT: float = 60.0  # in seconds
+    # rate governor shared by the calls of every provider model (stores/llm/RateGovernor.py)
+    LLM_GOVERNOR_ENABLED: bool = True
+    LLM_GOVERNOR_REQUESTS_PER_MINUTE: int = None  # None = no window , rely on the 429s
+    LLM_GOVERNOR_TOKENS_PER_MINUTE: int = None
+    LLM_GOVERNOR_INITIAL_CONCURRENCY: int = 4
+    LLM_GOVERNOR_MIN_CONCURRENCY: int = 1
+    LLM_GOVERNOR_MAX_CONCURRENCY: int = 64
+    LLM_GOVERNOR_TARGET_LATENCY: float = 10.0  # in seconds
+    LLM_GOVERNOR_MAX_RETRIES: int = 5
+    LLM_GOVERNOR_BACKOFF_BASE: float = 0.5  # in seconds
+    LLM_GOVERNOR_BACKOFF_MAX: float = 30.0  # in seconds
+    LLM_GOVERNOR_BREAKER_FAILURES: int = 5
+    LLM_GOVERNOR_BREAKER_COOLDOWN: float = 30.0  # in seconds
+    
     GENERATION_BACKEND_LITERAL: List[str] = None
     GENERATION_MODEL_ID: str=None
     EMBEDDING_BACKEND_LITERAL: List[str] = None
     EMBEDDING_MODEL_ID: str=None
     EMBEDDING_MODEL_SIZE:int = None
+    EMBEDDING_CACHE_ENABLED: bool = True
+    # sub-batches of one embedding provider in flight at the same time
+    EMBEDDING_BATCH_CONCURRENCY: int = 4
+    # override the provider limits of stores/llm/EmbeddingBatcher.py
+    EMBEDDING_BATCH_MAX_ITEMS: int = None
+    EMBEDDING_BATCH_MAX_TOKENS: int = None
+    # used by the token splitter when tiktoken does not know EMBEDDING_MODEL_ID
+    SPLITTER_TOKENIZER_FALLBACK_ENCODING: str = "cl100k_base"
     DEFAULT_INPUT_MAX_CHARACTERS: int=None
     default_generation_max_output_tokens: int=None
     DEFAULT_GENERATION_TEMPERATURE: float=None
@@ -39,6 +88,46 @@ class Settings(BaseSettings):
     VECTOR_DB_DISTANCE_METHOD_LITERAL: List[str] = None
     VECTOR_DB_DISTANCE_METHOD:str = None
     VECTOR_DB_PGVECTOR_INDEX_THRESHOLD:int = 100
+    # qdrant server (http://host:6333) , unset = embedded storage in VECTOR_DB_PATH
+    VECTOR_DB_QDRANT_URL:str = None
+    VECTOR_DB_QDRANT_API_KEY:str = None
+    VECTOR_DB_QDRANT_PREFER_GRPC:bool = False
+    VECTOR_DB_QDRANT_GRPC_PORT:int = 6334
+    VECTOR_DB_QDRANT_TIMEOUT:int = None  # in seconds
+    VECTOR_DB_QDRANT_UPLOAD_BATCH_SIZE:int = 256
+    VECTOR_DB_QDRANT_UPLOAD_PARALLEL:int = 1  # upload processes per call (server mode)
+    # options of the new collections (none / scalar / binary quantization)
+    VECTOR_DB_QDRANT_QUANTIZATION:str = None
+    VECTOR_DB_QDRANT_QUANTIZATION_ALWAYS_RAM:bool = True
+    VECTOR_DB_QDRANT_ON_DISK:bool = False  # float32 originals mmap-ed from disk
+    VECTOR_DB_QDRANT_HNSW_M:int = None  # None = qdrant default (16)
+    VECTOR_DB_QDRANT_HNSW_EF_CONSTRUCT:int = None  # None = qdrant default (100)
+    # search defaults
+    VECTOR_DB_QDRANT_SEARCH_HNSW_EF:int = None
+    VECTOR_DB_QDRANT_SEARCH_OVERSAMPLING:float = None
+    VECTOR_DB_QDRANT_SEARCH_RESCORE:bool = True
+    # one shared collection per embedding size , the projects are filtered on a tenant payload index
+    VECTOR_DB_QDRANT_MULTI_TENANT:bool = False
+    # VECTOR_DB_BACKEND = "BROKER" : one broker process owns the embedded store , the workers call it on this socket
+    VECTOR_DB_BROKER_BACKEND:str = "QDRANT"
+    VECTOR_DB_BROKER_SOCKET_PATH:str = "/tmp/minirag_vectordb.sock"
+    VECTOR_DB_BROKER_TIMEOUT:float = 60.0  # in seconds , per call
+    VECTOR_DB_BROKER_CONNECT_TIMEOUT:float = 30.0  # in seconds , waiting for the broker to listen
+    VECTOR_DB_BROKER_MAX_BATCH:int = 256  # messages per frame
+    # batches of at least this many rows are streamed with binary COPY into a staging table (0 = never)
+    VECTOR_DB_PGVECTOR_COPY_MIN_ROWS:int = 200
+    # commit every N batches of one insert / upsert call (0 = one transaction for the whole call)
+    VECTOR_DB_PGVECTOR_BATCHES_PER_COMMIT:int = 1
+    # vector index , built CONCURRENTLY in the background after a push or with /index/build
+    VECTOR_DB_PGVECTOR_INDEX_TYPE:str = "hnsw"  # hnsw / ivfflat
+    VECTOR_DB_PGVECTOR_HNSW_M:int = 16
+    VECTOR_DB_PGVECTOR_HNSW_EF_CONSTRUCTION:int = 64
+    VECTOR_DB_PGVECTOR_IVFFLAT_LISTS:int = 0  # 0 = from the row count
+    VECTOR_DB_PGVECTOR_INDEX_MAINTENANCE_WORK_MEM:str = None  # e.g. "1GB" , the graph should fit in it
+    VECTOR_DB_PGVECTOR_INDEX_PARALLEL_WORKERS:int = None
+    VECTOR_DB_PGVECTOR_BUILD_INDEX_AFTER_PUSH:bool = True
+    # one table per embedding size , LIST partitioned by project_id , instead of one table per project
+    VECTOR_DB_PGVECTOR_PARTITIONED:bool = False
      
     DEFAULT_LANGUAGE:str = "en"
     PRIMARY_LANGUAGE:str = "en"
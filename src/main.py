@@ -3,10 +3,13 @@ from routes import base , data , nlp
 from sqlalchemy.ext.asyncio import create_async_engine , AsyncSession
 from sqlalchemy.orm import sessionmaker
 from helpers.config import get_settings
-from stores.llm import LLMProviderFactory
+from stores.llm import LLMProviderFactory , EmbeddingBatcher , GovernedProvider
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
 from stores.llm.templates.template_parser import TemplateParser
 from Utils.metrics import setup_metrics
+from workers import ProcessingWorkerPool , ParsePool
+from models.EmbeddingCacheModel import EmbeddingCacheModel
+import httpx
 
 app = FastAPI()  # creates the app.
 #setup Prometheus metrics
@@ -26,8 +29,17 @@ async def startup_span():
         expire_on_commit=False
     )
 
-    llm_provider_factory = LLMProviderFactory(config=settings)
-    vectordb_provider_factory = VectorDBProviderFactory(config=settings , db_client = app.db_client)
+    # one pooled http client for every async LLM / embedding call of this worker
+    app.llm_http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        timeout=httpx.Timeout(settings.LLM_HTTP_TIMEOUT)
+    )
+
+    llm_provider_factory = LLMProviderFactory(config=settings , http_client=app.llm_http_client)
+    vectordb_provider_factory = VectorDBProviderFactory(config=settings , db_client = app.db_client , db_engine = app.db_engine)
     
     # generration client 
     app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND)
@@ -37,6 +49,40 @@ async def startup_span():
     app.embedding_client = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND)
     app.embedding_client.set_embedding_model(model_id=settings.EMBEDDING_MODEL_ID , embedding_size=settings.EMBEDDING_MODEL_SIZE)
     
+    # every async call goes through the rate governor of its provider model
+    if settings.LLM_GOVERNOR_ENABLED:
+        governor_config = {
+            "requests_per_minute": settings.LLM_GOVERNOR_REQUESTS_PER_MINUTE,
+            "tokens_per_minute": settings.LLM_GOVERNOR_TOKENS_PER_MINUTE,
+            "initial_concurrency": settings.LLM_GOVERNOR_INITIAL_CONCURRENCY,
+            "min_concurrency": settings.LLM_GOVERNOR_MIN_CONCURRENCY,
+            "max_concurrency": settings.LLM_GOVERNOR_MAX_CONCURRENCY,
+            "target_latency": settings.LLM_GOVERNOR_TARGET_LATENCY,
+            "max_retries": settings.LLM_GOVERNOR_MAX_RETRIES,
+            "backoff_base": settings.LLM_GOVERNOR_BACKOFF_BASE,
+            "backoff_max": settings.LLM_GOVERNOR_BACKOFF_MAX,
+            "breaker_failures": settings.LLM_GOVERNOR_BREAKER_FAILURES,
+            "breaker_cooldown": settings.LLM_GOVERNOR_BREAKER_COOLDOWN,
+        }
+        app.generation_client = GovernedProvider(provider=app.generation_client , backend=settings.GENERATION_BACKEND ,
+                                                 governor_config=governor_config)
+        app.embedding_client = GovernedProvider(provider=app.embedding_client , backend=settings.EMBEDDING_BACKEND ,
+                                                governor_config=governor_config)
+    
+    # splits the document batches to the provider limits and embeds the parts concurrently
+    app.embedding_batcher = EmbeddingBatcher(
+        embedding_client=app.embedding_client,
+        backend=settings.EMBEDDING_BACKEND,
+        max_items=settings.EMBEDDING_BATCH_MAX_ITEMS,
+        max_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+        concurrency=settings.EMBEDDING_BATCH_CONCURRENCY
+    )
+    
+    # persistent cache of the document embeddings
+    app.embedding_cache = None
+    if settings.EMBEDDING_CACHE_ENABLED:
+        app.embedding_cache = await EmbeddingCacheModel.create_instance(db_client=app.db_client)
+    
     # vectordb client
     app.vectordb_client = vectordb_provider_factory.create(provider=settings.VECTOR_DB_BACKEND)
     await app.vectordb_client.connect()
@@ -44,11 +90,36 @@ async def startup_span():
     # template parser
     app.template_parser = TemplateParser(language=settings.PRIMARY_LANGUAGE , default_language=settings.DEFAULT_LANGUAGE)
     
+    # process pool for the document parsing
+    app.parse_pool = ParsePool(
+        max_workers=settings.PARSE_POOL_WORKERS,
+        max_in_flight=settings.PARSE_POOL_MAX_IN_FLIGHT,
+        max_files_per_worker=settings.PARSE_POOL_MAX_FILES_PER_WORKER,
+        pdf_pages_per_batch=settings.PARSE_PDF_PAGES_PER_BATCH,
+        text_block_size=settings.FILE_DEFAULT_CHUNK_SIZE,
+    )
+    app.parse_pool.start()
+    
+    # background workers for the processing jobs queue
+    app.processing_worker_pool = ProcessingWorkerPool(
+        app=app,
+        workers_count=settings.PROCESSING_WORKERS_COUNT,
+        files_concurrency=settings.PROCESSING_FILES_CONCURRENCY,
+        poll_interval=settings.PROCESSING_WORKER_POLL_INTERVAL,
+        stale_timeout=settings.PROCESSING_JOB_STALE_TIMEOUT,
+        max_attempts=settings.PROCESSING_JOB_MAX_ATTEMPTS,
+        chunks_batch_size=settings.PROCESSING_CHUNKS_BATCH_SIZE,
+        build_index_after_ingest=settings.VECTOR_DB_PGVECTOR_BUILD_INDEX_AFTER_PUSH,
+    )
+    await app.processing_worker_pool.start()
     
 @app.on_event("shutdown")
 async def shutdown_span():
+    await app.processing_worker_pool.stop()
+    app.parse_pool.shutdown()
     app.db_engine.dispose()
     await app.vectordb_client.disconnect()
+    await app.llm_http_client.aclose()
 app.include_router(base.base_router)  # includes the base router in the app.
 app.include_router(data.data_router)  # includes the data router in the app.
 app.include_router(nlp.nlp_router)  # includes the nlp router in the app.
\ No newline at end of file
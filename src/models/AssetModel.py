@@ -2,6 +2,10 @@ from .BaseDataModel import BaseDataModel
 from .db_schemes import Asset
 from .enums.DataBaseEnum import DataBaseEnum
 from sqlalchemy.future import select
+from sqlalchemy import update , insert
+from sqlalchemy.dialects.postgresql import JSONB
+from typing import List
+import uuid
 
 class AssetModel(BaseDataModel):
     def __init__(self, db_client: object):
@@ -21,6 +25,21 @@ class AssetModel(BaseDataModel):
             await session.refresh(asset)
         return asset
     
+    async def insert_many_assets(self , rows: List[dict]):
+        # one multi-row INSERT ... RETURNING for a whole batch of uploaded files ,
+        # returns {asset_name: asset_id}
+        stmt = insert(Asset.__table__).returning(Asset.__table__.c.asset_id , Asset.__table__.c.asset_name)
+        rows = [
+            {"asset_uuid": uuid.uuid4(), **row}
+            for row in rows
+        ]
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(stmt , rows)
+                assets_ids = {asset_name: asset_id for asset_id , asset_name in result.all()}
+            await session.commit()
+        return assets_ids
+
     async def get_all_projects_assets(self , asset_project_id :str , asset_type :str):
                 
         async with self.db_client() as session:
@@ -48,4 +67,45 @@ class AssetModel(BaseDataModel):
                     )
                 )
                 asset = result.scalar_one_or_none()
-        return asset
\ No newline at end of file
+        return asset
+    async def get_assets_by_ids(self , asset_ids : list):
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(Asset).where(Asset.asset_id.in_(asset_ids))
+                )
+                assets = result.scalars().all()
+        return assets
+
+    async def update_asset_hash(self , asset_id : int , asset_hash : str):
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(Asset).where(Asset.asset_id == asset_id).values(asset_hash=asset_hash)
+                await session.execute(stmt)
+            await session.commit()
+
+    async def set_asset_processing_config(self , asset_id : int , processing_config : dict):
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(Asset).where(Asset.asset_id == asset_id).with_for_update()
+                )
+                asset = result.scalar_one_or_none()
+                if asset is None:
+                    return None
+                # assign a new dict , in-place changes of a JSONB value are not tracked
+                asset.asset_config = {**(asset.asset_config or {}), "processing": processing_config}
+            await session.commit()
+        return asset
+
+    async def reset_project_processing_configs(self , asset_project_id : int):
+        # forget the last processing of every asset of the project (their chunks were deleted)
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(Asset).where(
+                    Asset.asset_project_id == asset_project_id,
+                    Asset.asset_config.has_key("processing")
+                ).values(asset_config=Asset.asset_config.op("-" , return_type=JSONB)("processing"))
+                result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
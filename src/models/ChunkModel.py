@@ -2,7 +2,14 @@ from .BaseDataModel import BaseDataModel
 from .db_schemes import DataChunk
 from .enums.DataBaseEnum import DataBaseEnum
 from sqlalchemy.future import select
-from sqlalchemy import func , delete
+from sqlalchemy import func , delete , insert , update
+from typing import List
+import json
+import uuid
+
+# columns written by the bulk paths , created_at / updated_at keep their server defaults
+CHUNK_ROW_COLUMNS = ["chunk_uuid", "chunk_text", "chunk_metadata", "chunk_order", "chunk_project_id", "chunk_asset_id",
+                     "chunk_job_file_id"]
 
 class ChunkModel(BaseDataModel):
     def __init__(self, db_client: object):
@@ -37,6 +44,60 @@ class ChunkModel(BaseDataModel):
             await session.commit()
             return len(chunks)
     
+    async def insert_chunk_rows(self , rows: List[dict] , session = None) -> List[int]:
+        # one multi-row INSERT ... RETURNING chunk_id on the Core table , no ORM objects are built.
+        # rows are plain dicts with the chunk_* columns
+        stmt = insert(DataChunk.__table__).returning(DataChunk.__table__.c.chunk_id)
+        rows = [
+            {"chunk_uuid": uuid.uuid4(), **row}
+            for row in rows
+        ]
+        if session is not None:
+            result = await session.execute(stmt , rows)
+            return [row[0] for row in result.all()]
+
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(stmt , rows)
+                chunks_ids = [row[0] for row in result.all()]
+            await session.commit()
+        return chunks_ids
+
+    async def copy_chunk_rows(self , rows: List[dict] , session = None) -> int:
+        # streams the rows with the postgres COPY protocol (asyncpg copy_records_to_table) ,
+        # the fastest path when the new chunk ids are not needed
+        if session is not None:
+            return await self._copy_chunk_rows(session=session , rows=rows)
+
+        async with self.db_client() as session:
+            async with session.begin():
+                inserted_count = await self._copy_chunk_rows(session=session , rows=rows)
+            await session.commit()
+        return inserted_count
+
+    async def _copy_chunk_rows(self , session , rows: List[dict]) -> int:
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        records = [
+            (
+                uuid.uuid4(),
+                row["chunk_text"],
+                # the jsonb codec of the SQLAlchemy asyncpg connection expects a json string
+                json.dumps(row.get("chunk_metadata") or {} , ensure_ascii=False),
+                row["chunk_order"],
+                row["chunk_project_id"],
+                row["chunk_asset_id"],
+                row.get("chunk_job_file_id"),
+            )
+            for row in rows
+        ]
+        await raw_connection.driver_connection.copy_records_to_table(
+            DataChunk.__tablename__,
+            records=records,
+            columns=CHUNK_ROW_COLUMNS
+        )
+        return len(records)
+
     async def delete_chunks_by_project_id(self , project_id: int):
         async with self.db_client() as session:
             async with session.begin():
@@ -45,19 +106,136 @@ class ChunkModel(BaseDataModel):
             await session.commit()
         return result.rowcount
     
+    async def delete_chunks_by_ids(self , chunks_ids: List[int]):
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = delete(DataChunk).where(DataChunk.chunk_id.in_(chunks_ids))
+                result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def get_asset_chunks_ids(self , asset_id: int , exclude_job_file_id: int , limit: int = 1000):
+        # the chunks of the asset written before the given job file (its own new chunks are excluded)
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(DataChunk.chunk_id).where(
+                    DataChunk.chunk_asset_id == asset_id,
+                    DataChunk.chunk_job_file_id.is_distinct_from(exclude_job_file_id)
+                ).order_by(DataChunk.chunk_id).limit(limit)
+                result = await session.execute(query)
+                chunks_ids = result.scalars().all()
+        return chunks_ids
+
+    async def get_job_file_chunks_ids(self , job_file_id: int , limit: int = 1000):
+        # chunks written by a job file , used to find the vectors to drop with them
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(DataChunk.chunk_id).where(
+                    DataChunk.chunk_job_file_id == job_file_id
+                ).order_by(DataChunk.chunk_id).limit(limit)
+                result = await session.execute(query)
+                chunks_ids = result.scalars().all()
+        return chunks_ids
+
     async def get_project_chunks(self , project_id: int , page_number:int=1 , page_size:int=50):
         async with self.db_client() as session:
             async with session.begin():
-                query = select(DataChunk).where(DataChunk.chunk_project_id == project_id).offset((page_number - 1) * page_size).limit(page_size)
+                query = select(DataChunk).where(DataChunk.chunk_project_id == project_id).order_by(DataChunk.chunk_id).offset((page_number - 1) * page_size).limit(page_size)
                 result = await session.execute(query)
                 records = result.scalars().all()
         return records
     
-    async def get_total_chunks_count(self , project_id:int):
+    async def iter_project_chunks(self , project_id: int , page_size: int = 500 ,
+                                  use_server_cursor: bool = False , after_chunk_id: int = 0 ,
+                                  max_chunk_id: int = None , only_unindexed: bool = False):
+        # yields the project chunks page by page , ordered by chunk_id.
+        # keyset mode : every page is a short query (chunk_id > last_id) on idx_chunk_project_id_chunk_id ,
+        # the cost of a page does not grow with its position and rows inserted meanwhile never shift the pages.
+        # server cursor mode : one query streamed in pages , fewer round trips for very large scans
+        # but it keeps a transaction (and a pool connection) open for the whole scan.
+        # after_chunk_id / max_chunk_id bound the scan to (after_chunk_id , max_chunk_id].
+        # only_unindexed skips the chunks already pushed (idx_chunk_project_id_unindexed).
+        id_filters = [DataChunk.chunk_project_id == project_id]
+        if max_chunk_id is not None:
+            id_filters.append(DataChunk.chunk_id <= max_chunk_id)
+        if only_unindexed:
+            id_filters.append(DataChunk.chunk_indexed_at.is_(None))
+
+        if use_server_cursor:
+            async with self.db_client() as session:
+                async with session.begin():
+                    query = select(DataChunk).where(
+                        *id_filters,
+                        DataChunk.chunk_id > after_chunk_id
+                    ).order_by(DataChunk.chunk_id).execution_options(yield_per=page_size)
+                    result = await session.stream(query)
+                    async for page_chunks in result.scalars().partitions(page_size):
+                        yield page_chunks
+            return
+
+        last_chunk_id = after_chunk_id
+        while True:
+            async with self.db_client() as session:
+                query = select(DataChunk).where(
+                    *id_filters,
+                    DataChunk.chunk_id > last_chunk_id
+                ).order_by(DataChunk.chunk_id).limit(page_size)
+                result = await session.execute(query)
+                page_chunks = result.scalars().all()
+
+            if not len(page_chunks):
+                break
+            yield page_chunks
+            last_chunk_id = page_chunks[-1].chunk_id
+            if len(page_chunks) < page_size:
+                break
+
+    async def get_project_chunk_id_range(self , project_id: int , only_unindexed: bool = False):
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(func.min(DataChunk.chunk_id) , func.max(DataChunk.chunk_id)).where(
+                    DataChunk.chunk_project_id == project_id
+                )
+                if only_unindexed:
+                    query = query.where(DataChunk.chunk_indexed_at.is_(None))
+                result = await session.execute(query)
+                min_chunk_id , max_chunk_id = result.one()
+        return min_chunk_id , max_chunk_id
+
+    async def get_total_chunks_count(self , project_id:int , only_unindexed: bool = False):
         total_count = 0
         async with self.db_client() as session:
             async with session.begin():
                 query = select(func.count(DataChunk.chunk_id)).where(DataChunk.chunk_project_id == project_id)
+                if only_unindexed:
+                    query = query.where(DataChunk.chunk_indexed_at.is_(None))
                 result = await session.execute(query)
                 total_count = result.scalar()
         return total_count
+
+    async def mark_chunks_indexed(self , chunks_ids: List[int]):
+        # called once the vectors of the chunks are in the collection , updated_at is left as it was
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(DataChunk).where(DataChunk.chunk_id.in_(chunks_ids)).values(
+                    chunk_indexed_at=func.now(),
+                    updated_at=DataChunk.updated_at
+                )
+                result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def reset_project_chunks_indexed(self , project_id: int):
+        # the collection was (re)created empty , every chunk of the project has to be pushed again
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(DataChunk).where(
+                    DataChunk.chunk_project_id == project_id,
+                    DataChunk.chunk_indexed_at.is_not(None)
+                ).values(
+                    chunk_indexed_at=None,
+                    updated_at=DataChunk.updated_at
+                )
+                result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
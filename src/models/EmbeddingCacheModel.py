@@ -0,0 +1,66 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import EmbeddingCache
+from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert
+from typing import List , Dict
+import struct
+
+def pack_vector(vector: List[float]) -> bytes:
+    return struct.pack(f"<{len(vector)}f" , *vector)
+
+def unpack_vector(data: bytes) -> List[float]:
+    return list(struct.unpack(f"<{len(data) // 4}f" , data))
+
+class EmbeddingCacheModel(BaseDataModel):
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls , db_client:object):
+        instance = cls(db_client=db_client)
+        return instance
+
+    async def get_vectors(self , backend: str , model_id: str , embedding_size: int , document_type: str ,
+                          texts_hashes: List[str]) -> Dict[str, List[float]]:
+        if not len(texts_hashes):
+            return {}
+        async with self.db_client() as session:
+            query = select(EmbeddingCache.cache_text_hash , EmbeddingCache.cache_vector).where(
+                EmbeddingCache.cache_backend == backend,
+                EmbeddingCache.cache_model_id == model_id,
+                EmbeddingCache.cache_embedding_size == embedding_size,
+                EmbeddingCache.cache_document_type == document_type,
+                EmbeddingCache.cache_text_hash.in_(texts_hashes)
+            )
+            result = await session.execute(query)
+            rows = result.all()
+        return {text_hash: unpack_vector(vector) for text_hash , vector in rows}
+
+    async def put_vectors(self , backend: str , model_id: str , embedding_size: int , document_type: str ,
+                          vectors: Dict[str, List[float]]):
+        if not len(vectors):
+            return 0
+        rows = [
+            {
+                "cache_backend": backend,
+                "cache_model_id": model_id,
+                "cache_embedding_size": embedding_size,
+                "cache_document_type": document_type,
+                "cache_text_hash": text_hash,
+                "cache_vector": pack_vector(vector),
+            }
+            for text_hash , vector in vectors.items()
+        ]
+        async with self.db_client() as session:
+            async with session.begin():
+                # bounded multi-row statements , far below the bind parameters limit
+                for i in range(0 , len(rows) , 1000):
+                    # two workers can embed the same text at the same time , the first write wins
+                    stmt = insert(EmbeddingCache).values(rows[i:i+1000]).on_conflict_do_nothing(
+                        index_elements=["cache_backend", "cache_model_id", "cache_embedding_size",
+                                        "cache_document_type", "cache_text_hash"]
+                    )
+                    await session.execute(stmt)
+            await session.commit()
+        return len(rows)
@@ -0,0 +1,302 @@
+from .BaseDataModel import BaseDataModel
+from .ChunkModel import ChunkModel
+from .db_schemes import ProcessingJob , ProcessingJobFile , DataChunk
+from .enums.ProcessingJobEnum import ProcessingJobStatusEnum , ProcessingJobFileStatusEnum
+from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
+from sqlalchemy import func , update , delete , or_ , and_
+from datetime import datetime , timedelta , timezone
+from typing import List
+
+# first key of the advisory locks taken on a project while a job of it is claimed
+PROJECT_JOB_LOCK_NAMESPACE = 7301
+
+class JobLockLostError(Exception):
+    # the job was taken over by another worker , this one must stop writing for it
+    pass
+
+class ProcessingJobModel(BaseDataModel):
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls , db_client:object):
+        instance = cls(db_client=db_client)
+        return instance
+
+    async def create_job(self , job: ProcessingJob , asset_ids: List[int]):
+        async with self.db_client() as session:
+            async with session.begin():
+                job.job_status = ProcessingJobStatusEnum.PENDING.value
+                session.add(job)
+                # flush to get the job_id before adding the per-file rows
+                await session.flush()
+                session.add_all([
+                    ProcessingJobFile(
+                        job_file_job_id = job.job_id,
+                        job_file_asset_id = asset_id,
+                        job_file_status = ProcessingJobFileStatusEnum.PENDING.value,
+                    )
+                    for asset_id in asset_ids
+                ])
+            await session.commit()
+            await session.refresh(job)
+        return job
+
+    async def get_job(self , job_id: int):
+        async with self.db_client() as session:
+            result = await session.execute(select(ProcessingJob).where(ProcessingJob.job_id == job_id))
+            job = result.scalar_one_or_none()
+        return job
+
+    async def claim_next_job(self , worker_id: str , stale_timeout: int):
+        # SKIP LOCKED lets many workers poll the same table without waiting on each other:
+        # a row locked by another worker is simply invisible to this query.
+        # running jobs whose heartbeat is too old belong to a dead worker and can be taken over.
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=stale_timeout)
+
+        # one job at a time per project : two jobs of the same project would discard and replace
+        # the chunks (and vectors) of each other
+        other_job = aliased(ProcessingJob)
+        project_job_running = select(other_job.job_id).where(
+            other_job.job_project_id == ProcessingJob.job_project_id,
+            other_job.job_id != ProcessingJob.job_id,
+            other_job.job_status == ProcessingJobStatusEnum.RUNNING.value,
+            other_job.job_heartbeat_at >= stale_before
+        ).exists()
+
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(ProcessingJob).where(
+                    or_(
+                        ProcessingJob.job_status == ProcessingJobStatusEnum.PENDING.value,
+                        and_(
+                            ProcessingJob.job_status == ProcessingJobStatusEnum.RUNNING.value,
+                            ProcessingJob.job_heartbeat_at < stale_before
+                        )
+                    ),
+                    ~project_job_running
+                ).order_by(ProcessingJob.job_id).limit(1).with_for_update(skip_locked=True)
+
+                result = await session.execute(query)
+                job = result.scalar_one_or_none()
+                if job is None:
+                    return None
+
+                # two workers can pick two jobs of the same project at the same time (the other claim is
+                # not committed yet) : the project lock orders them , the second one sees the first job running
+                await session.execute(select(func.pg_advisory_xact_lock(PROJECT_JOB_LOCK_NAMESPACE , job.job_project_id)))
+                result = await session.execute(select(
+                    select(ProcessingJob.job_id).where(
+                        ProcessingJob.job_project_id == job.job_project_id,
+                        ProcessingJob.job_id != job.job_id,
+                        ProcessingJob.job_status == ProcessingJobStatusEnum.RUNNING.value,
+                        ProcessingJob.job_heartbeat_at >= stale_before
+                    ).exists()
+                ))
+                if result.scalar():
+                    return None
+
+                job.job_status = ProcessingJobStatusEnum.RUNNING.value
+                job.job_locked_by = worker_id
+                job.job_heartbeat_at = now
+                job.job_attempts = (job.job_attempts or 0) + 1
+                if job.started_at is None:
+                    job.started_at = now
+            await session.commit()
+        return job
+
+    async def touch_job(self , job_id: int , worker_id: str):
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(ProcessingJob).where(
+                    ProcessingJob.job_id == job_id,
+                    ProcessingJob.job_locked_by == worker_id
+                ).values(job_heartbeat_at=datetime.now(timezone.utc))
+                result = await session.execute(stmt)
+            await session.commit()
+        # 0 rows means another worker took the job over
+        return result.rowcount > 0
+
+    async def release_job(self , job_id: int , worker_id: str):
+        # give the job back to the queue (used when a worker is stopped in the middle of a job)
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(ProcessingJob).where(
+                    ProcessingJob.job_id == job_id,
+                    ProcessingJob.job_locked_by == worker_id
+                ).values(
+                    job_status=ProcessingJobStatusEnum.PENDING.value,
+                    job_locked_by=None,
+                    job_heartbeat_at=None
+                )
+                await session.execute(stmt)
+            await session.commit()
+
+    async def finish_job(self , job_id: int , worker_id: str , job_status: str , job_error: str = None):
+        # only the worker holding the job can set its final status
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(ProcessingJob).where(
+                    ProcessingJob.job_id == job_id,
+                    ProcessingJob.job_locked_by == worker_id
+                ).values(
+                    job_status=job_status,
+                    job_error=job_error,
+                    job_locked_by=None,
+                    finished_at=datetime.now(timezone.utc)
+                )
+                result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
+
+    def is_job_file_owned_by(self , worker_id: str):
+        # condition on the job files : their job is still held by the worker
+        return ProcessingJobFile.job_file_job_id.in_(
+            select(ProcessingJob.job_id).where(ProcessingJob.job_locked_by == worker_id)
+        )
+
+    async def get_job_files(self , job_id: int , only_unfinished: bool = False):
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(ProcessingJobFile).where(ProcessingJobFile.job_file_job_id == job_id)
+                if only_unfinished:
+                    query = query.where(ProcessingJobFile.job_file_status.in_([
+                        ProcessingJobFileStatusEnum.PENDING.value,
+                        ProcessingJobFileStatusEnum.RUNNING.value,
+                    ]))
+                result = await session.execute(query.order_by(ProcessingJobFile.job_file_id))
+                files = result.scalars().all()
+        return files
+
+    async def get_job_progress(self , job_id: int):
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(
+                    ProcessingJobFile.job_file_status,
+                    func.count(ProcessingJobFile.job_file_id),
+                    func.coalesce(func.sum(ProcessingJobFile.job_file_inserted_chunks), 0)
+                ).where(
+                    ProcessingJobFile.job_file_job_id == job_id
+                ).group_by(ProcessingJobFile.job_file_status)
+                result = await session.execute(query)
+                rows = result.all()
+
+        progress = {status.value: 0 for status in ProcessingJobFileStatusEnum}
+        inserted_chunks = 0
+        for file_status , files_count , chunks_count in rows:
+            progress[file_status] = files_count
+            inserted_chunks += chunks_count
+
+        progress["total"] = sum(progress.values())
+        progress["inserted_chunks"] = int(inserted_chunks)
+        return progress
+
+    async def start_job_file(self , job_file_id: int):
+        # started_at marks the file attempt , a file found with it set had an attempt that did not finish
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(ProcessingJobFile).where(ProcessingJobFile.job_file_id == job_file_id).values(
+                    job_file_status=ProcessingJobFileStatusEnum.RUNNING.value,
+                    job_file_inserted_chunks=0,
+                    job_file_error=None,
+                    started_at=func.now()
+                ).returning(ProcessingJobFile.started_at)
+                result = await session.execute(stmt)
+                started_at = result.scalar_one()
+            await session.commit()
+        return started_at
+
+    async def add_job_file_chunks(self , job_file_id: int , worker_id: str , chunks: List[dict] , return_ids: bool = False):
+        # a batch of chunk rows and the file progress are written in the same transaction ,
+        # COPY when the ids are not needed , INSERT ... RETURNING when the batch is indexed right after
+        chunk_model = ChunkModel(db_client=self.db_client)
+        chunks = [{**chunk , "chunk_job_file_id": job_file_id} for chunk in chunks]
+        chunks_ids = None
+        async with self.db_client() as session:
+            async with session.begin():
+                # the job row stays share-locked until the batch is committed : a takeover (claim_next_job
+                # locks it for update) waits for it , and the batches after the takeover are refused
+                query = select(ProcessingJob.job_id).join(
+                    ProcessingJobFile , ProcessingJobFile.job_file_job_id == ProcessingJob.job_id
+                ).where(
+                    ProcessingJobFile.job_file_id == job_file_id,
+                    ProcessingJob.job_locked_by == worker_id
+                ).with_for_update(read=True , of=ProcessingJob)
+                result = await session.execute(query)
+                if result.scalar_one_or_none() is None:
+                    raise JobLockLostError(f"The job of file {job_file_id} is held by another worker")
+
+                if return_ids:
+                    chunks_ids = await chunk_model.insert_chunk_rows(rows=chunks , session=session)
+                else:
+                    _ = await chunk_model.copy_chunk_rows(rows=chunks , session=session)
+                stmt = update(ProcessingJobFile).where(ProcessingJobFile.job_file_id == job_file_id).values(
+                    job_file_inserted_chunks=ProcessingJobFile.job_file_inserted_chunks + len(chunks)
+                )
+                await session.execute(stmt)
+            await session.commit()
+        if return_ids:
+            return chunks_ids
+        return len(chunks)
+
+    async def discard_job_file_chunks(self , job_file_id: int):
+        # remove the chunks a file attempt already flushed (the attempt failed or its worker died) ,
+        # only the rows written by this job file , never those of another job
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = delete(DataChunk).where(DataChunk.chunk_job_file_id == job_file_id)
+                result = await session.execute(stmt)
+                stmt = update(ProcessingJobFile).where(ProcessingJobFile.job_file_id == job_file_id).values(
+                    job_file_inserted_chunks=0
+                )
+                await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def complete_job_file(self , job_file_id: int , worker_id: str):
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(ProcessingJobFile).where(
+                    ProcessingJobFile.job_file_id == job_file_id,
+                    self.is_job_file_owned_by(worker_id)
+                ).values(
+                    job_file_status=ProcessingJobFileStatusEnum.COMPLETED.value,
+                    job_file_error=None,
+                    finished_at=datetime.now(timezone.utc)
+                )
+                result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
+
+    async def skip_job_file(self , job_file_id: int , worker_id: str):
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(ProcessingJobFile).where(
+                    ProcessingJobFile.job_file_id == job_file_id,
+                    self.is_job_file_owned_by(worker_id)
+                ).values(
+                    job_file_status=ProcessingJobFileStatusEnum.SKIPPED.value,
+                    job_file_error=None,
+                    finished_at=datetime.now(timezone.utc)
+                )
+                result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
+
+    async def fail_job_file(self , job_file_id: int , worker_id: str , job_file_error: str):
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = update(ProcessingJobFile).where(
+                    ProcessingJobFile.job_file_id == job_file_id,
+                    self.is_job_file_owned_by(worker_id)
+                ).values(
+                    job_file_status=ProcessingJobFileStatusEnum.FAILED.value,
+                    job_file_error=job_file_error,
+                    finished_at=datetime.now(timezone.utc)
+                )
+                result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
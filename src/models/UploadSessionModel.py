@@ -0,0 +1,117 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import UploadSession , Asset
+from .enums.UploadSessionEnum import UploadSessionStatusEnum
+from sqlalchemy.future import select
+from datetime import datetime , timezone
+from typing import List
+import uuid
+
+# ranges are [start , end) byte offsets , kept sorted and merged
+def merge_ranges(ranges: List[list] , start: int , end: int):
+    merged = []
+    for range_start , range_end in sorted(ranges + [[start , end]]):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1] , range_end)
+        else:
+            merged.append([range_start , range_end])
+    return merged
+
+def get_missing_ranges(ranges: List[list] , file_size: int):
+    missing = []
+    cursor = 0
+    for range_start , range_end in ranges:
+        if range_start > cursor:
+            missing.append([cursor , range_start])
+        cursor = max(cursor , range_end)
+    if cursor < file_size:
+        missing.append([cursor , file_size])
+    return missing
+
+class UploadSessionModel(BaseDataModel):
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls , db_client:object):
+        instance = cls(db_client=db_client)
+        return instance
+
+    async def create_upload_session(self , upload_session: UploadSession):
+        async with self.db_client() as session:
+            async with session.begin():
+                upload_session.upload_status = UploadSessionStatusEnum.OPEN.value
+                upload_session.upload_received_ranges = []
+                upload_session.upload_received_bytes = 0
+                session.add(upload_session)
+            await session.commit()
+            await session.refresh(upload_session)
+        return upload_session
+
+    async def get_upload_session(self , upload_project_id: int , upload_uuid: str):
+        try:
+            upload_uuid = uuid.UUID(str(upload_uuid))
+        except ValueError:
+            return None
+
+        async with self.db_client() as session:
+            result = await session.execute(
+                select(UploadSession).where(
+                    UploadSession.upload_project_id == upload_project_id,
+                    UploadSession.upload_uuid == upload_uuid
+                )
+            )
+            upload_session = result.scalar_one_or_none()
+        return upload_session
+
+    async def add_received_range(self , upload_id: int , start: int , end: int):
+        # ranges of the same upload can arrive in parallel , the row lock serializes the merge
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(UploadSession).where(UploadSession.upload_id == upload_id).with_for_update()
+                )
+                upload_session = result.scalar_one_or_none()
+                if upload_session is None or upload_session.upload_status != UploadSessionStatusEnum.OPEN.value:
+                    return None
+
+                received_ranges = merge_ranges(upload_session.upload_received_ranges or [] , start , end)
+                upload_session.upload_received_ranges = received_ranges
+                upload_session.upload_received_bytes = sum(range_end - range_start for range_start , range_end in received_ranges)
+            await session.commit()
+        return upload_session
+
+    async def complete_upload_session(self , upload_id: int , asset: Asset):
+        # the asset row and the session status change in the same transaction
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(UploadSession).where(UploadSession.upload_id == upload_id).with_for_update()
+                )
+                upload_session = result.scalar_one_or_none()
+                if upload_session is None or upload_session.upload_status != UploadSessionStatusEnum.OPEN.value:
+                    return None
+
+                session.add(asset)
+                await session.flush()
+                upload_session.upload_status = UploadSessionStatusEnum.COMPLETED.value
+                upload_session.upload_asset_id = asset.asset_id
+                upload_session.finished_at = datetime.now(timezone.utc)
+            await session.commit()
+            await session.refresh(asset)
+        return asset
+
+    async def abort_upload_session(self , upload_id: int):
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(UploadSession).where(UploadSession.upload_id == upload_id).with_for_update()
+                )
+                upload_session = result.scalar_one_or_none()
+                if upload_session is None or upload_session.upload_status != UploadSessionStatusEnum.OPEN.value:
+                    return None
+
+                upload_session.upload_status = UploadSessionStatusEnum.ABORTED.value
+                upload_session.finished_at = datetime.now(timezone.utc)
+            await session.commit()
+        return upload_session
@@ -1 +1 @@
-from .minirag.schemes import Project , DataChunk, RetrievedDocument , Asset
\ No newline at end of file
+from .minirag.schemes import Project , DataChunk, RetrievedDocument , Asset , ProcessingJob , ProcessingJobFile , UploadSession , EmbeddingCache
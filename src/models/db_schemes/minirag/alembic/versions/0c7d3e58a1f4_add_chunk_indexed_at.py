@@ -0,0 +1,30 @@
+"""add chunk indexed at
+
+Revision ID: 0c7d3e58a1f4
+Revises: f5c2a9d7e013
+Create Date: 2026-10-18 21:14:09.532871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c7d3e58a1f4'
+down_revision: Union[str, None] = 'f5c2a9d7e013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing chunks start as not indexed , the first push after the upgrade should use do_reset=1
+    op.add_column('chunks', sa.Column('chunk_indexed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('idx_chunk_project_id_unindexed', 'chunks', ['chunk_project_id', 'chunk_id'], unique=False,
+                    postgresql_where=sa.text('chunk_indexed_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_chunk_project_id_unindexed', table_name='chunks', postgresql_where=sa.text('chunk_indexed_at IS NULL'))
+    op.drop_column('chunks', 'chunk_indexed_at')
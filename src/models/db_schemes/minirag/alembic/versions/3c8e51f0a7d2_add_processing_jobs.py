@@ -0,0 +1,65 @@
+"""add processing jobs
+
+Revision ID: 3c8e51f0a7d2
+Revises: 26b0d86ee351
+Create Date: 2026-10-18 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e51f0a7d2'
+down_revision: Union[str, None] = '26b0d86ee351'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('processing_jobs',
+    sa.Column('job_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('job_uuid', sa.UUID(), nullable=False),
+    sa.Column('job_status', sa.String(), nullable=False),
+    sa.Column('job_params', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('job_error', sa.String(), nullable=True),
+    sa.Column('job_attempts', sa.Integer(), nullable=False),
+    sa.Column('job_locked_by', sa.String(), nullable=True),
+    sa.Column('job_heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('job_project_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['job_project_id'], ['projects.project_id'], ),
+    sa.PrimaryKeyConstraint('job_id'),
+    sa.UniqueConstraint('job_uuid')
+    )
+    op.create_index('idx_processing_job_status', 'processing_jobs', ['job_status', 'job_id'], unique=False)
+    op.create_index('idx_processing_job_project_id', 'processing_jobs', ['job_project_id'], unique=False)
+    op.create_table('processing_job_files',
+    sa.Column('job_file_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('job_file_status', sa.String(), nullable=False),
+    sa.Column('job_file_inserted_chunks', sa.Integer(), nullable=False),
+    sa.Column('job_file_error', sa.String(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('job_file_job_id', sa.Integer(), nullable=False),
+    sa.Column('job_file_asset_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['job_file_asset_id'], ['assets.asset_id'], ),
+    sa.ForeignKeyConstraint(['job_file_job_id'], ['processing_jobs.job_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_file_id')
+    )
+    op.create_index('idx_processing_job_file_job_id', 'processing_job_files', ['job_file_job_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_processing_job_file_job_id', table_name='processing_job_files')
+    op.drop_table('processing_job_files')
+    op.drop_index('idx_processing_job_project_id', table_name='processing_jobs')
+    op.drop_index('idx_processing_job_status', table_name='processing_jobs')
+    op.drop_table('processing_jobs')
@@ -0,0 +1,26 @@
+"""add asset hash
+
+Revision ID: 9a4d7be21c53
+Revises: 3c8e51f0a7d2
+Create Date: 2026-10-18 14:05:12.771940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d7be21c53'
+down_revision: Union[str, None] = '3c8e51f0a7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('assets', sa.Column('asset_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('assets', 'asset_hash')
@@ -0,0 +1,32 @@
+"""add chunk job file id
+
+Revision ID: a6d1e9b4c352
+Revises: 0c7d3e58a1f4
+Create Date: 2026-10-19 09:41:27.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d1e9b4c352'
+down_revision: Union[str, None] = '0c7d3e58a1f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chunks', sa.Column('chunk_job_file_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('chunks_chunk_job_file_id_fkey', 'chunks', 'processing_job_files',
+                          ['chunk_job_file_id'], ['job_file_id'], ondelete='SET NULL')
+    op.create_index('idx_chunk_job_file_id', 'chunks', ['chunk_job_file_id'], unique=False,
+                    postgresql_where=sa.text('chunk_job_file_id IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_chunk_job_file_id', table_name='chunks', postgresql_where=sa.text('chunk_job_file_id IS NOT NULL'))
+    op.drop_constraint('chunks_chunk_job_file_id_fkey', 'chunks', type_='foreignkey')
+    op.drop_column('chunks', 'chunk_job_file_id')
@@ -0,0 +1,50 @@
+"""add upload sessions
+
+Revision ID: b7e2c94f1d08
+Revises: 9a4d7be21c53
+Create Date: 2026-10-18 15:32:47.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c94f1d08'
+down_revision: Union[str, None] = '9a4d7be21c53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('upload_sessions',
+    sa.Column('upload_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('upload_uuid', sa.UUID(), nullable=False),
+    sa.Column('upload_status', sa.String(), nullable=False),
+    sa.Column('upload_file_name', sa.String(), nullable=False),
+    sa.Column('upload_file_id', sa.String(), nullable=False),
+    sa.Column('upload_content_type', sa.String(), nullable=False),
+    sa.Column('upload_file_size', sa.BigInteger(), nullable=False),
+    sa.Column('upload_received_ranges', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('upload_received_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('upload_project_id', sa.Integer(), nullable=False),
+    sa.Column('upload_asset_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['upload_project_id'], ['projects.project_id'], ),
+    sa.ForeignKeyConstraint(['upload_asset_id'], ['assets.asset_id'], ),
+    sa.PrimaryKeyConstraint('upload_id'),
+    sa.UniqueConstraint('upload_uuid')
+    )
+    op.create_index('idx_upload_session_project_id', 'upload_sessions', ['upload_project_id'], unique=False)
+    # files uploaded through sessions can be larger than 2 GB
+    op.alter_column('assets', 'asset_size', existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('assets', 'asset_size', existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=False)
+    op.drop_index('idx_upload_session_project_id', table_name='upload_sessions')
+    op.drop_table('upload_sessions')
@@ -0,0 +1,30 @@
+"""add chunk project keyset index
+
+Revision ID: e41f6a0c8b37
+Revises: b7e2c94f1d08
+Create Date: 2026-10-18 17:11:05.634902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41f6a0c8b37'
+down_revision: Union[str, None] = 'b7e2c94f1d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (chunk_project_id , chunk_id) serves the keyset scans (chunk_id > last_id ORDER BY chunk_id)
+    # and every lookup by project , the single column index is not needed anymore
+    op.create_index('idx_chunk_project_id_chunk_id', 'chunks', ['chunk_project_id', 'chunk_id'], unique=False)
+    op.drop_index('idx_chunk_project_id', table_name='chunks')
+
+
+def downgrade() -> None:
+    op.create_index('idx_chunk_project_id', 'chunks', ['chunk_project_id'], unique=False)
+    op.drop_index('idx_chunk_project_id_chunk_id', table_name='chunks')
@@ -0,0 +1,40 @@
+"""add embedding cache
+
+Revision ID: f5c2a9d7e013
+Revises: e41f6a0c8b37
+Create Date: 2026-10-18 19:02:41.117530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c2a9d7e013'
+down_revision: Union[str, None] = 'e41f6a0c8b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('embedding_cache',
+    sa.Column('cache_id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('cache_backend', sa.String(), nullable=False),
+    sa.Column('cache_model_id', sa.String(), nullable=False),
+    sa.Column('cache_embedding_size', sa.Integer(), nullable=False),
+    sa.Column('cache_document_type', sa.String(), nullable=False),
+    sa.Column('cache_text_hash', sa.String(length=64), nullable=False),
+    sa.Column('cache_vector', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('cache_id')
+    )
+    op.create_index('idx_embedding_cache_key', 'embedding_cache',
+                    ['cache_backend', 'cache_model_id', 'cache_embedding_size', 'cache_document_type', 'cache_text_hash'],
+                    unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_embedding_cache_key', table_name='embedding_cache')
+    op.drop_table('embedding_cache')
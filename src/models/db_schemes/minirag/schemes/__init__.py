@@ -1,4 +1,7 @@
 from .minirag_base import SQLAlchemyBase
 from .asset import Asset
 from .project import Project
-from .datachunk import DataChunk , RetrievedDocument
\ No newline at end of file
+from .datachunk import DataChunk , RetrievedDocument
+from .processing_job import ProcessingJob , ProcessingJobFile
+from .upload_session import UploadSession
+from .embedding_cache import EmbeddingCache
@@ -1,5 +1,5 @@
 from .minirag_base import SQLAlchemyBase
-from sqlalchemy import Column, Index, Integer, String, DateTime , ForeignKey , func
+from sqlalchemy import Column, Index, Integer, BigInteger, String, DateTime , ForeignKey , func
 from sqlalchemy.dialects.postgresql import UUID , JSONB
 from sqlalchemy.orm import relationship
 import uuid
@@ -13,8 +13,11 @@ class Asset(SQLAlchemyBase):
     
     asset_type = Column(String , nullable=False)
     asset_name = Column(String , nullable=False) 
-    asset_size = Column(Integer , nullable=False)
+    asset_size = Column(BigInteger , nullable=False)
+    # sha256 of the file content , computed while the upload is streamed to disk
+    asset_hash = Column(String(64) , nullable=True)
     #metadata : thwo types of json in sqlalchemy : JSON : slow in reading and fast in writing and JSONB (binary json) fast in reading and slow in writing
+    # asset_config["processing"] keeps the content hash and the chunking parameters of the current chunks
     asset_config = Column(JSONB , nullable=True)
     
     created_at = Column(DateTime(timezone=True) , server_default=func.now() , nullable=False)
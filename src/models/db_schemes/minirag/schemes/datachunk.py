@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from .minirag_base import SQLAlchemyBase
-from sqlalchemy import Column, Index, Integer, String, DateTime , ForeignKey , func
+from sqlalchemy import Column, Index, Integer, String, DateTime , ForeignKey , func , text
 from sqlalchemy.dialects.postgresql import UUID , JSONB
 from sqlalchemy.orm import relationship
 import uuid
@@ -21,12 +21,22 @@ class DataChunk(SQLAlchemyBase):
     
     created_at = Column(DateTime(timezone=True) , server_default=func.now() , nullable=False)
     updated_at = Column(DateTime(timezone=True) , server_default=func.now() , onupdate=func.now() , nullable=True)
+    # set once the chunk vector is in the project collection , NULL = still to be pushed
+    chunk_indexed_at = Column(DateTime(timezone=True) , nullable=True)
+    # the processing job file that wrote the chunk , a failed attempt drops exactly its own chunks
+    chunk_job_file_id = Column(Integer, ForeignKey("processing_job_files.job_file_id", ondelete="SET NULL"), nullable=True)
 
     project = relationship("Project", back_populates="chunks")
     asset = relationship("Asset", back_populates="chunks")
     __table_args__ = (
-        Index('idx_chunk_project_id', 'chunk_project_id'),
+        # keyset pagination of a project's chunks (chunk_id > last_id ORDER BY chunk_id)
+        Index('idx_chunk_project_id_chunk_id', 'chunk_project_id', 'chunk_id'),
         Index('idx_chunk_asset_id', 'chunk_asset_id'),
+        # incremental push : only the chunks that are not in the collection yet
+        Index('idx_chunk_project_id_unindexed', 'chunk_project_id', 'chunk_id',
+              postgresql_where=text('chunk_indexed_at IS NULL')),
+        Index('idx_chunk_job_file_id', 'chunk_job_file_id',
+              postgresql_where=text('chunk_job_file_id IS NOT NULL')),
     )
     
 class RetrievedDocument(BaseModel):
@@ -0,0 +1,29 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, Index, Integer, BigInteger, String, DateTime , LargeBinary , func
+
+
+class EmbeddingCache(SQLAlchemyBase):
+    __tablename__ = "embedding_cache"
+
+    cache_id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    # the vector of a text only depends on the backend , the model , its size and the document type
+    cache_backend = Column(String , nullable=False)
+    cache_model_id = Column(String , nullable=False)
+    cache_embedding_size = Column(Integer , nullable=False)
+    cache_document_type = Column(String , nullable=False)
+    # sha256 of the text , the text itself is not stored
+    cache_text_hash = Column(String(64) , nullable=False)
+
+    # float32 little endian , 4 bytes per dimension
+    cache_vector = Column(LargeBinary , nullable=False)
+
+    created_at = Column(DateTime(timezone=True) , server_default=func.now() , nullable=False)
+
+    __table_args__ = (
+        Index(
+            "idx_embedding_cache_key",
+            "cache_backend", "cache_model_id", "cache_embedding_size", "cache_document_type", "cache_text_hash",
+            unique=True
+        ),
+    )
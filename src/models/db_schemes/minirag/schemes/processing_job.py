@@ -0,0 +1,61 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, Index, Integer, String, DateTime , ForeignKey , func
+from sqlalchemy.dialects.postgresql import UUID , JSONB
+from sqlalchemy.orm import relationship
+import uuid
+
+
+class ProcessingJob(SQLAlchemyBase):
+    __tablename__ = "processing_jobs"
+
+    job_id = Column(Integer, primary_key=True, autoincrement=True)
+    job_uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+
+    job_status = Column(String , nullable=False)
+    # the ProcessRequest payload (chunk_size , overlap_size , do_reset ...)
+    job_params = Column(JSONB , nullable=True)
+    job_error = Column(String , nullable=True)
+
+    # a job can be claimed again if the worker holding it stops sending heartbeats
+    job_attempts = Column(Integer , nullable=False , default=0)
+    job_locked_by = Column(String , nullable=True)
+    job_heartbeat_at = Column(DateTime(timezone=True) , nullable=True)
+
+    started_at = Column(DateTime(timezone=True) , nullable=True)
+    finished_at = Column(DateTime(timezone=True) , nullable=True)
+    created_at = Column(DateTime(timezone=True) , server_default=func.now() , nullable=False)
+    updated_at = Column(DateTime(timezone=True) , server_default=func.now() , onupdate=func.now() , nullable=True)
+
+    job_project_id = Column(Integer , ForeignKey("projects.project_id") , nullable=False)
+    project = relationship("Project", back_populates="processing_jobs")
+    files = relationship("ProcessingJobFile", back_populates="job")
+
+    __table_args__ = (
+        # workers poll the queue by status , ordered by job_id
+        Index("idx_processing_job_status", "job_status", "job_id"),
+        Index("idx_processing_job_project_id", "job_project_id"),
+    )
+
+
+class ProcessingJobFile(SQLAlchemyBase):
+    __tablename__ = "processing_job_files"
+
+    job_file_id = Column(Integer, primary_key=True, autoincrement=True)
+
+    job_file_status = Column(String , nullable=False)
+    job_file_inserted_chunks = Column(Integer , nullable=False , default=0)
+    job_file_error = Column(String , nullable=True)
+
+    started_at = Column(DateTime(timezone=True) , nullable=True)
+    finished_at = Column(DateTime(timezone=True) , nullable=True)
+    created_at = Column(DateTime(timezone=True) , server_default=func.now() , nullable=False)
+    updated_at = Column(DateTime(timezone=True) , server_default=func.now() , onupdate=func.now() , nullable=True)
+
+    job_file_job_id = Column(Integer , ForeignKey("processing_jobs.job_id" , ondelete="CASCADE") , nullable=False)
+    job_file_asset_id = Column(Integer , ForeignKey("assets.asset_id") , nullable=False)
+    job = relationship("ProcessingJob", back_populates="files")
+    asset = relationship("Asset")
+
+    __table_args__ = (
+        Index("idx_processing_job_file_job_id", "job_file_job_id"),
+    )
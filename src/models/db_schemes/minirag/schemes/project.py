@@ -19,6 +19,8 @@ class Project(SQLAlchemyBase):
     
     assets = relationship("Asset", back_populates="project")
     chunks = relationship("DataChunk", back_populates="project")
+    processing_jobs = relationship("ProcessingJob", back_populates="project")
+    upload_sessions = relationship("UploadSession", back_populates="project")
     
     
 
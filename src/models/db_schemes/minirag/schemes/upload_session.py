@@ -0,0 +1,38 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, Index, Integer, BigInteger, String, DateTime , ForeignKey , func
+from sqlalchemy.dialects.postgresql import UUID , JSONB
+from sqlalchemy.orm import relationship
+import uuid
+
+
+class UploadSession(SQLAlchemyBase):
+    __tablename__ = "upload_sessions"
+
+    upload_id = Column(Integer, primary_key=True, autoincrement=True)
+    # the uuid is the public id used in the upload urls
+    upload_uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+
+    upload_status = Column(String , nullable=False)
+    upload_file_name = Column(String , nullable=False)
+    # the asset name reserved for the file , the partial file is "<upload_file_id>.part" in the project directory
+    upload_file_id = Column(String , nullable=False)
+    upload_content_type = Column(String , nullable=False)
+    upload_file_size = Column(BigInteger , nullable=False)
+
+    # merged [start , end) byte ranges already written to the partial file
+    upload_received_ranges = Column(JSONB , nullable=False , default=list)
+    upload_received_bytes = Column(BigInteger , nullable=False , default=0)
+
+    created_at = Column(DateTime(timezone=True) , server_default=func.now() , nullable=False)
+    updated_at = Column(DateTime(timezone=True) , server_default=func.now() , onupdate=func.now() , nullable=True)
+    finished_at = Column(DateTime(timezone=True) , nullable=True)
+
+    upload_project_id = Column(Integer , ForeignKey("projects.project_id") , nullable=False)
+    # set at finalize , the asset is only created once the whole file is on disk
+    upload_asset_id = Column(Integer , ForeignKey("assets.asset_id") , nullable=True)
+
+    project = relationship("Project", back_populates="upload_sessions")
+
+    __table_args__ = (
+        Index("idx_upload_session_project_id", "upload_project_id"),
+    )
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class UploadSessionStatusEnum(Enum):
+    OPEN = "open"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
@@ -21,4 +21,27 @@ class ResponseSignal(Enum):
     VECTOR_SEARCH_SUCCESS = "vectordb_search_success"
     RAG_ANSWER_GENERATION_ERROR = "rag_answer_error"
     RAG_ANSWER_GENERATION_SUCCESS = "rag_answer_success"
-    
\ No newline at end of file
+    PROCESSING_JOB_ENQUEUED = "processing_job_enqueued"
+    PROCESSING_JOB_NOT_FOUND = "processing_job_not_found"
+    PROCESSING_JOB_RETRIEVED = "processing_job_retrieved"
+    SPLITTER_MODE_NOT_SUPPORTED = "splitter_mode_not_supported"
+    UPLOAD_SESSION_CREATED = "upload_session_created"
+    UPLOAD_SESSION_RETRIEVED = "upload_session_retrieved"
+    UPLOAD_SESSION_NOT_FOUND = "upload_session_not_found"
+    UPLOAD_SESSION_CLOSED = "upload_session_closed"
+    UPLOAD_SESSION_INCOMPLETE = "upload_session_incomplete"
+    UPLOAD_SESSION_ABORTED = "upload_session_aborted"
+    UPLOAD_RANGE_INVALID = "upload_range_invalid"
+    UPLOAD_RANGE_SIZE_EXCEEDED = "upload_range_size_exceeded"
+    UPLOAD_RANGE_SIZE_MISMATCH = "upload_range_size_mismatch"
+    UPLOAD_RANGE_RECEIVED = "upload_range_received"
+    BATCH_UPLOAD_SUCCESS = "batch_upload_success"
+    BATCH_UPLOAD_FAILED = "batch_upload_failed"
+    BATCH_UPLOAD_TOO_MANY_FILES = "batch_upload_too_many_files"
+    VECTORDB_COLLECTION_NOT_FOUND = "vectordb_collection_not_found"
+    VECTORDB_INDEX_BUILD_STARTED = "vectordb_index_build_started"
+    VECTORDB_INDEX_BUILD_RUNNING = "vectordb_index_build_running"
+    VECTORDB_INDEX_BUILD_RETRIEVED = "vectordb_index_build_retrieved"
+    VECTORDB_INDEX_BUILD_NOT_SUPPORTED = "vectordb_index_build_not_supported"
+    VECTORDB_INDEX_TYPE_NOT_SUPPORTED = "vectordb_index_type_not_supported"
+    VECTORDB_QUANTIZATION_NOT_SUPPORTED = "vectordb_quantization_not_supported"
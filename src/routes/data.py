@@ -1,17 +1,24 @@
-from fastapi import FastAPI, APIRouter, Depends, UploadFile, status , Request
+from fastapi import FastAPI, APIRouter, Depends, UploadFile, status , Request , Header
 from fastapi.responses import JSONResponse
 import os
 from helpers.config import get_settings, Settings
 from controllers import DataController, ProjectController, ProcessController
 import aiofiles
+import hashlib
+import asyncio
+from typing import List
 from models import ResponseSignal
 import logging
-from .schemes.data import ProcessRequest
+from .schemes.data import ProcessRequest , UploadSessionRequest
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
 from models.AssetModel import AssetModel
-from models.db_schemes import DataChunk , Asset
+from models.ProcessingJobModel import ProcessingJobModel
+from models.UploadSessionModel import UploadSessionModel , get_missing_ranges
+from models.db_schemes import DataChunk , Asset , ProcessingJob , UploadSession
 from models.enums.AssetTypeEnum import AssetTypeEnum
+from models.enums.UploadSessionEnum import UploadSessionStatusEnum
+from splitters.SplitterEnums import SplitterEnums
 from controllers import NLPController
 
 logger = logging.getLogger('uvicorn.error')
@@ -21,6 +28,17 @@ data_router = APIRouter(
     tags=["api_v1", "data"],
 )
 
+async def write_uploaded_file(file: UploadFile , file_path: str , block_size: int):
+    # the content hash is computed on the stream , the file is never read twice
+    file_hash = hashlib.sha256()
+    file_size = 0
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(block_size):
+            file_hash.update(chunk)
+            file_size += len(chunk)
+            await f.write(chunk)
+    return file_size , file_hash.hexdigest()
+
 @data_router.post("/upload/{project_id}")
 async def upload_data(request:Request , project_id: int, file: UploadFile,
                       app_settings: Settings = Depends(get_settings)):
@@ -49,9 +67,9 @@ async def upload_data(request:Request , project_id: int, file: UploadFile,
     )
 
     try:
-        async with aiofiles.open(file_path, "wb") as f:
-            while chunk := await file.read(app_settings.FILE_DEFAULT_CHUNK_SIZE):
-                await f.write(chunk)
+        file_size , file_hash = await write_uploaded_file(
+            file=file, file_path=file_path, block_size=app_settings.FILE_DEFAULT_CHUNK_SIZE
+        )
     except Exception as e:
 
         logger.error(f"Error while uploading file: {e}")
@@ -68,8 +86,8 @@ async def upload_data(request:Request , project_id: int, file: UploadFile,
         asset_project_id=project.project_id,
         asset_type=AssetTypeEnum.FILE.value,
         asset_name=file_id,
-        asset_size=os.path.getsize(file_path)
-        
+        asset_size=file_size,
+        asset_hash=file_hash
     )
     asset_record = await asset_model.create_asset(asset=asset_ressource)
 
@@ -81,30 +99,413 @@ async def upload_data(request:Request , project_id: int, file: UploadFile,
             }
         )
 
+@data_router.post("/upload/{project_id}/batch")
+async def upload_data_batch(request:Request , project_id: int, files: List[UploadFile],
+                            app_settings: Settings = Depends(get_settings)):
+
+    # many files in one request : one project lookup , concurrent writes and a single bulk insert of the assets
+    if len(files) > app_settings.UPLOAD_BATCH_MAX_FILES:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.BATCH_UPLOAD_TOO_MANY_FILES.value,
+                "max_files": app_settings.UPLOAD_BATCH_MAX_FILES
+            }
+        )
+
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    data_controller = DataController()
+    # one result per file , in the order of the request
+    results = [{"file_name": file.filename} for file in files]
+
+    valid_files = []
+    for index , file in enumerate(files):
+        is_valid, result_signal = data_controller.validate_uploaded_file(file=file)
+        if not is_valid:
+            results[index]["signal"] = result_signal
+            continue
+        file_path, file_id = data_controller.generate_unique_file_name(
+            original_file_name=file.filename,
+            project_id=project_id
+        )
+        valid_files.append((index , file , file_path , file_id))
+
+    semaphore = asyncio.Semaphore(app_settings.UPLOAD_BATCH_WRITE_CONCURRENCY)
+
+    async def write_file(file: UploadFile , file_path: str):
+        async with semaphore:
+            return await write_uploaded_file(
+                file=file, file_path=file_path, block_size=app_settings.FILE_DEFAULT_CHUNK_SIZE
+            )
+
+    written = await asyncio.gather(
+        *[write_file(file=file, file_path=file_path) for _ , file , file_path , _ in valid_files],
+        return_exceptions=True
+    )
+
+    assets_rows = []
+    for (index , file , file_path , file_id) , write_result in zip(valid_files , written):
+        if isinstance(write_result , Exception):
+            logger.error(f"Error while uploading file {file.filename}: {write_result}")
+            results[index]["signal"] = ResponseSignal.FILE_UPLOAD_FAILED.value
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            continue
+
+        file_size , file_hash = write_result
+        results[index]["file_id"] = file_id
+        assets_rows.append({
+            "asset_project_id": project.project_id,
+            "asset_type": AssetTypeEnum.FILE.value,
+            "asset_name": file_id,
+            "asset_size": file_size,
+            "asset_hash": file_hash,
+        })
+
+    assets_ids = {}
+    if len(assets_rows):
+        asset_model = await AssetModel.create_instance(db_client=request.app.db_client)
+        try:
+            assets_ids = await asset_model.insert_many_assets(rows=assets_rows)
+        except Exception as e:
+            logger.error(f"Error while inserting the batch assets: {e}")
+            project_dir_path = ProjectController().get_project_path(project_id=project_id)
+            for row in assets_rows:
+                os.remove(os.path.join(project_dir_path, row["asset_name"]))
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={
+                    "signal": ResponseSignal.BATCH_UPLOAD_FAILED.value
+                }
+            )
+
+    for result in results:
+        if "file_id" in result:
+            result["signal"] = ResponseSignal.FILE_UPLOAD_SUCCESS.value
+            result["asset_id"] = str(assets_ids.get(result["file_id"]))
+
+    uploaded_count = len(assets_ids)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if uploaded_count else status.HTTP_400_BAD_REQUEST,
+        content={
+            "signal": ResponseSignal.BATCH_UPLOAD_SUCCESS.value if uploaded_count else ResponseSignal.BATCH_UPLOAD_FAILED.value,
+            "project_id": project.project_id,
+            "uploaded_count": uploaded_count,
+            "failed_count": len(files) - uploaded_count,
+            "files": results
+        }
+    )
+
+@data_router.post("/ingest/{project_id}")
+async def ingest_data(request:Request , project_id: int , file: UploadFile ,
+                      process_request: ProcessRequest = Depends() ,
+                      app_settings: Settings = Depends(get_settings)):
+
+    # upload + process + index in one call : the file is written once , then a fused job
+    # streams it through parse -> chunk -> embed -> vector insert (chunking options are query parameters)
+    if process_request.splitter_mode not in [mode.value for mode in SplitterEnums]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.SPLITTER_MODE_NOT_SUPPORTED.value
+            }
+        )
+
+    data_controller = DataController()
+    is_valid, result_signal = data_controller.validate_uploaded_file(file=file)
+    if not is_valid:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": result_signal
+            }
+        )
+
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    file_path, file_id = data_controller.generate_unique_file_name(
+        original_file_name=file.filename,
+        project_id=project_id
+    )
+    try:
+        file_size , file_hash = await write_uploaded_file(
+            file=file, file_path=file_path, block_size=app_settings.FILE_DEFAULT_CHUNK_SIZE
+        )
+    except Exception as e:
+        logger.error(f"Error while uploading file: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.FILE_UPLOAD_FAILED.value
+            }
+        )
+
+    asset_model = await AssetModel.create_instance(db_client=request.app.db_client)
+    asset_record = await asset_model.create_asset(asset=Asset(
+        asset_project_id=project.project_id,
+        asset_type=AssetTypeEnum.FILE.value,
+        asset_name=file_id,
+        asset_size=file_size,
+        asset_hash=file_hash
+    ))
+
+    job_params = process_request.dict()
+    job_params.update({"file_id": file_id, "index_chunks": 1})
+
+    job_model = await ProcessingJobModel.create_instance(db_client=request.app.db_client)
+    job_record = await job_model.create_job(
+        job=ProcessingJob(
+            job_project_id=project.project_id,
+            job_params=job_params,
+        ),
+        asset_ids=[asset_record.asset_id]
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": ResponseSignal.PROCESSING_JOB_ENQUEUED.value,
+            "file_id": file_id,
+            "asset_id": str(asset_record.asset_id),
+            "job_id": job_record.job_id,
+            "job_uuid": str(job_record.job_uuid),
+        }
+    )
+
+# resumable uploads : create a session , PUT byte ranges (in any order , in parallel if needed) , then finalize.
+# the ranges are written into "<file_id>.part" in the project directory , the asset is created at finalize.
+def get_upload_session_content(upload_session: UploadSession):
+    return {
+        "upload_id": str(upload_session.upload_uuid),
+        "status": upload_session.upload_status,
+        "file_id": upload_session.upload_file_id,
+        "file_size": upload_session.upload_file_size,
+        "received_bytes": upload_session.upload_received_bytes,
+        "missing_ranges": get_missing_ranges(
+            upload_session.upload_received_ranges or [], upload_session.upload_file_size
+        ),
+    }
+
+def upload_session_error(status_code: int , signal: str , **content):
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "signal": signal,
+            **content
+        }
+    )
+
+@data_router.post("/upload/{project_id}/sessions")
+async def create_upload_session(request:Request , project_id: int , upload_request: UploadSessionRequest ,
+                                app_settings: Settings = Depends(get_settings)):
+
+    data_controller = DataController()
+    is_valid, result_signal = data_controller.validate_upload_session(
+        content_type=upload_request.content_type,
+        file_size=upload_request.file_size
+    )
+    if not is_valid:
+        return upload_session_error(status.HTTP_400_BAD_REQUEST, result_signal)
+
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    _, file_id = data_controller.generate_unique_file_name(
+        original_file_name=upload_request.file_name,
+        project_id=project_id
+    )
+
+    # sparse file of the final size , every range is written at its own offset
+    partial_file_path = data_controller.get_partial_file_path(file_id=file_id, project_id=project_id)
+    async with aiofiles.open(partial_file_path, "wb") as f:
+        await f.truncate(upload_request.file_size)
+
+    upload_model = await UploadSessionModel.create_instance(db_client=request.app.db_client)
+    upload_session = await upload_model.create_upload_session(
+        upload_session=UploadSession(
+            upload_project_id=project.project_id,
+            upload_file_name=upload_request.file_name,
+            upload_file_id=file_id,
+            upload_content_type=upload_request.content_type,
+            upload_file_size=upload_request.file_size,
+        )
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "signal": ResponseSignal.UPLOAD_SESSION_CREATED.value,
+            "max_range_size": app_settings.UPLOAD_SESSION_MAX_RANGE_SIZE * 1024 * 1024,
+            **get_upload_session_content(upload_session)
+        }
+    )
+
+@data_router.get("/upload/{project_id}/sessions/{upload_id}")
+async def get_upload_session(request:Request , project_id: int , upload_id: str):
+
+    upload_model = await UploadSessionModel.create_instance(db_client=request.app.db_client)
+    upload_session = await upload_model.get_upload_session(upload_project_id=project_id, upload_uuid=upload_id)
+    if upload_session is None:
+        return upload_session_error(status.HTTP_404_NOT_FOUND, ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value)
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.UPLOAD_SESSION_RETRIEVED.value,
+            **get_upload_session_content(upload_session)
+        }
+    )
+
+@data_router.put("/upload/{project_id}/sessions/{upload_id}")
+async def upload_session_range(request:Request , project_id: int , upload_id: str ,
+                               content_range: str = Header(None)):
+
+    upload_model = await UploadSessionModel.create_instance(db_client=request.app.db_client)
+    upload_session = await upload_model.get_upload_session(upload_project_id=project_id, upload_uuid=upload_id)
+    if upload_session is None:
+        return upload_session_error(status.HTTP_404_NOT_FOUND, ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value)
+    if upload_session.upload_status != UploadSessionStatusEnum.OPEN.value:
+        return upload_session_error(status.HTTP_409_CONFLICT, ResponseSignal.UPLOAD_SESSION_CLOSED.value)
+
+    data_controller = DataController()
+    byte_range = data_controller.parse_content_range(
+        content_range=content_range, file_size=upload_session.upload_file_size
+    )
+    if byte_range is None:
+        return upload_session_error(status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, ResponseSignal.UPLOAD_RANGE_INVALID.value)
+
+    start , end = byte_range
+    is_valid, result_signal = data_controller.validate_upload_range(start=start, end=end)
+    if not is_valid:
+        return upload_session_error(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, result_signal)
+
+    partial_file_path = data_controller.get_partial_file_path(file_id=upload_session.upload_file_id, project_id=project_id)
+
+    # the body is streamed to its offset , a range that sends more bytes than announced is cut right away
+    received = 0
+    try:
+        async with aiofiles.open(partial_file_path, "r+b") as f:
+            await f.seek(start)
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > end - start:
+                    break
+                await f.write(chunk)
+    except Exception as e:
+        logger.error(f"Error while writing upload range: {e}")
+        return upload_session_error(status.HTTP_400_BAD_REQUEST, ResponseSignal.FILE_UPLOAD_FAILED.value)
+
+    # nothing is recorded for a short or oversized body , the client sends the range again
+    if received != end - start:
+        return upload_session_error(status.HTTP_400_BAD_REQUEST, ResponseSignal.UPLOAD_RANGE_SIZE_MISMATCH.value)
+
+    upload_session = await upload_model.add_received_range(upload_id=upload_session.upload_id, start=start, end=end)
+    if upload_session is None:
+        return upload_session_error(status.HTTP_409_CONFLICT, ResponseSignal.UPLOAD_SESSION_CLOSED.value)
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.UPLOAD_RANGE_RECEIVED.value,
+            **get_upload_session_content(upload_session)
+        }
+    )
+
+@data_router.post("/upload/{project_id}/sessions/{upload_id}/finalize")
+async def finalize_upload_session(request:Request , project_id: int , upload_id: str):
+
+    upload_model = await UploadSessionModel.create_instance(db_client=request.app.db_client)
+    upload_session = await upload_model.get_upload_session(upload_project_id=project_id, upload_uuid=upload_id)
+    if upload_session is None:
+        return upload_session_error(status.HTTP_404_NOT_FOUND, ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value)
+    if upload_session.upload_status != UploadSessionStatusEnum.OPEN.value:
+        return upload_session_error(status.HTTP_409_CONFLICT, ResponseSignal.UPLOAD_SESSION_CLOSED.value)
+
+    missing_ranges = get_missing_ranges(upload_session.upload_received_ranges or [], upload_session.upload_file_size)
+    if len(missing_ranges):
+        return upload_session_error(
+            status.HTTP_409_CONFLICT, ResponseSignal.UPLOAD_SESSION_INCOMPLETE.value,
+            missing_ranges=missing_ranges
+        )
+
+    data_controller = DataController()
+    partial_file_path = data_controller.get_partial_file_path(file_id=upload_session.upload_file_id, project_id=project_id)
+    file_path = os.path.join(ProjectController().get_project_path(project_id=project_id), upload_session.upload_file_id)
+
+    try:
+        # the ranges arrived in any order , the hash is computed once on the assembled file
+        file_hash = await request.app.parse_pool.hash_file(file_path=partial_file_path)
+        os.replace(partial_file_path, file_path)
+    except Exception as e:
+        logger.error(f"Error while finalizing upload: {e}")
+        return upload_session_error(status.HTTP_400_BAD_REQUEST, ResponseSignal.FILE_UPLOAD_FAILED.value)
+
+    asset_record = await upload_model.complete_upload_session(
+        upload_id=upload_session.upload_id,
+        asset=Asset(
+            asset_project_id=upload_session.upload_project_id,
+            asset_type=AssetTypeEnum.FILE.value,
+            asset_name=upload_session.upload_file_id,
+            asset_size=os.path.getsize(file_path),
+            asset_hash=file_hash
+        )
+    )
+    if asset_record is None:
+        # aborted by a concurrent request in the meantime
+        os.remove(file_path)
+        return upload_session_error(status.HTTP_409_CONFLICT, ResponseSignal.UPLOAD_SESSION_CLOSED.value)
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+            "file_id": upload_session.upload_file_id,
+            "asset_id": str(asset_record.asset_id),
+        }
+    )
+
+@data_router.delete("/upload/{project_id}/sessions/{upload_id}")
+async def abort_upload_session(request:Request , project_id: int , upload_id: str):
+
+    upload_model = await UploadSessionModel.create_instance(db_client=request.app.db_client)
+    upload_session = await upload_model.get_upload_session(upload_project_id=project_id, upload_uuid=upload_id)
+    if upload_session is None:
+        return upload_session_error(status.HTTP_404_NOT_FOUND, ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value)
+
+    upload_session = await upload_model.abort_upload_session(upload_id=upload_session.upload_id)
+    if upload_session is None:
+        return upload_session_error(status.HTTP_409_CONFLICT, ResponseSignal.UPLOAD_SESSION_CLOSED.value)
+
+    partial_file_path = DataController().get_partial_file_path(file_id=upload_session.upload_file_id, project_id=project_id)
+    if os.path.exists(partial_file_path):
+        os.remove(partial_file_path)
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.UPLOAD_SESSION_ABORTED.value,
+            "upload_id": upload_id,
+        }
+    )
+
 @data_router.post("/process/{project_id}")
 async def process_endpoint(request:Request ,project_id: int, process_request: ProcessRequest):
 
-    chunk_size = process_request.chunk_size
-    overlap_size = process_request.overlap_size
-    do_reset = process_request.do_reset
-    
-    # # Add debugging
-    # logger.info(f"Received process_request: {process_request}")
-    # logger.info(f"do_reset value: {do_reset}, type: {type(do_reset)}")
-    
+    # the processing itself runs in the background workers (workers/ProcessingWorkerPool.py)
+    # here we only resolve the files and enqueue a job
+    if process_request.splitter_mode not in [mode.value for mode in SplitterEnums]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.SPLITTER_MODE_NOT_SUPPORTED.value
+            }
+        )
+
     project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
     
     project = await project_model.get_project_or_create_one(project_id=project_id)
     
     asset_model = await AssetModel.create_instance(db_client=request.app.db_client) 
     
-    nlpcontroller = NLPController(
-        generation_client =request.app.generation_client,
-        embedding_client = request.app.embedding_client,
-        vectordb_client = request.app.vectordb_client,
-        template_parser = request.app.template_parser
-    )
-    
     project_files_ids = {}
     
     if process_request.file_id:
@@ -135,68 +536,86 @@ async def process_endpoint(request:Request ,project_id: int, process_request: Pr
             }
         )
 
-    process_controller = ProcessController(project_id=project_id)
-    
-    no_records = 0
-    no_files = 0
-    
-    chunk_model = await ChunkModel.create_instance(db_client=request.app.db_client)
+    job_model = await ProcessingJobModel.create_instance(db_client=request.app.db_client)
+    job_record = await job_model.create_job(
+        job=ProcessingJob(
+            job_project_id=project.project_id,
+            job_params=process_request.dict(),
+        ),
+        asset_ids=list(project_files_ids.keys())
+    )
     
-    if do_reset == 1:
-        # delete associated vectors collection
-        collection_name = nlpcontroller.create_collection_name(project_id=project.project_id)
-        
-        _ = await request.app.vectordb_client.delete_collection(collection_name=collection_name)
-        
-        #delete associated chunks
-        _ = await chunk_model.delete_chunks_by_project_id(project_id = project.project_id)
-        
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": ResponseSignal.PROCESSING_JOB_ENQUEUED.value,
+            "job_id": job_record.job_id,
+            "job_uuid": str(job_record.job_uuid),
+            "files_count": len(project_files_ids)
+        }
+    )
 
-    
-    for asset_id , file_id in project_files_ids.items():
-        
-        file_content = process_controller.get_file_content(file_id=file_id)
+@data_router.get("/process/jobs/{job_id}")
+async def get_processing_job(request:Request , job_id: int):
 
-        if file_content is None:
-            logger.error(f"Error while processing file: {file_id}")
-            continue
+    job_model = await ProcessingJobModel.create_instance(db_client=request.app.db_client)
+    job = await job_model.get_job(job_id=job_id)
 
-        file_chunks = process_controller.process_file_content(
-            file_content=file_content,
-            file_id=file_id,
-            chunk_size=chunk_size,
-            chunk_overlap=overlap_size
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.PROCESSING_JOB_NOT_FOUND.value
+            }
         )
 
-        if file_chunks is None or len(file_chunks) == 0:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "signal": ResponseSignal.PROCESSING_FAILED.value
-                }
-            )
+    progress = await job_model.get_job_progress(job_id=job.job_id)
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.PROCESSING_JOB_RETRIEVED.value,
+            "job_id": job.job_id,
+            "job_uuid": str(job.job_uuid),
+            "project_id": job.job_project_id,
+            "status": job.job_status,
+            "error": job.job_error,
+            "attempts": job.job_attempts,
+            "progress": progress,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+    )
+
+@data_router.get("/process/jobs/{job_id}/files")
+async def get_processing_job_files(request:Request , job_id: int):
+
+    job_model = await ProcessingJobModel.create_instance(db_client=request.app.db_client)
+    job = await job_model.get_job(job_id=job_id)
+
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.PROCESSING_JOB_NOT_FOUND.value
+            }
+        )
+
+    job_files = await job_model.get_job_files(job_id=job.job_id)
 
-        
-                        
-        file_chunks_records = [
-            
-            DataChunk(
-                chunk_text = chunk.page_content ,
-                chunk_metadata = chunk.metadata,
-                chunk_order = i+1,
-                chunk_project_id = project.project_id,
-                chunk_asset_id = asset_id 
-            )
-            for i , chunk in enumerate(file_chunks)
-        ]
-        
-        no_records+= await chunk_model.insert_multiple_chunks(file_chunks_records)
-        no_files+=1
-    
     return JSONResponse(
         content={
-            "signal": ResponseSignal.FILE_CHUNKING_SUCCESS.value,
-            "inserted_chunks": no_records,
-            "processed_files":no_files
+            "signal": ResponseSignal.PROCESSING_JOB_RETRIEVED.value,
+            "job_id": job.job_id,
+            "status": job.job_status,
+            "files": [
+                {
+                    "asset_id": job_file.job_file_asset_id,
+                    "status": job_file.job_file_status,
+                    "inserted_chunks": job_file.job_file_inserted_chunks,
+                    "error": job_file.job_file_error,
+                }
+                for job_file in job_files
+            ]
         }
     )
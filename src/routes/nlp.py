@@ -1,10 +1,13 @@
-from fastapi import FastAPI , APIRouter , status , Request 
+from fastapi import FastAPI , APIRouter , status , Request , Depends
 from fastapi.responses import JSONResponse 
-from .schemes.nlp import PushRequestschema , SearchRequestschema
+from .schemes.nlp import PushRequestschema , SearchRequestschema , IndexBuildRequestschema
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
 from controllers import NLPController
+from workers import IndexingPipeline
 from models.enums.responseEnum import ResponseSignal
+from stores.vectordb.VectorDBEnums import PgVectorIndexTypeEnums , QdrantQuantizationEnums
+from helpers.config import get_settings , Settings
 import logging 
 from tqdm.auto import tqdm
 logger = logging.getLogger('uvicorn.error')
@@ -15,7 +18,8 @@ nlp_router = APIRouter(
 )
 
 @nlp_router.post("/index/push/{project_id}")
-async def index_project(request:Request , project_id :int ,push_request:PushRequestschema ):
+async def index_project(request:Request , project_id :int ,push_request:PushRequestschema ,
+                        app_settings: Settings = Depends(get_settings)):
     
     project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
     project = await project_model.get_project_or_create_one(project_id=project_id)
@@ -28,64 +32,82 @@ async def index_project(request:Request , project_id :int ,push_request:PushRequ
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"signal": ResponseSignal.PROJECT_NOT_FOUND.value}
         )
+    
+    if push_request.quantization is not None and \
+            push_request.quantization not in [quantization.value for quantization in QdrantQuantizationEnums]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_QUANTIZATION_NOT_SUPPORTED.value}
+        )
+    
     nlp_controller = NLPController(
         vectordb_client=request.app.vectordb_client,
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        embedding_batcher=request.app.embedding_batcher
     )
     
-    has_records = True
-    page_number = 1
-    inserted_items_count = 0
-    idx = 0 
-    
     
     # create collection if not exists 
     collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
     
-    _ = await request.app.vectordb_client.create_collection(
+    is_collection_created = await request.app.vectordb_client.create_collection(
         collection_name=collection_name,
         embedding_size=request.app.embedding_client.embedding_size,
-        do_reset=push_request.do_reset
+        do_reset=push_request.do_reset,
+        collection_options={
+            "quantization": push_request.quantization,
+            "quantization_always_ram": push_request.quantization_always_ram,
+            "on_disk": push_request.on_disk,
+            "hnsw_m": push_request.hnsw_m,
+            "hnsw_ef_construct": push_request.hnsw_ef_construct,
+        }
     )
+    # a new (or reset) collection is empty , all the chunks of the project are pushed again
+    if is_collection_created:
+        _ = await chunk_model.reset_project_chunks_indexed(project_id=project.project_id)
     
-    # setup batching 
-    total_chunks_count = await chunk_model.get_total_chunks_count(project_id=project.project_id)
+    # only the chunks that are not in the collection yet
+    total_chunks_count = await chunk_model.get_total_chunks_count(project_id=project.project_id , only_unindexed=True)
     
     # progress bar setup
     pbar = tqdm(total=total_chunks_count, desc="Vector Indexing Chunks", position = 0 )
     
-    while has_records:
-        page_chunks = await chunk_model.get_project_chunks(project_id=project.project_id , page_number = page_number)
-        
-        if len(page_chunks):
-            page_number += 1
-        
-        if not page_chunks or len(page_chunks) == 0:
-            has_records = False 
-            break
-        
-        # chunks_ids = list(range(idx, idx + len(page_chunks))) 
-        chunks_ids = [chunk.chunk_id for chunk in page_chunks] # original chunk id
-        idx += len(page_chunks)
-        
-        is_inserted = await nlp_controller.index_into_vector_db(
-            chunks=page_chunks,
-            project=project,
-            # do_reset = push_request.do_reset # error : the delete collection done already in create_collection in vectordbprovider PGvectorDBProvider or qdrantdbprovider alreday here it takes False
-            chunks_ids = chunks_ids
+    page_size = push_request.page_size or app_settings.INDEX_PUSH_PAGE_SIZE
+    use_server_cursor = push_request.use_server_cursor
+    if use_server_cursor is None:
+        use_server_cursor = app_settings.INDEX_PUSH_SERVER_CURSOR
+
+    # fetch (keyset pages) , embed and insert run as overlapping stages , see workers/IndexingPipeline.py
+    indexing_pipeline = IndexingPipeline(
+        nlp_controller=nlp_controller,
+        chunk_model=chunk_model,
+        collection_name=collection_name,
+        page_size=page_size,
+        use_server_cursor=use_server_cursor,
+        fetch_concurrency=app_settings.INDEX_PIPELINE_FETCH_CONCURRENCY,
+        embed_concurrency=app_settings.INDEX_PIPELINE_EMBED_CONCURRENCY,
+        insert_concurrency=app_settings.INDEX_PIPELINE_INSERT_CONCURRENCY,
+        queue_size=app_settings.INDEX_PIPELINE_QUEUE_SIZE,
+        on_inserted=pbar.update
+    )
+
+    try:
+        inserted_items_count = await indexing_pipeline.run(project_id=project.project_id)
+    except Exception as e:
+        logger.error(f"Error while inserting chunks into vector db for project {project.project_id}: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.INSERT_INTO_VECTORDB_ERROR.value}
         )
-        
-        if not is_inserted:
-            logger.error(f"Error while inserting chunks into vector db for project {project.project_id}")
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"signal": ResponseSignal.INSERT_INTO_VECTORDB_ERROR.value}
-            )
-        
-        pbar.update(len(page_chunks))
-        inserted_items_count += len(page_chunks)
+    finally:
+        pbar.close()
+    
+    # the vector index is built once the whole batch of chunks is in , in the background
+    if inserted_items_count and app_settings.VECTOR_DB_PGVECTOR_BUILD_INDEX_AFTER_PUSH:
+        _ = await request.app.vectordb_client.start_vector_index_build(collection_name=collection_name)
         
     return JSONResponse(
         content ={"signal": ResponseSignal.INSERT_INTO_VECTORDB_SUCCESS.value,
@@ -96,6 +118,86 @@ async def index_project(request:Request , project_id :int ,push_request:PushRequ
     )
         
     
+@nlp_router.post("/index/build/{project_id}")
+async def build_project_index(request:Request , project_id:int , build_request:IndexBuildRequestschema):
+    
+    if build_request.index_type is not None and \
+            build_request.index_type not in [index_type.value for index_type in PgVectorIndexTypeEnums]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_INDEX_TYPE_NOT_SUPPORTED.value}
+        )
+    
+    nlp_controller = NLPController(
+        vectordb_client=request.app.vectordb_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser
+    )
+    collection_name = nlp_controller.create_collection_name(project_id=project_id)
+    
+    is_collection_existed = await request.app.vectordb_client.is_collection_existed(collection_name=collection_name)
+    if not is_collection_existed:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"signal": ResponseSignal.VECTORDB_COLLECTION_NOT_FOUND.value}
+        )
+    
+    # CREATE INDEX CONCURRENTLY runs in the background , follow it with GET /index/build/{project_id}
+    is_started = await request.app.vectordb_client.start_vector_index_build(
+        collection_name=collection_name,
+        index_type=build_request.index_type,
+        do_reset=build_request.do_reset == 1
+    )
+    if is_started is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_INDEX_BUILD_NOT_SUPPORTED.value}
+        )
+    if not is_started:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"signal": ResponseSignal.VECTORDB_INDEX_BUILD_RUNNING.value}
+        )
+    
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"signal": ResponseSignal.VECTORDB_INDEX_BUILD_STARTED.value}
+    )
+
+
+@nlp_router.get("/index/build/{project_id}")
+async def get_project_index_build(request:Request , project_id:int):
+    
+    nlp_controller = NLPController(
+        vectordb_client=request.app.vectordb_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser
+    )
+    collection_name = nlp_controller.create_collection_name(project_id=project_id)
+    
+    is_collection_existed = await request.app.vectordb_client.is_collection_existed(collection_name=collection_name)
+    if not is_collection_existed:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"signal": ResponseSignal.VECTORDB_COLLECTION_NOT_FOUND.value}
+        )
+    
+    build_status = await request.app.vectordb_client.get_vector_index_build_status(collection_name=collection_name)
+    if build_status is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.VECTORDB_INDEX_BUILD_NOT_SUPPORTED.value}
+        )
+    
+    return JSONResponse(
+        content={"signal": ResponseSignal.VECTORDB_INDEX_BUILD_RETRIEVED.value,
+                 "index_build": build_status
+                }
+    )
+
+
 @nlp_router.get("/index/info/{project_id}")
 async def get_project_index_info(request:Request , project_id :int ):
     
@@ -135,7 +237,8 @@ async def search_index(request:Request , project_id:int , search_request:SearchR
     results = await nlp_controller.search_vector_db_collection(
         project=project,
         text = search_request.text,
-        limit = search_request.limit
+        limit = search_request.limit,
+        search_params = {"hnsw_ef": search_request.hnsw_ef , "oversampling": search_request.oversampling}
     )
     
     if not results:
@@ -168,7 +271,7 @@ async def answer_index(request:Request , project_id:int , search_request:SearchR
         project=project,
         query = search_request.text,
         limit = search_request.limit,
-        
+        search_params = {"hnsw_ef": search_request.hnsw_ef , "oversampling": search_request.oversampling}
     )
     
     if not answer:
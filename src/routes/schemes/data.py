@@ -2,10 +2,27 @@ from pydantic import BaseModel
 from typing import Optional
 class ProcessRequest(BaseModel):
     file_id: str = None
+    # chunk_size and overlap_size are counted in characters , or in tokens of the embedding model when splitter_mode is "token"
     chunk_size: Optional[int] = 100
     overlap_size: Optional[int] = 20
+    # do_reset = 1 : delete every chunk of the project and its vectors collection , then process the selected assets
     do_reset: Optional[int] = 0
+    # without do_reset , assets whose content and chunking parameters did not change since their last processing are skipped
+    # reprocess_modified = 1 : modified assets are processed again , their old chunks and vectors are replaced
+    # reprocess_modified = 0 : modified assets keep their current chunks
+    reprocess_modified: Optional[int] = 1
+    # force_reprocess = 1 : re-process the selected assets even when they did not change
+    force_reprocess: Optional[int] = 0
+    splitter_mode: Optional[str] = "separator"  # character | separator | token
+    # index_chunks = 1 : fused ingest , the chunks are embedded and pushed to the vector db batch by batch
+    # while the file is processed , no separate /nlp/index/push is needed for them
+    index_chunks: Optional[int] = 0
     
     
     
     
+
+class UploadSessionRequest(BaseModel):
+    file_name: str
+    file_size: int  # in bytes
+    content_type: str
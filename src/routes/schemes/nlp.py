@@ -3,7 +3,25 @@ from typing import Optional
 
 class PushRequestschema(BaseModel):
     do_reset : Optional[int] = 0
+    # defaults to INDEX_PUSH_PAGE_SIZE / INDEX_PUSH_SERVER_CURSOR
+    page_size : Optional[int] = None
+    use_server_cursor : Optional[bool] = None
+    # qdrant options of a new (or reset) collection , default to VECTOR_DB_QDRANT_*
+    quantization : Optional[str] = None  # none / scalar / binary
+    quantization_always_ram : Optional[bool] = None
+    on_disk : Optional[bool] = None
+    hnsw_m : Optional[int] = None
+    hnsw_ef_construct : Optional[int] = None
     
+class IndexBuildRequestschema(BaseModel):
+    # defaults to VECTOR_DB_PGVECTOR_INDEX_TYPE
+    index_type : Optional[str] = None
+    # 1 = drop the current index and build it again (e.g. new parameters)
+    do_reset : Optional[int] = 0
+
 class SearchRequestschema(BaseModel):
     text : str 
-    limit : Optional[int] = 5
\ No newline at end of file
+    limit : Optional[int] = 5
+    # qdrant search options , default to VECTOR_DB_QDRANT_SEARCH_*
+    hnsw_ef : Optional[int] = None
+    oversampling : Optional[float] = None
\ No newline at end of file
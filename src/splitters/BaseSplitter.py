@@ -0,0 +1,143 @@
+from abc import ABC , abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterable , Iterable , Iterator , List
+import bisect
+
+# a custom Document class using Python's dataclass decorator to represent a text document with its content and metadata.
+# this decorator automatically generates special methods like __init__() and __repr__() for the class.
+@dataclass
+class Document:
+    page_content: str
+    metadata: dict
+
+class BaseSplitter(ABC):
+    """
+    Streaming splitter working with offsets over a sliding buffer.
+    Pages are appended to the buffer as they arrive , chunks are sliced out of it
+    and the consumed text is dropped , so the buffer never holds much more than
+    one page plus one chunk. No chunk is built by string concatenation.
+    """
+    def __init__(self , chunk_size: int = 100 , chunk_overlap: int = 0 , page_separator: str = "\n"):
+        if not chunk_size or chunk_size <= 0:
+            raise ValueError(f"chunk_size must be a positive number , got {chunk_size}")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = max(0 , min(chunk_overlap or 0 , chunk_size - 1))
+        self.page_separator = page_separator
+        self.reset()
+
+    def reset(self):
+        self.buffer = ""
+        # offset of buffer[0] in the whole document
+        self.buffer_offset = 0
+        # start of the next chunk , relative to the buffer
+        self.position = 0
+        # end of the last emitted chunk in the whole document
+        self.emitted_until = 0
+        self.text_length = 0
+        # start offsets and metadata of the pages that are still in the buffer
+        self.pages_offsets = []
+        self.pages_metadata = []
+
+    @abstractmethod
+    def find_chunk_end(self , start: int , limit: int , is_final: bool) -> int:
+        # end (exclusive , relative to the buffer) of the chunk starting at start , start < end <= limit
+        pass
+
+    def find_next_start(self , start: int , end: int) -> int:
+        # the overlap is capped to half of the chunk so every step moves forward by a fair amount
+        overlap = min(self.chunk_overlap , (end - start) // 2)
+        return end - overlap
+
+    def feed(self , text: str , metadata: dict = None) -> Iterator[Document]:
+        # drop the text already consumed before appending the new page
+        separator = self.page_separator if self.text_length > 0 else ""
+        self.buffer = self.buffer[self.position:] + separator + text
+        self.buffer_offset += self.position
+        self.position = 0
+
+        self.pages_offsets.append(self.text_length + len(separator))
+        self.pages_metadata.append(metadata or {})
+        self.text_length += len(separator) + len(text)
+
+        while len(self.pages_offsets) > 1 and self.pages_offsets[1] <= self.buffer_offset:
+            self.pages_offsets.pop(0)
+            self.pages_metadata.pop(0)
+
+        yield from self.emit(is_final=False)
+
+    def finish(self) -> Iterator[Document]:
+        yield from self.emit(is_final=True)
+        self.reset()
+
+    def emit(self , is_final: bool) -> Iterator[Document]:
+        buffer_length = len(self.buffer)
+
+        while self.position < buffer_length:
+            start = self.position
+            # wait for more text unless the whole chunk is already in the buffer
+            if not is_final and start + self.chunk_size > buffer_length:
+                break
+            # what is left is only the overlap of the last chunk
+            if is_final and self.buffer_offset + buffer_length <= self.emitted_until:
+                break
+
+            limit = min(start + self.chunk_size , buffer_length)
+            end = self.find_chunk_end(start=start , limit=limit , is_final=is_final)
+
+            chunk = self.make_chunk(start=start , end=end)
+            if chunk is not None:
+                yield chunk
+
+            if is_final and end >= buffer_length:
+                self.position = buffer_length
+                break
+            self.position = self.find_next_start(start=start , end=end)
+
+    def page_index(self , offset: int) -> int:
+        return max(bisect.bisect_right(self.pages_offsets , offset) - 1 , 0)
+
+    def get_chunk_metadata(self , start_offset: int , end_offset: int) -> dict:
+        metadata = {
+            "start_offset": start_offset,
+            "end_offset": end_offset,
+        }
+        first_page = self.pages_metadata[self.page_index(start_offset)]
+        last_page = self.pages_metadata[self.page_index(end_offset - 1)]
+        if "page" in first_page:
+            metadata["page"] = first_page["page"]
+            metadata["last_page"] = last_page.get("page" , first_page["page"])
+        return metadata
+
+    def make_chunk(self , start: int , end: int , extra_metadata: dict = None):
+        raw_text = self.buffer[start:end]
+        content = raw_text.strip()
+        self.emitted_until = self.buffer_offset + end
+        if not content:
+            return None
+
+        leading_spaces = len(raw_text) - len(raw_text.lstrip())
+        start_offset = self.buffer_offset + start + leading_spaces
+        end_offset = start_offset + len(content)
+
+        metadata = self.get_chunk_metadata(start_offset=start_offset , end_offset=end_offset)
+        if extra_metadata:
+            metadata.update(extra_metadata)
+
+        return Document(
+            page_content=content,
+            metadata=metadata
+        )
+
+    def split_texts(self , texts: Iterable[str] , metadatas: List[dict] = None) -> Iterator[Document]:
+        metadatas = metadatas or []
+        for i , text in enumerate(texts):
+            yield from self.feed(text , metadatas[i] if i < len(metadatas) else None)
+        yield from self.finish()
+
+    async def split_pages(self , pages: AsyncIterable[Document]):
+        async for page in pages:
+            for chunk in self.feed(page.page_content , page.metadata):
+                yield chunk
+        for chunk in self.finish():
+            yield chunk
@@ -0,0 +1,7 @@
+from .BaseSplitter import BaseSplitter
+
+class CharacterSplitter(BaseSplitter):
+    # fixed size windows of chunk_size characters
+
+    def find_chunk_end(self , start: int , limit: int , is_final: bool) -> int:
+        return limit
@@ -0,0 +1,35 @@
+from .BaseSplitter import BaseSplitter
+from typing import List
+
+class SeparatorSplitter(BaseSplitter):
+    # cut each chunk on the strongest separator found in its second half
+    # (paragraph , then line , then sentence , then word) , hard cut when there is none
+
+    def __init__(self , chunk_size: int = 100 , chunk_overlap: int = 0 , page_separator: str = "\n" ,
+                 separators: List[str] = None):
+        super().__init__(chunk_size=chunk_size , chunk_overlap=chunk_overlap , page_separator=page_separator)
+        self.separators = separators or ["\n\n" , "\n" , ". " , " "]
+
+    def find_chunk_end(self , start: int , limit: int , is_final: bool) -> int:
+        if is_final and limit == len(self.buffer):
+            return limit
+
+        min_end = start + max(self.chunk_size // 2 , 1)
+        for separator in self.separators:
+            separator_index = self.buffer.rfind(separator , min_end , limit)
+            if separator_index != -1:
+                return separator_index + len(separator)
+        return limit
+
+    def find_next_start(self , start: int , end: int) -> int:
+        next_start = super().find_next_start(start=start , end=end)
+        if next_start >= end:
+            return next_start
+
+        # do not start the overlap in the middle of a word
+        word_end = self.buffer.find(" " , next_start , end)
+        line_end = self.buffer.find("\n" , next_start , end)
+        boundaries = [index for index in (word_end , line_end) if index != -1]
+        if boundaries:
+            return min(boundaries) + 1
+        return next_start
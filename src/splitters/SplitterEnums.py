@@ -0,0 +1,6 @@
+from enum import Enum
+
+class SplitterEnums(Enum):
+    CHARACTER = "character"
+    SEPARATOR = "separator"
+    TOKEN = "token"
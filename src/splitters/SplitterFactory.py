@@ -0,0 +1,33 @@
+from .SplitterEnums import SplitterEnums
+from .CharacterSplitter import CharacterSplitter
+from .SeparatorSplitter import SeparatorSplitter
+from .TokenSplitter import TokenSplitter , get_tokenizer
+
+class SplitterFactory:
+    def __init__(self , config : dict = None):
+        self.config = config
+
+    def create(self , mode:str , chunk_size:int , chunk_overlap:int = 0):
+        if mode == SplitterEnums.CHARACTER.value:
+            return CharacterSplitter(
+                chunk_size = chunk_size,
+                chunk_overlap = chunk_overlap
+            )
+
+        if mode == SplitterEnums.SEPARATOR.value:
+            return SeparatorSplitter(
+                chunk_size = chunk_size,
+                chunk_overlap = chunk_overlap
+            )
+
+        if mode == SplitterEnums.TOKEN.value:
+            # chunks are measured with the tokenizer of the embedding model
+            return TokenSplitter(
+                chunk_size = chunk_size,
+                chunk_overlap = chunk_overlap,
+                tokenizer = get_tokenizer(
+                    model_id = self.config.EMBEDDING_MODEL_ID,
+                    fallback_encoding = self.config.SPLITTER_TOKENIZER_FALLBACK_ENCODING
+                )
+            )
+        return None
@@ -0,0 +1,101 @@
+from .BaseSplitter import BaseSplitter
+from functools import lru_cache
+from typing import Iterator
+import logging
+import tiktoken
+
+logger = logging.getLogger('uvicorn.error')
+
+@lru_cache(maxsize=8)
+def get_tokenizer(model_id: str = None , fallback_encoding: str = "cl100k_base"):
+    # loading a BPE table is expensive , keep one encoder per model in the process
+    if model_id:
+        try:
+            return tiktoken.encoding_for_model(model_id)
+        except KeyError:
+            logger.info(f"No tiktoken encoding for model {model_id} , using {fallback_encoding}")
+    return tiktoken.get_encoding(fallback_encoding)
+
+class TokenSplitter(BaseSplitter):
+    # chunk_size and chunk_overlap are counted in tokens of the embedding model.
+    # the document is tokenized once as it arrives : every feed encodes only the text after the previous
+    # stable end , plus the last token before it (it may merge with the new text). the token offsets are
+    # kept across feeds and reused for every chunk and for their overlaps.
+
+    def __init__(self , chunk_size: int = 256 , chunk_overlap: int = 0 , page_separator: str = "\n" ,
+                 tokenizer = None):
+        super().__init__(chunk_size=chunk_size , chunk_overlap=chunk_overlap , page_separator=page_separator)
+        self.tokenizer = tokenizer or get_tokenizer()
+
+    def reset(self):
+        super().reset()
+        # document offsets of the tokens not consumed yet , and the end of the tokenized text
+        self.tokens_offsets = []
+        self.tokenized_until = 0
+
+    def find_chunk_end(self , start: int , limit: int , is_final: bool) -> int:
+        # not used , chunk boundaries come from the token offsets in emit()
+        return limit
+
+    def get_stable_end(self , is_final: bool) -> int:
+        if is_final:
+            return len(self.buffer)
+        # the last word may continue in the next page and tokenize differently ,
+        # only the text before the last whitespace is tokenized for now.
+        # the whitespace itself stays with the next word , BPE tokenizers merge it into the word token
+        return max(self.buffer.rfind(" ") , self.buffer.rfind("\n"))
+
+    def tokenize_new_text(self , is_final: bool):
+        stable_end = self.buffer_offset + self.get_stable_end(is_final=is_final)
+        if stable_end <= self.tokenized_until:
+            return
+        # the boundary token is encoded again with the new text , everything before it is kept
+        resume_offset = self.tokens_offsets.pop() if self.tokens_offsets else self.tokenized_until
+        text = self.buffer[resume_offset - self.buffer_offset:stable_end - self.buffer_offset]
+        tokens = self.tokenizer.encode(text , disallowed_special=())
+        _ , tokens_offsets = self.tokenizer.decode_with_offsets(tokens)
+        self.tokens_offsets.extend(resume_offset + token_offset for token_offset in tokens_offsets)
+        self.tokenized_until = stable_end
+
+    def emit(self , is_final: bool) -> Iterator:
+        self.tokenize_new_text(is_final=is_final)
+        tokens_count = len(self.tokens_offsets)
+        # until the end of the document the last token may still change , no chunk ends after its start
+        available_tokens = tokens_count if is_final else tokens_count - 1
+
+        def token_offset(token_index: int) -> int:
+            # relative to the buffer
+            if token_index >= tokens_count:
+                return self.tokenized_until - self.buffer_offset
+            return self.tokens_offsets[token_index] - self.buffer_offset
+
+        first_token = 0
+        while first_token < available_tokens:
+            last_token = min(first_token + self.chunk_size , available_tokens)
+            # the chunk is not full yet , wait for the next page
+            if not is_final and last_token - first_token < self.chunk_size:
+                break
+
+            start = token_offset(first_token)
+            end = token_offset(last_token)
+            if is_final and self.buffer_offset + end <= self.emitted_until:
+                break
+
+            chunk = self.make_chunk(start=start , end=end , extra_metadata={
+                "token_count": last_token - first_token
+            })
+            if chunk is not None:
+                yield chunk
+
+            if last_token >= tokens_count and is_final:
+                first_token = tokens_count
+                break
+            overlap = min(self.chunk_overlap , (last_token - first_token) // 2)
+            first_token = last_token - overlap
+
+        if is_final:
+            self.position = len(self.buffer)
+            return
+        # the consumed tokens are dropped , the buffer keeps the text from the next chunk start
+        del self.tokens_offsets[:first_token]
+        self.position = token_offset(0) if self.tokens_offsets else self.tokenized_until - self.buffer_offset
@@ -0,0 +1 @@
+from .SplitterFactory import SplitterFactory
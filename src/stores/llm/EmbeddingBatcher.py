@@ -0,0 +1,75 @@
+from .LLMEnums import LLMEnum
+from typing import List , Union
+import asyncio
+import logging
+
+# request limits of the embedding endpoints : texts per call and (estimated) tokens per call
+PROVIDERS_EMBEDDING_LIMITS = {
+    LLMEnum.OPENAI.value: {"max_items": 2048, "max_tokens": 300000},
+    LLMEnum.cohere.value: {"max_items": 96, "max_tokens": 96 * 512},
+    LLMEnum.GEMINI.value: {"max_items": 100, "max_tokens": 100 * 2048},
+}
+DEFAULT_EMBEDDING_LIMITS = {"max_items": 50, "max_tokens": 50 * 512}
+
+def estimate_tokens(text: str):
+    # ~3 characters per token , on the safe side of the real tokenizers for latin text
+    return len(text) // 3 + 1
+
+class EmbeddingBatcher:
+    """
+    Sits in front of an embedding provider : splits a list of texts into sub-batches that fit
+    the provider limits , embeds them concurrently (capped per provider) and returns the vectors in order.
+    """
+    def __init__(self , embedding_client , backend:str , max_items:int = None , max_tokens:int = None ,
+                 concurrency:int = 4):
+        self.embedding_client = embedding_client
+        self.backend = backend
+
+        limits = PROVIDERS_EMBEDDING_LIMITS.get(backend , DEFAULT_EMBEDDING_LIMITS)
+        self.max_items = max_items or limits["max_items"]
+        self.max_tokens = max_tokens or limits["max_tokens"]
+
+        # shared by every caller of this provider (routes , indexing pipeline , processing workers)
+        self.semaphore = asyncio.Semaphore(max(concurrency , 1))
+        self.logger = logging.getLogger('uvicorn.error')
+
+    def split_batches(self , texts: List[str]):
+        # (start , end) slices of texts , each one within max_items and max_tokens
+        batches = []
+        start = 0
+        batch_tokens = 0
+        for index , text in enumerate(texts):
+            text_tokens = estimate_tokens(text)
+            is_full = index - start >= self.max_items or batch_tokens + text_tokens > self.max_tokens
+            if index > start and is_full:
+                batches.append((start , index))
+                start = index
+                batch_tokens = 0
+            batch_tokens += text_tokens
+        if start < len(texts):
+            batches.append((start , len(texts)))
+        return batches
+
+    async def embed_batch(self , texts: List[str] , document_type: str):
+        async with self.semaphore:
+            return await self.embedding_client.embed_text_async(text=texts , document_type=document_type)
+
+    async def embed_text_async(self , text: Union[str, List[str]] , document_type: str = None):
+        if isinstance(text , str):
+            text = [text]
+        if not len(text):
+            return []
+
+        batches = self.split_batches(text)
+        results = await asyncio.gather(*[
+            self.embed_batch(texts=text[start:end] , document_type=document_type)
+            for start , end in batches
+        ])
+
+        vectors = []
+        for (start , end) , batch_vectors in zip(batches , results):
+            if not batch_vectors or len(batch_vectors) != end - start:
+                self.logger.error(f"Embedding sub-batch [{start}:{end}] failed with {self.backend}")
+                return None
+            vectors.extend(batch_vectors)
+        return vectors
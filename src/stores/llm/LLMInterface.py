@@ -20,6 +20,14 @@ class LLMInterface(ABC):
     def embed_text(self , text:str , document_type :str = None):
         pass
     
+    @abstractmethod
+    async def generate_text_async(self , prompt:str , chat_history:list=None , max_output_tokens:int=None , temperature : float = None):
+        pass
+    
+    @abstractmethod
+    async def embed_text_async(self , text:str , document_type :str = None):
+        pass
+    
     @abstractmethod
     def contruct_prompt(self , prompt:str , role :str):
         pass
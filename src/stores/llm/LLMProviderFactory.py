@@ -7,8 +7,12 @@ from .providers import GeminiProvider
 from .providers import PerplexityProvider
 
 class LLMProviderFactory:
-    def __init__(self , config : dict):
+    def __init__(self , config : dict , http_client = None):
         self.config = config 
+        # httpx.AsyncClient shared by the async clients of all the providers (one connection pool per app)
+        self.http_client = http_client
+        # the RateGovernor retries the throttled requests itself , the sdk retries would hide the 429s from it
+        self.sdk_max_retries = 0 if config.LLM_GOVERNOR_ENABLED else 2
     def create(self , provider:str):
         if provider == LLMEnum.OPENAI.value:
             return  OPENAIProvider(
@@ -16,14 +20,18 @@ class LLMProviderFactory:
                 api_url = self.config.OPENAI_API_URL,
                 default_input_max_characters = self.config.DEFAULT_INPUT_MAX_CHARACTERS,
                 default_generation_max_output_tokens = self.config.default_generation_max_output_tokens,
-                default_generation_temperature = self.config.DEFAULT_GENERATION_TEMPERATURE
+                default_generation_temperature = self.config.DEFAULT_GENERATION_TEMPERATURE,
+                http_client = self.http_client,
+                max_retries = self.sdk_max_retries
             )
         if provider == LLMEnum.cohere.value:
             return coHereProvider(
                 api_key = self.config.COHERE_API_KEY,
                 default_input_max_characters = self.config.DEFAULT_INPUT_MAX_CHARACTERS,
                 default_generation_max_output_tokens = self.config.default_generation_max_output_tokens,
-                default_generation_temperature = self.config.DEFAULT_GENERATION_TEMPERATURE
+                default_generation_temperature = self.config.DEFAULT_GENERATION_TEMPERATURE,
+                http_client = self.http_client,
+                max_retries = self.sdk_max_retries
             )
         
         if provider == LLMEnum.GEMINI.value:
@@ -31,13 +39,16 @@ class LLMProviderFactory:
                 api_key = self.config.GEMINI_API_KEY,
                 default_input_max_characters = self.config.DEFAULT_INPUT_MAX_CHARACTERS,
                 default_generation_max_output_tokens = self.config.default_generation_max_output_tokens,
-                default_generation_temperature = self.config.DEFAULT_GENERATION_TEMPERATURE
+                default_generation_temperature = self.config.DEFAULT_GENERATION_TEMPERATURE,
+                raise_retryable_errors = self.config.LLM_GOVERNOR_ENABLED
             )
         if provider == LLMEnum.PERPLEXITY.value:
             return PerplexityProvider(
                 api_key = self.config.PERPLEXITY_API_KEY,
                 default_input_max_characters = self.config.DEFAULT_INPUT_MAX_CHARACTERS,
                 default_generation_max_output_tokens = self.config.default_generation_max_output_tokens,
-                default_generation_temperature = self.config.DEFAULT_GENERATION_TEMPERATURE
+                default_generation_temperature = self.config.DEFAULT_GENERATION_TEMPERATURE,
+                http_client = self.http_client,
+                max_retries = self.sdk_max_retries
             )
         return None 
\ No newline at end of file
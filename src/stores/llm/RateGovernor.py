@@ -0,0 +1,285 @@
+from Utils.metrics import (LLM_GOVERNOR_CONCURRENCY_LIMIT , LLM_GOVERNOR_IN_FLIGHT , LLM_GOVERNOR_WAIT ,
+                           LLM_GOVERNOR_RETRIES , LLM_GOVERNOR_REJECTED , LLM_GOVERNOR_CIRCUIT_STATE)
+from .EmbeddingBatcher import estimate_tokens
+from collections import deque
+from typing import List , Union
+import asyncio
+import logging
+import random
+import time
+
+RATE_LIMIT_ERROR = "rate_limit"
+UNAVAILABLE_ERROR = "unavailable"
+
+CIRCUIT_CLOSED = 0
+CIRCUIT_HALF_OPEN = 1
+CIRCUIT_OPEN = 2
+
+# error classes of the SDKs (openai / perplexity / cohere / google api_core / httpx) that mean "try again later"
+UNAVAILABLE_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "InternalServerError", "ServiceUnavailable",
+    "DeadlineExceeded", "TimeoutException", "ConnectError", "ReadTimeout", "RemoteProtocolError",
+}
+
+def get_error_kind(error: Exception):
+    # 429 -> rate_limit (the backend is up but throttling us) , 5xx / network -> unavailable , anything else is final
+    status_code = getattr(error , "status_code" , None)
+    if not isinstance(status_code , int):
+        status_code = getattr(error , "code" , None)
+
+    if status_code == 429 or type(error).__name__ in ("RateLimitError" , "TooManyRequestsError" , "ResourceExhausted"):
+        return RATE_LIMIT_ERROR
+    if (isinstance(status_code , int) and status_code >= 500) or type(error).__name__ in UNAVAILABLE_ERROR_NAMES:
+        return UNAVAILABLE_ERROR
+    return None
+
+def get_retry_after(error: Exception):
+    # seconds asked by the backend in the Retry-After header (openai / perplexity / cohere expose the http response)
+    response = getattr(error , "response" , None)
+    headers = getattr(response , "headers" , None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError , ValueError):
+        return None
+
+class RateGovernor:
+    """
+    Admission control for one provider model , shared by every caller of the app :
+    requests/min and tokens/min sliding windows , an AIMD concurrency limit driven by latency and 429s ,
+    jittered retries and a circuit breaker that fails fast while the backend is down.
+    """
+    def __init__(self , backend:str , model_id:str , requests_per_minute:int = None , tokens_per_minute:int = None ,
+                 initial_concurrency:int = 4 , min_concurrency:int = 1 , max_concurrency:int = 64 ,
+                 target_latency:float = 10.0 , max_retries:int = 5 , backoff_base:float = 0.5 , backoff_max:float = 30.0 ,
+                 breaker_failures:int = 5 , breaker_cooldown:float = 30.0):
+        self.backend = backend
+        self.model_id = model_id
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.min_concurrency = max(min_concurrency , 1)
+        self.max_concurrency = max(max_concurrency , self.min_concurrency)
+        self.concurrency_limit = float(min(max(initial_concurrency , self.min_concurrency) , self.max_concurrency))
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+
+        self.in_flight = 0
+        self.slot_condition = asyncio.Condition()
+        # (time , tokens) of the requests sent during the last minute
+        self.window = deque()
+        self.window_tokens = 0
+        self.window_lock = asyncio.Lock()
+
+        self.circuit_state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.circuit_opened_at = 0.0
+        self.probe_in_flight = False
+
+        self.logger = logging.getLogger('uvicorn.error')
+        self.labels = {"backend": backend , "model": model_id or ""}
+        self.export_state()
+
+    def export_state(self):
+        LLM_GOVERNOR_CONCURRENCY_LIMIT.labels(**self.labels).set(int(self.concurrency_limit))
+        LLM_GOVERNOR_IN_FLIGHT.labels(**self.labels).set(self.in_flight)
+        LLM_GOVERNOR_CIRCUIT_STATE.labels(**self.labels).set(self.circuit_state)
+
+    # circuit breaker
+
+    def allow_request(self):
+        if self.circuit_state == CIRCUIT_CLOSED:
+            return True
+        if self.circuit_state == CIRCUIT_OPEN:
+            if time.monotonic() - self.circuit_opened_at < self.breaker_cooldown:
+                return False
+            self.circuit_state = CIRCUIT_HALF_OPEN
+            self.export_state()
+        # half open : a single probe request decides if the circuit closes again
+        if self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def record_available(self):
+        self.probe_in_flight = False
+        self.consecutive_failures = 0
+        if self.circuit_state != CIRCUIT_CLOSED:
+            self.logger.info(f"Circuit closed for {self.backend}/{self.model_id}")
+            self.circuit_state = CIRCUIT_CLOSED
+            self.export_state()
+
+    def record_unavailable(self):
+        self.probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.circuit_state == CIRCUIT_HALF_OPEN or self.consecutive_failures >= self.breaker_failures:
+            if self.circuit_state != CIRCUIT_OPEN:
+                self.logger.error(f"Circuit opened for {self.backend}/{self.model_id} "
+                                  f"after {self.consecutive_failures} failures")
+            self.circuit_state = CIRCUIT_OPEN
+            self.circuit_opened_at = time.monotonic()
+            self.export_state()
+
+    # AIMD concurrency
+
+    async def acquire_slot(self):
+        async with self.slot_condition:
+            await self.slot_condition.wait_for(lambda: self.in_flight < int(self.concurrency_limit))
+            self.in_flight += 1
+        self.export_state()
+
+    async def release_slot(self , latency:float = None , is_throttled:bool = False):
+        async with self.slot_condition:
+            self.in_flight -= 1
+            if is_throttled:
+                # multiplicative decrease on 429
+                self.concurrency_limit = max(self.min_concurrency , self.concurrency_limit / 2)
+            elif latency is not None and latency > self.target_latency:
+                # the backend is queueing our requests , back off gently
+                self.concurrency_limit = max(self.min_concurrency , self.concurrency_limit * 0.9)
+            elif latency is not None:
+                # additive increase : about +1 slot once the whole window succeeded
+                self.concurrency_limit = min(self.max_concurrency , self.concurrency_limit + 1 / self.concurrency_limit)
+            self.slot_condition.notify_all()
+        self.export_state()
+
+    # requests/min and tokens/min windows
+
+    async def wait_for_window(self , tokens:int):
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            return
+        # the lock keeps the waiting requests in order , the first one waits for the window and the others for it
+        async with self.window_lock:
+            while True:
+                now = time.monotonic()
+                while self.window and now - self.window[0][0] >= 60:
+                    self.window_tokens -= self.window.popleft()[1]
+
+                is_requests_full = self.requests_per_minute and len(self.window) >= self.requests_per_minute
+                # a request bigger than the whole budget still goes through once the window is empty
+                is_tokens_full = self.tokens_per_minute and self.window and \
+                    self.window_tokens + tokens > self.tokens_per_minute
+                if not is_requests_full and not is_tokens_full:
+                    self.window.append((now , tokens))
+                    self.window_tokens += tokens
+                    return
+
+                await asyncio.sleep(max(60 - (now - self.window[0][0]) , 0.01))
+
+    def get_backoff(self , attempt:int , error:Exception):
+        # full jitter , never shorter than what the backend asked for
+        backoff = random.uniform(0 , min(self.backoff_max , self.backoff_base * (2 ** attempt)))
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            backoff = max(backoff , min(retry_after , self.backoff_max))
+        return backoff
+
+    async def run(self , call , tokens:int = 1):
+        """
+        Runs call() (a coroutine factory) under the governor , returns None when the circuit is open
+        or when the request still fails after the retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            if not self.allow_request():
+                LLM_GOVERNOR_REJECTED.labels(**self.labels).inc()
+                self.logger.warning(f"Circuit open for {self.backend}/{self.model_id} , request rejected")
+                return None
+
+            wait_start = time.perf_counter()
+            await self.wait_for_window(tokens=tokens)
+            await self.acquire_slot()
+            LLM_GOVERNOR_WAIT.labels(**self.labels).observe(time.perf_counter() - wait_start)
+
+            start_time = time.perf_counter()
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                self.probe_in_flight = False
+                await self.release_slot()
+                raise
+            except Exception as e:
+                error_kind = get_error_kind(e)
+                await self.release_slot(is_throttled=error_kind == RATE_LIMIT_ERROR)
+                if error_kind is None:
+                    # bad request , auth ... retrying will not help and the backend is up
+                    self.record_available()
+                    self.logger.error(f"Request to {self.backend}/{self.model_id} failed: {e}")
+                    return None
+
+                if error_kind == UNAVAILABLE_ERROR:
+                    self.record_unavailable()
+                else:
+                    self.record_available()
+                LLM_GOVERNOR_RETRIES.labels(reason=error_kind , **self.labels).inc()
+
+                if attempt == self.max_retries:
+                    self.logger.error(f"Request to {self.backend}/{self.model_id} failed after "
+                                      f"{self.max_retries} retries: {e}")
+                    return None
+                backoff = self.get_backoff(attempt=attempt , error=e)
+                self.logger.warning(f"Request to {self.backend}/{self.model_id} failed ({error_kind}) , "
+                                    f"retrying in {backoff:.2f}s")
+                await asyncio.sleep(backoff)
+                continue
+
+            await self.release_slot(latency=time.perf_counter() - start_time)
+            self.record_available()
+            return result
+        return None
+
+# one governor per (backend , model) for the whole process
+rate_governors = {}
+
+def get_rate_governor(backend:str , model_id:str , **governor_config):
+    key = (backend , model_id)
+    if key not in rate_governors:
+        rate_governors[key] = RateGovernor(backend=backend , model_id=model_id , **governor_config)
+    return rate_governors[key]
+
+class GovernedProvider:
+    """
+    Wraps an LLM provider so its async calls go through the RateGovernor of the provider model.
+    Everything else (set_*_model , embedding_size , Enums , the sync calls ...) is the provider's own.
+    """
+    def __init__(self , provider , backend:str , governor_config:dict = None):
+        self.provider = provider
+        self.backend = backend
+        self.governor_config = governor_config or {}
+
+    def __getattr__(self , name):
+        return getattr(self.provider , name)
+
+    def get_governor(self , model_id:str):
+        return get_rate_governor(backend=self.backend , model_id=model_id , **self.governor_config)
+
+    async def generate_text_async(self , prompt:str , chat_history:list = None , max_output_tokens:int = None ,
+                                  temperature:float = None):
+        chat_history = chat_history if chat_history is not None else []
+        # the history is appended to by the provider , retries must start again from the same messages
+        history_length = len(chat_history)
+        history_tokens = sum(estimate_tokens(str(message.get("content") or "")) for message in chat_history)
+        tokens = history_tokens + estimate_tokens(prompt) + \
+            (max_output_tokens or self.provider.default_generation_max_output_tokens or 0)
+
+        async def call():
+            del chat_history[history_length:]
+            return await self.provider.generate_text_async(
+                prompt=prompt , chat_history=chat_history , max_output_tokens=max_output_tokens , temperature=temperature
+            )
+
+        governor = self.get_governor(model_id=self.provider.generation_model_id)
+        return await governor.run(call=call , tokens=tokens)
+
+    async def embed_text_async(self , text:Union[str, List[str]] , document_type:str = None):
+        texts = [text] if isinstance(text , str) else text
+        tokens = sum(estimate_tokens(item) for item in texts)
+
+        async def call():
+            return await self.provider.embed_text_async(text=text , document_type=document_type)
+
+        governor = self.get_governor(model_id=self.provider.embedding_model_id)
+        return await governor.run(call=call , tokens=tokens)
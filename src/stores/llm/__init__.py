@@ -1,2 +1,3 @@
 from .LLMProviderFactory import LLMProviderFactory
-
+from .EmbeddingBatcher import EmbeddingBatcher
+from .RateGovernor import RateGovernor , GovernedProvider
@@ -1,5 +1,6 @@
 from stores.llm.LLMInterface import LLMInterface
 from stores.llm.LLMEnums import GeminiEnum
+from stores.llm.RateGovernor import get_error_kind
 import google.generativeai as genai
 import logging
 from typing import List, Union
@@ -9,13 +10,16 @@ class GeminiProvider(LLMInterface):
     def __init__(self, api_key: str, api_url: str = None,
                  default_input_max_characters: int = 1000,
                  default_generation_max_output_tokens: int = 1000,
-                 default_generation_temperature: float = 0.1):
+                 default_generation_temperature: float = 0.1,
+                 raise_retryable_errors: bool = False):
         
         self.api_key = api_key
         # Note: Gemini doesn't support custom base URLs, api_url is ignored
         self.default_input_max_characters = default_input_max_characters
         self.default_generation_max_output_tokens = default_generation_max_output_tokens
         self.default_generation_temperature = default_generation_temperature
+        # throttling / outages are raised to the RateGovernor instead of being logged as a None result
+        self.raise_retryable_errors = raise_retryable_errors
         
         # Configure the API
         genai.configure(api_key=self.api_key)
@@ -42,15 +46,11 @@ class GeminiProvider(LLMInterface):
         """Truncate text to default max characters"""
         return text[:self.default_input_max_characters].strip()
     
-    def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None, temperature: float = None):
+    def get_chat_session(self, chat_history: list, max_output_tokens: int = None, temperature: float = None):
         """
-        Generate text using Gemini's chat API
+        Build the model and the chat session used by generate_text / generate_text_async
         Note: System messages in chat_history are handled as system_instruction in Gemini
         """
-        if not self.generation_model_id:
-            self.logger.error("Generation model not set. Call set_generation_model() first.")
-            return None
-        
         max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
         temperature = temperature if temperature else self.default_generation_temperature
         
@@ -92,28 +92,97 @@ class GeminiProvider(LLMInterface):
         # Log for debugging
         self.logger.info(f"System instruction length: {len(system_instruction) if system_instruction else 0}")
         self.logger.info(f"Chat history messages: {len(gemini_history)}")
+        
+        # Create model with system instruction if available
+        if system_instruction:
+            model = genai.GenerativeModel(
+                self.generation_model_id,
+                system_instruction=system_instruction,
+                safety_settings=safety_settings
+            )
+            self.logger.info("Model created WITH system instruction and safety settings")
+        else:
+            model = genai.GenerativeModel(
+                self.generation_model_id,
+                safety_settings=safety_settings
+            )
+            self.logger.info("Model created WITHOUT system instruction but with safety settings")
+        
+        # Start chat with history
+        chat = model.start_chat(history=gemini_history)
+        self.logger.info("Chat started with history")
+        
+        return chat, generation_config, safety_settings
+    
+    def get_generation_answer(self, response, prompt: str, chat_history: list):
+        """Read the answer of a chat response , None when it was blocked or empty"""
+        # Check if response was blocked by safety filters
+        if response.candidates:
+            candidate = response.candidates[0]
+            finish_reason = candidate.finish_reason
+            
+            # Log finish reason for debugging
+            self.logger.info(f"Response finish_reason: {finish_reason}")
+            
+            # Check if blocked by safety (finish_reason == 2 is SAFETY)
+            if finish_reason == 2:
+                self.logger.error("Response blocked by safety filters")
+                # Log safety ratings
+                if hasattr(candidate, 'safety_ratings') and candidate.safety_ratings:
+                    self.logger.error(f"Safety ratings: {candidate.safety_ratings}")
+                
+                # Try to get partial content if available
+                try:
+                    if hasattr(candidate, 'content') and candidate.content and hasattr(candidate.content, 'parts'):
+                        parts = candidate.content.parts
+                        if parts:
+                            partial_text = ''.join([part.text for part in parts if hasattr(part, 'text')])
+                            if partial_text:
+                                self.logger.info("Returning partial text before safety block")
+                                return partial_text
+                except:
+                    pass
+                
+                # Return None or a fallback message
+                self.logger.error("No valid content available due to safety block")
+                return None
+            
+            # Check for other non-success finish reasons
+            if finish_reason != 1:  # 1 is STOP (success)
+                self.logger.warning(f"Response finished with non-success reason: {finish_reason}")
+        
+        # Try to get the text
+        try:
+            response_text = response.text
+        except ValueError as e:
+            self.logger.error(f"Cannot access response.text: {str(e)}")
+            return None
+        
+        if not response_text:
+            self.logger.error("Empty response from Gemini")
+            return None
+        
+        self.logger.info(f"Text generation successful. Response length: {len(response_text)}")
+        
+        # Append to chat_history like OpenAI
+        chat_history.append(self.contruct_prompt(prompt=prompt, role=GeminiEnum.USER.value))
+        chat_history.append(self.contruct_prompt(prompt=response_text, role=GeminiEnum.ASSISTANT.value))
+        
+        return response_text
+    
+    def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None, temperature: float = None):
+        """Generate text using Gemini's chat API"""
+        if not self.generation_model_id:
+            self.logger.error("Generation model not set. Call set_generation_model() first.")
+            return None
+        
         self.logger.info(f"Prompt length: {len(prompt)}")
         self.logger.info(f"Prompt preview (first 300 chars): {prompt[:300]}")
         
-        # Create model with system instruction if available
         try:
-            if system_instruction:
-                model = genai.GenerativeModel(
-                    self.generation_model_id,
-                    system_instruction=system_instruction,
-                    safety_settings=safety_settings
-                )
-                self.logger.info("Model created WITH system instruction and safety settings")
-            else:
-                model = genai.GenerativeModel(
-                    self.generation_model_id,
-                    safety_settings=safety_settings
-                )
-                self.logger.info("Model created WITHOUT system instruction but with safety settings")
-            
-            # Start chat with history
-            chat = model.start_chat(history=gemini_history)
-            self.logger.info("Chat started with history")
+            chat, generation_config, safety_settings = self.get_chat_session(
+                chat_history=chat_history, max_output_tokens=max_output_tokens, temperature=temperature
+            )
             
             # Send message
             response = chat.send_message(
@@ -122,92 +191,88 @@ class GeminiProvider(LLMInterface):
                 safety_settings=safety_settings
             )
             
-            # Check if response was blocked by safety filters
-            if response.candidates:
-                candidate = response.candidates[0]
-                finish_reason = candidate.finish_reason
-                
-                # Log finish reason for debugging
-                self.logger.info(f"Response finish_reason: {finish_reason}")
-                
-                # Check if blocked by safety (finish_reason == 2 is SAFETY)
-                if finish_reason == 2:
-                    self.logger.error("Response blocked by safety filters")
-                    # Log safety ratings
-                    if hasattr(candidate, 'safety_ratings') and candidate.safety_ratings:
-                        self.logger.error(f"Safety ratings: {candidate.safety_ratings}")
-                    
-                    # Try to get partial content if available
-                    try:
-                        if hasattr(candidate, 'content') and candidate.content and hasattr(candidate.content, 'parts'):
-                            parts = candidate.content.parts
-                            if parts:
-                                partial_text = ''.join([part.text for part in parts if hasattr(part, 'text')])
-                                if partial_text:
-                                    self.logger.info("Returning partial text before safety block")
-                                    return partial_text
-                    except:
-                        pass
-                    
-                    # Return None or a fallback message
-                    self.logger.error("No valid content available due to safety block")
-                    return None
-                
-                # Check for other non-success finish reasons
-                if finish_reason != 1:  # 1 is STOP (success)
-                    self.logger.warning(f"Response finished with non-success reason: {finish_reason}")
-            
-            # Try to get the text
-            try:
-                response_text = response.text
-            except ValueError as e:
-                self.logger.error(f"Cannot access response.text: {str(e)}")
-                return None
+            return self.get_generation_answer(response=response, prompt=prompt, chat_history=chat_history)
             
-            if not response_text:
-                self.logger.error("Empty response from Gemini")
-                return None
-            
-            self.logger.info(f"Text generation successful. Response length: {len(response_text)}")
+        except Exception as e:
+            self.logger.error(f"Error generating text with Gemini: {str(e)}")
+            import traceback
+            self.logger.error(traceback.format_exc())
+            return None
+    
+    async def generate_text_async(self, prompt: str, chat_history: list = None, max_output_tokens: int = None, temperature: float = None):
+        """Generate text using Gemini's chat API without blocking the event loop (grpc asyncio transport)"""
+        if not self.generation_model_id:
+            self.logger.error("Generation model not set. Call set_generation_model() first.")
+            return None
+        
+        chat_history = chat_history if chat_history is not None else []
+        try:
+            chat, generation_config, safety_settings = self.get_chat_session(
+                chat_history=chat_history, max_output_tokens=max_output_tokens, temperature=temperature
+            )
             
-            # Append to chat_history like OpenAI
-            chat_history.append(self.contruct_prompt(prompt=prompt, role=GeminiEnum.USER.value))
-            chat_history.append(self.contruct_prompt(prompt=response_text, role=GeminiEnum.ASSISTANT.value))
+            response = await chat.send_message_async(
+                self.process_text(prompt),
+                generation_config=generation_config,
+                safety_settings=safety_settings
+            )
             
-            return response_text
+            return self.get_generation_answer(response=response, prompt=prompt, chat_history=chat_history)
             
         except Exception as e:
+            if self.raise_retryable_errors and get_error_kind(e) is not None:
+                raise
             self.logger.error(f"Error generating text with Gemini: {str(e)}")
-            import traceback
-            self.logger.error(traceback.format_exc())
             return None
 
-    def embed_text(self, text: Union[str , List[str]] , document_type: str = None):
-        """Generate embeddings using Gemini's embedding API"""
+    def get_embedding_request(self, text: Union[str , List[str]] , document_type: str = None):
         if not self.embedding_model_id:
             self.logger.error("Embedding model not set. Call set_embedding_model() first.")
             return None
         if isinstance(text, str):
             text = [text]
+        # Determine task type
+        task_type = "RETRIEVAL_DOCUMENT" if document_type == "document" else "RETRIEVAL_QUERY"
+        return {
+            "model": self.embedding_model_id,
+            "content": text,
+            "task_type": task_type,
+            "output_dimensionality": self.embedding_size
+        }
+    
+    def get_embedding_vectors(self, result):
+        if not result or 'embedding' not in result:
+            self.logger.error("Error while embedding text with Gemini")
+            return None
+        
+        return [record for record in result['embedding']]
+
+    def embed_text(self, text: Union[str , List[str]] , document_type: str = None):
+        """Generate embeddings using Gemini's embedding API"""
+        request = self.get_embedding_request(text=text, document_type=document_type)
+        if request is None:
+            return None
         try:
-            # Determine task type
-            task_type = "RETRIEVAL_DOCUMENT" if document_type == "document" else "RETRIEVAL_QUERY"
-            
             # Generate embedding
-            result = genai.embed_content(
-                model=self.embedding_model_id,
-                content=text,
-                task_type=task_type,
-                output_dimensionality=self.embedding_size
-            )
+            result = genai.embed_content(**request)
+            return self.get_embedding_vectors(result=result)
             
-            if not result or 'embedding' not in result:
-                self.logger.error("Error while embedding text with Gemini")
-                return None
-            
-            return [record for record in result['embedding']]
+        except Exception as e:
+            self.logger.error(f"Error generating embedding with Gemini: {str(e)}")
+            return None
+    
+    async def embed_text_async(self, text: Union[str , List[str]] , document_type: str = None):
+        """Generate embeddings using Gemini's async embedding API"""
+        request = self.get_embedding_request(text=text, document_type=document_type)
+        if request is None:
+            return None
+        try:
+            result = await genai.embed_content_async(**request)
+            return self.get_embedding_vectors(result=result)
             
         except Exception as e:
+            if self.raise_retryable_errors and get_error_kind(e) is not None:
+                raise
             self.logger.error(f"Error generating embedding with Gemini: {str(e)}")
             return None
             
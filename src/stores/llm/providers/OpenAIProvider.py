@@ -1,5 +1,5 @@
 from stores.llm.LLMInterface import LLMInterface
-from openai import OpenAI
+from openai import OpenAI , AsyncOpenAI
 import logging
 from  stores.llm.LLMEnums import OpenAIEnum 
 from typing import List , Union
@@ -7,7 +7,9 @@ class OPENAIProvider(LLMInterface):
     def __init__(self , api_key : str , api_url : str=None,
                 default_input_max_characters:int=1000,
                 default_generation_max_output_tokens:int=1000,
-                default_generation_temperature:float=0.1):
+                default_generation_temperature:float=0.1,
+                http_client = None,
+                max_retries:int=2):
         
         self.api_key = api_key
         self.api_url = api_url
@@ -22,6 +24,14 @@ class OPENAIProvider(LLMInterface):
             api_key = self.api_key,
             base_url = self.api_url if self.api_url and len(self.api_url) else None
         )
+        # async client for the routes and workers , on the httpx.AsyncClient pool shared by the app
+        self.async_client = AsyncOpenAI(
+            api_key = self.api_key,
+            base_url = self.api_url if self.api_url and len(self.api_url) else None,
+            http_client = http_client,
+            # 0 when the RateGovernor retries , so it sees every 429
+            max_retries = max_retries
+        )
         
         self.Enums = OpenAIEnum
         
@@ -41,8 +51,7 @@ class OPENAIProvider(LLMInterface):
     
     
         
-    def generate_text(self , prompt:str, chat_history:list=[]  , max_output_tokens:int=None , temperature : float = None):
-        
+    def get_generation_request(self , prompt:str, chat_history:list , max_output_tokens:int=None , temperature : float = None):
         if not self.client:
             self.logger.error("OpenAI client was not set")
             return None
@@ -55,12 +64,14 @@ class OPENAIProvider(LLMInterface):
 
         chat_history.append(self.contruct_prompt(prompt=prompt , role=OpenAIEnum.USER.value))
         
-        response = self.client.chat.completions.create(
-            model = self.generation_model_id ,
-            messages = chat_history ,
-            max_tokens = max_output_tokens ,
-            temperature = temperature   
-        )
+        return {
+            "model": self.generation_model_id ,
+            "messages": chat_history ,
+            "max_tokens": max_output_tokens ,
+            "temperature": temperature
+        }
+    
+    def get_generation_answer(self , response , chat_history:list):
         if not response or not response.choices or len(response.choices) == 0 or not response.choices[0].message:
             self.logger.error("Error while generating text with OpenAI")
             return None
@@ -70,8 +81,29 @@ class OPENAIProvider(LLMInterface):
         chat_history.append(self.contruct_prompt(prompt=assistant_message, role=OpenAIEnum.ASSISTANT.value))
         
         return assistant_message
+        
+    def generate_text(self , prompt:str, chat_history:list=[]  , max_output_tokens:int=None , temperature : float = None):
+        
+        request = self.get_generation_request(prompt=prompt , chat_history=chat_history ,
+                                              max_output_tokens=max_output_tokens , temperature=temperature)
+        if request is None:
+            return None
+        
+        response = self.client.chat.completions.create(**request)
+        return self.get_generation_answer(response=response , chat_history=chat_history)
 
-    def embed_text(self , text:Union[str, List[str]] , document_type :str = None):
+    async def generate_text_async(self , prompt:str, chat_history:list=None  , max_output_tokens:int=None , temperature : float = None):
+        
+        chat_history = chat_history if chat_history is not None else []
+        request = self.get_generation_request(prompt=prompt , chat_history=chat_history ,
+                                              max_output_tokens=max_output_tokens , temperature=temperature)
+        if request is None:
+            return None
+        
+        response = await self.async_client.chat.completions.create(**request)
+        return self.get_generation_answer(response=response , chat_history=chat_history)
+
+    def get_embedding_request(self , text:Union[str, List[str]]):
         # when dealing with third party , you should always over verfiy 
         # to metegate the error that means make the error lest harmfull
         
@@ -86,15 +118,33 @@ class OPENAIProvider(LLMInterface):
         if isinstance(text , str):
             text = [text]
         
-        response = self.client.embeddings.create(
-            model = self.embedding_model_id , 
-            input = text
-        )
+        return {
+            "model": self.embedding_model_id ,
+            "input": text
+        }
+    
+    def get_embedding_vectors(self , response):
         if not response or not response.data or len(response.data) == 0 or not response.data[0].embedding:
             self.logger.error("Error while embedding text with openAI")
             return None
         
         return [ data.embedding for data in response.data ]
+
+    def embed_text(self , text:Union[str, List[str]] , document_type :str = None):
+        request = self.get_embedding_request(text=text)
+        if request is None:
+            return None
+        
+        response = self.client.embeddings.create(**request)
+        return self.get_embedding_vectors(response=response)
+    
+    async def embed_text_async(self , text:Union[str, List[str]] , document_type :str = None):
+        request = self.get_embedding_request(text=text)
+        if request is None:
+            return None
+        
+        response = await self.async_client.embeddings.create(**request)
+        return self.get_embedding_vectors(response=response)
             
     def contruct_prompt(self , prompt:str , role :str):
         return {
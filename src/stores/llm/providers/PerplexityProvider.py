@@ -1,7 +1,7 @@
 
 from pydoc import text
 from stores.llm.LLMInterface import LLMInterface
-from perplexity import Perplexity
+from perplexity import Perplexity , AsyncPerplexity
 import logging
 from stores.llm.LLMEnums import OpenAIEnum, PerplexityEnum
 
@@ -9,7 +9,9 @@ class PerplexityProvider(LLMInterface):
     def __init__(self , api_key : str ,
                 default_input_max_characters:int=1000,
                 default_generation_max_output_tokens:int=1000,
-                default_generation_temperature:float=0.1):
+                default_generation_temperature:float=0.1,
+                http_client = None,
+                max_retries:int=2):
         
         self.api_key = api_key
         self.default_input_max_characters = default_input_max_characters
@@ -22,6 +24,13 @@ class PerplexityProvider(LLMInterface):
         self.client = Perplexity(
             api_key = self.api_key
         )
+        # async client on the httpx.AsyncClient pool shared by the app
+        self.async_client = AsyncPerplexity(
+            api_key = self.api_key,
+            http_client = http_client,
+            # 0 when the RateGovernor retries , so it sees every 429
+            max_retries = max_retries
+        )
         
         self.Enums = PerplexityEnum
         
@@ -37,7 +46,7 @@ class PerplexityProvider(LLMInterface):
     def process_text(self , text:str):
         return text[:self.default_input_max_characters].strip() # remove leading/trailing whitespace
     
-    def generate_text(self , prompt:str, chat_history:list=[]  , max_output_tokens:int=None , temperature : float = None):
+    def get_generation_request(self , prompt:str, chat_history:list , max_output_tokens:int=None , temperature : float = None):
         
         if not self.client:
             self.logger.error("Perplexity client was not set")
@@ -51,12 +60,14 @@ class PerplexityProvider(LLMInterface):
         
         chat_history.append(self.contruct_prompt(prompt=prompt , role=PerplexityEnum.USER.value))
         
-        response = self.client.chat.completions.create(
-            model = self.generation_model_id ,
-            messages = chat_history ,
-            max_tokens = max_output_tokens ,
-            temperature = temperature   
-        )
+        return {
+            "model": self.generation_model_id ,
+            "messages": chat_history ,
+            "max_tokens": max_output_tokens ,
+            "temperature": temperature
+        }
+    
+    def get_generation_answer(self , response , chat_history:list):
         
         if not response or not response.choices or len(response.choices) == 0 or not response.choices[0].message:
             self.logger.error("Error while generating text with Perplexity")
@@ -68,11 +79,36 @@ class PerplexityProvider(LLMInterface):
         chat_history.append(self.contruct_prompt(prompt=assistant_message, role=OpenAIEnum.ASSISTANT.value))
         
         return assistant_message
+    
+    def generate_text(self , prompt:str, chat_history:list=[]  , max_output_tokens:int=None , temperature : float = None):
+        
+        request = self.get_generation_request(prompt=prompt , chat_history=chat_history ,
+                                              max_output_tokens=max_output_tokens , temperature=temperature)
+        if request is None:
+            return None
+        
+        response = self.client.chat.completions.create(**request)
+        return self.get_generation_answer(response=response , chat_history=chat_history)
+    
+    async def generate_text_async(self , prompt:str, chat_history:list=None  , max_output_tokens:int=None , temperature : float = None):
+        
+        chat_history = chat_history if chat_history is not None else []
+        request = self.get_generation_request(prompt=prompt , chat_history=chat_history ,
+                                              max_output_tokens=max_output_tokens , temperature=temperature)
+        if request is None:
+            return None
+        
+        response = await self.async_client.chat.completions.create(**request)
+        return self.get_generation_answer(response=response , chat_history=chat_history)
         
         
     def embed_text(self , text:str , document_type :str = None):
         pass
     
+    async def embed_text_async(self , text:str , document_type :str = None):
+        # perplexity has no embedding endpoint
+        pass
+    
     def contruct_prompt(self , prompt:str , role :str):
         return {
         "role":role,
@@ -7,7 +7,9 @@ class coHereProvider(LLMInterface):
     def __init__(self , api_key : str ,
                 default_input_max_characters:int=1000,
                 default_generation_max_output_tokens:int=1000,
-                default_generation_temperature:float=0.1):
+                default_generation_temperature:float=0.1,
+                http_client = None,
+                max_retries:int=2):
         
         self.api_key = api_key
         self.default_input_max_characters = default_input_max_characters
@@ -16,7 +18,14 @@ class coHereProvider(LLMInterface):
         self.generation_model_id = None
         self.embedding_model_id = None
         self.embedding_size = None 
+        # sent with every call (request_options) , 0 leaves the retries of the 429s to the RateGovernor
+        self.max_retries = max_retries
         self.client = cohere.Client(api_key = self.api_key)
+        # async client on the httpx.AsyncClient pool shared by the app
+        if http_client is not None:
+            self.async_client = cohere.AsyncClient(api_key = self.api_key , httpx_client = http_client)
+        else:
+            self.async_client = cohere.AsyncClient(api_key = self.api_key)
         
         self.Enums = coHereEnum
         self.logger = logging.getLogger(__name__)
@@ -33,7 +42,7 @@ class coHereProvider(LLMInterface):
     def process_text(self , text:str):
         return text[:self.default_input_max_characters].strip()
     
-    def generate_text(self , prompt:str, chat_history:list=[]  , max_output_tokens:int=None , temperature : float = None):
+    def get_generation_request(self , prompt:str, chat_history:list , max_output_tokens:int=None , temperature : float = None):
         if not self.client:
             self.logger.error("coHere client was not set")
             return None
@@ -44,20 +53,41 @@ class coHereProvider(LLMInterface):
         max_output_tokens = max_output_tokens if max_output_tokens  else self.default_generation_max_output_tokens
         temperature = temperature if temperature  else self.default_generation_temperature
         
-        
-        response = self.client.chat(
-            model = self.generation_model_id,
-            chat_history=chat_history,
-            message = self.process_text(prompt),
-            temperature=temperature,
-            max_tokens = max_output_tokens
-        )
+        return {
+            "model": self.generation_model_id,
+            "chat_history": chat_history,
+            "message": self.process_text(prompt),
+            "temperature": temperature,
+            "max_tokens": max_output_tokens,
+            "request_options": {"max_retries": self.max_retries}
+        }
+    
+    def get_generation_answer(self , response):
         if not response or not response.text:
             self.logger.error("Error while generating text with coHere")
             return None
         return response.text
     
-    def embed_text(self , text: Union[str, List[str]] , document_type :str = None):
+    def generate_text(self , prompt:str, chat_history:list=[]  , max_output_tokens:int=None , temperature : float = None):
+        request = self.get_generation_request(prompt=prompt , chat_history=chat_history ,
+                                              max_output_tokens=max_output_tokens , temperature=temperature)
+        if request is None:
+            return None
+        
+        response = self.client.chat(**request)
+        return self.get_generation_answer(response=response)
+    
+    async def generate_text_async(self , prompt:str, chat_history:list=None  , max_output_tokens:int=None , temperature : float = None):
+        chat_history = chat_history if chat_history is not None else []
+        request = self.get_generation_request(prompt=prompt , chat_history=chat_history ,
+                                              max_output_tokens=max_output_tokens , temperature=temperature)
+        if request is None:
+            return None
+        
+        response = await self.async_client.chat(**request)
+        return self.get_generation_answer(response=response)
+    
+    def get_embedding_request(self , text: Union[str, List[str]] , document_type :str = None):
         if not self.client:
             self.logger.error("coHere client was not set")
             return None 
@@ -72,18 +102,36 @@ class coHereProvider(LLMInterface):
         input_type = coHereEnum.DOCUMENT.value
         if document_type == DocumentTypeEnum.QUERY.value:
             input_type = coHereEnum.QUERY.value
-        response = self.client.embed(
-            model = self.embedding_model_id,
-            texts = [self.process_text(t) for t in text],
-            input_type = input_type,
-            embedding_types=["float"]
-        )
-        
+        return {
+            "model": self.embedding_model_id,
+            "texts": [self.process_text(t) for t in text],
+            "input_type": input_type,
+            "embedding_types": ["float"],
+            "request_options": {"max_retries": self.max_retries}
+        }
+    
+    def get_embedding_vectors(self , response):
         if not response or not response.embeddings or not response.embeddings.float:
             self.logger.error("Error while generating embeddings with coHere")
             return None
         
         return [ f for f in response.embeddings.float ]
+    
+    def embed_text(self , text: Union[str, List[str]] , document_type :str = None):
+        request = self.get_embedding_request(text=text , document_type=document_type)
+        if request is None:
+            return None
+        
+        response = self.client.embed(**request)
+        return self.get_embedding_vectors(response=response)
+    
+    async def embed_text_async(self , text: Union[str, List[str]] , document_type :str = None):
+        request = self.get_embedding_request(text=text , document_type=document_type)
+        if request is None:
+            return None
+        
+        response = await self.async_client.embed(**request)
+        return self.get_embedding_vectors(response=response)
         
     def contruct_prompt(self , prompt:str , role :str):
         return {
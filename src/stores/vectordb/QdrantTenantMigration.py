@@ -0,0 +1,87 @@
+from .providers.QdrantDBProvider import QdrantDBProvider , TENANT_COLLECTION_NAME , TENANT_FIELD
+from qdrant_client import models
+import argparse
+import asyncio
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+async def migrate_collection(provider: QdrantDBProvider , collection_name: str , batch_size: int = 256 ,
+                             keep: bool = False):
+    # copies the points of one per-project collection into the shared collection of its embedding size ,
+    # the point ids (chunk ids) are kept so a migration stopped halfway can run again
+    shared_collection_name , tenant_id = provider.get_tenant(collection_name)
+    collection_info = await provider.client.get_collection(collection_name = collection_name)
+    _ = await provider.create_collection(
+        collection_name=collection_name,
+        embedding_size=collection_info.config.params.vectors.size
+    )
+
+    moved_count = 0
+    offset = None
+    while True:
+        records , offset = await provider.client.scroll(
+            collection_name = collection_name,
+            limit = batch_size,
+            offset = offset,
+            with_payload = True,
+            with_vectors = True
+        )
+        if records:
+            points = [
+                models.PointStruct(
+                    id = record.id,
+                    vector = record.vector,
+                    payload = {**(record.payload or {}) , TENANT_FIELD: tenant_id}
+                )
+                for record in records
+            ]
+            await provider.upload_points(collection_name=shared_collection_name , points=points , batch_size=batch_size)
+            moved_count += len(records)
+        if offset is None:
+            break
+
+    tenant_points_count = await provider.count_tenant_points(collection_name=shared_collection_name , tenant_id=tenant_id)
+    if tenant_points_count < moved_count:
+        raise RuntimeError(f"Only {tenant_points_count} of {moved_count} points of {collection_name} "
+                           f"are in {shared_collection_name}")
+
+    if not keep:
+        _ = await provider.client.delete_collection(collection_name = collection_name)
+    logger.info(f"Moved {moved_count} points from {collection_name} to {shared_collection_name}")
+    return moved_count
+
+async def migrate(provider: QdrantDBProvider , batch_size: int = 256 , keep: bool = False):
+    await provider.connect()
+    try:
+        collections = await provider.list_all_collections()
+        for collection in collections.collections:
+            # the shared collections (collection_{size}) do not match
+            if TENANT_COLLECTION_NAME.fullmatch(collection.name):
+                _ = await migrate_collection(provider=provider , collection_name=collection.name ,
+                                             batch_size=batch_size , keep=keep)
+    finally:
+        await provider.disconnect()
+
+def main():
+    from helpers.config import get_settings
+    from .VectorDBProviderFactory import VectorDBProviderFactory
+    from .VectorDBEnums import VectorDBEnums
+
+    parser = argparse.ArgumentParser(description="Move the per-project qdrant collections to the multi tenant layout")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--keep", action="store_true", help="keep the per-project collections")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    if not settings.VECTOR_DB_QDRANT_MULTI_TENANT:
+        raise ValueError("Set VECTOR_DB_QDRANT_MULTI_TENANT = True before moving the collections")
+
+    provider = VectorDBProviderFactory(config=settings).create(provider=VectorDBEnums.QDRANT.value)
+    asyncio.run(migrate(provider=provider , batch_size=args.batch_size , keep=args.keep))
+
+# python -m stores.vectordb.QdrantTenantMigration , run from src/ while the app (and the broker) is stopped
+# when the qdrant storage is embedded , it can only be opened by one process
+if __name__ == "__main__":
+    main()
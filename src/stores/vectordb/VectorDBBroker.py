@@ -0,0 +1,144 @@
+from .VectorInterface import VectorInterface
+import asyncio
+import logging
+import os
+import pickle
+import signal
+import struct
+
+logger = logging.getLogger('uvicorn.error')
+
+# a frame is a 4 bytes length then a pickled list of messages (requests or responses) ,
+# every message carries the id of its request so the answers can come back in any order
+FRAME_HEADER = struct.Struct("!I")
+
+# the provider methods a worker can call through the broker
+BROKER_METHODS = set(VectorInterface.__abstractmethods__) - {"connect", "disconnect"}
+
+async def read_frame(reader: asyncio.StreamReader):
+    header = await reader.readexactly(FRAME_HEADER.size)
+    (frame_size,) = FRAME_HEADER.unpack(header)
+    return pickle.loads(await reader.readexactly(frame_size))
+
+class FrameSender:
+    """
+    Writes the messages queued by many coroutines , everything waiting in the queue
+    when the socket is free again leaves in the same frame.
+    """
+    def __init__(self , writer: asyncio.StreamWriter , max_batch: int = 256):
+        self.writer = writer
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+
+    async def run(self):
+        while True:
+            messages = [await self.queue.get()]
+            while not self.queue.empty() and len(messages) < self.max_batch:
+                messages.append(self.queue.get_nowait())
+
+            data = pickle.dumps(messages , protocol=pickle.HIGHEST_PROTOCOL)
+            self.writer.write(FRAME_HEADER.pack(len(data)) + data)
+            await self.writer.drain()
+
+class VectorDBBroker:
+    """
+    Owns one embedded vector store (e.g. qdrant local mode , which locks its directory)
+    and serves it to the uvicorn workers over a unix socket.
+    """
+    def __init__(self , provider: VectorInterface , socket_path: str , max_batch: int = 256):
+        self.provider = provider
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.server = None
+        # keep a reference on the running requests , the loop only holds weak ones
+        self.request_tasks = set()
+        self.writers = set()
+
+    async def start(self):
+        await self.provider.connect()
+
+        # a socket file left by a broker that was killed
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.server = await asyncio.start_unix_server(self.handle_connection , path=self.socket_path)
+        # the frames are pickled , only the processes of the same user may connect
+        os.chmod(self.socket_path , 0o600)
+        logger.info(f"Vector db broker listening on {self.socket_path}")
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+        # the workers see the connection drop and fail their pending calls
+        for writer in list(self.writers):
+            writer.close()
+        if self.server is not None:
+            await self.server.wait_closed()
+        for task in self.request_tasks:
+            task.cancel()
+        await self.provider.disconnect()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    async def handle_connection(self , reader: asyncio.StreamReader , writer: asyncio.StreamWriter):
+        sender = FrameSender(writer=writer , max_batch=self.max_batch)
+        sender_task = asyncio.create_task(sender.run())
+        self.writers.add(writer)
+        try:
+            while True:
+                for request in await read_frame(reader):
+                    # the requests of one connection run concurrently , a slow upload does not hold the searches
+                    task = asyncio.create_task(self.handle_request(request=request , sender=sender))
+                    self.request_tasks.add(task)
+                    task.add_done_callback(self.request_tasks.discard)
+        except (asyncio.IncompleteReadError , ConnectionResetError):
+            # the worker went away (or the broker is stopping)
+            pass
+        finally:
+            self.writers.discard(writer)
+            sender_task.cancel()
+            writer.close()
+
+    async def handle_request(self , request: dict , sender: FrameSender):
+        method = request.get("method")
+        if method not in BROKER_METHODS:
+            await sender.queue.put({"id": request.get("id") , "error": f"Unknown vector db method {method}"})
+            return
+
+        try:
+            result = await getattr(self.provider , method)(**request.get("kwargs" , {}))
+        except Exception as e:
+            logger.error(f"Vector db broker error in {method}: {e}")
+            await sender.queue.put({"id": request["id"] , "error": str(e)})
+            return
+        await sender.queue.put({"id": request["id"] , "result": result})
+
+    async def run(self):
+        await self.start()
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT , signal.SIGTERM):
+            loop.add_signal_handler(signal_number , stop_event.set)
+        await stop_event.wait()
+        await self.stop()
+
+def main():
+    from helpers.config import get_settings
+    from .VectorDBProviderFactory import VectorDBProviderFactory
+    from .VectorDBEnums import VectorDBEnums
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    if settings.VECTOR_DB_BROKER_BACKEND != VectorDBEnums.QDRANT.value:
+        raise ValueError(f"The vector db broker can not own {settings.VECTOR_DB_BROKER_BACKEND}")
+
+    provider = VectorDBProviderFactory(config=settings).create(provider=settings.VECTOR_DB_BROKER_BACKEND)
+    broker = VectorDBBroker(
+        provider=provider,
+        socket_path=settings.VECTOR_DB_BROKER_SOCKET_PATH,
+        max_batch=settings.VECTOR_DB_BROKER_MAX_BATCH
+    )
+    asyncio.run(broker.run())
+
+# python -m stores.vectordb.VectorDBBroker (started by docker/minirag/entrypoint.sh)
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,25 @@ from enum import Enum
 class VectorDBEnums(Enum):
     QDRANT = "QDRANT"
     PGVECTOR = "PGVECTOR"
+    # the workers share an embedded store owned by the broker process (stores/vectordb/VectorDBBroker.py)
+    BROKER = "BROKER"
     
 class DistanceMethodEnums(Enum):
     COSINE = "cosine"
     DOT = "dot"
     
+class QdrantQuantizationEnums(Enum):
+    NONE = "none"
+    SCALAR = "scalar"  # int8 , 4x smaller
+    BINARY = "binary"  # 1 bit per dimension , 32x smaller , needs oversampling and rescoring
+    
 class PgVectorTableSchemesEnums(Enum):
     ID = "id"
     TEXT = "text"
     VECTOR = "vector"
     CHUNK_ID = "chunk_id"
     METADATA = "metadata"
+    PROJECT_ID = "project_id"  # partition key of the partitioned layout
     _PREFIX = "pgvector"
 
 class PgVectorDistanceMethodEnums(Enum):
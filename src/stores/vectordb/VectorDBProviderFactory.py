@@ -1,13 +1,16 @@
 from .providers import QdrantDBProvider
 from .providers import PGVectorProvider
+from .providers import VectorDBBrokerProvider
 from .VectorDBEnums import VectorDBEnums
 from controllers import BaseController
 from sqlalchemy.orm import sessionmaker
 class VectorDBProviderFactory:
-    def __init__(self , config : dict , db_client: sessionmaker = None):
+    def __init__(self , config : dict , db_client: sessionmaker = None , db_engine = None):
         self.config = config 
         self.base_controller = BaseController()
         self.db_client = db_client
+        # the pgvector provider registers its binary vector codec on the engine connections
+        self.db_engine = db_engine
         
     def create(self , provider:str):
         
@@ -18,7 +21,22 @@ class VectorDBProviderFactory:
                 distance_method = self.config.VECTOR_DB_DISTANCE_METHOD,
                 default_vector_size = self.config.EMBEDDING_MODEL_SIZE,
                 index_threshold= self.config.VECTOR_DB_PGVECTOR_INDEX_THRESHOLD,
-                
+                url = self.config.VECTOR_DB_QDRANT_URL,
+                api_key = self.config.VECTOR_DB_QDRANT_API_KEY,
+                prefer_grpc = self.config.VECTOR_DB_QDRANT_PREFER_GRPC,
+                grpc_port = self.config.VECTOR_DB_QDRANT_GRPC_PORT,
+                timeout = self.config.VECTOR_DB_QDRANT_TIMEOUT,
+                upload_batch_size = self.config.VECTOR_DB_QDRANT_UPLOAD_BATCH_SIZE,
+                upload_parallel = self.config.VECTOR_DB_QDRANT_UPLOAD_PARALLEL,
+                quantization = self.config.VECTOR_DB_QDRANT_QUANTIZATION,
+                quantization_always_ram = self.config.VECTOR_DB_QDRANT_QUANTIZATION_ALWAYS_RAM,
+                on_disk = self.config.VECTOR_DB_QDRANT_ON_DISK,
+                hnsw_m = self.config.VECTOR_DB_QDRANT_HNSW_M,
+                hnsw_ef_construct = self.config.VECTOR_DB_QDRANT_HNSW_EF_CONSTRUCT,
+                search_hnsw_ef = self.config.VECTOR_DB_QDRANT_SEARCH_HNSW_EF,
+                search_oversampling = self.config.VECTOR_DB_QDRANT_SEARCH_OVERSAMPLING,
+                search_rescore = self.config.VECTOR_DB_QDRANT_SEARCH_RESCORE,
+                multi_tenant = self.config.VECTOR_DB_QDRANT_MULTI_TENANT,
             )
         
         elif provider == VectorDBEnums.PGVECTOR.value:
@@ -28,6 +46,24 @@ class VectorDBProviderFactory:
                 default_vector_size = self.config.EMBEDDING_MODEL_SIZE,
                 distance_method = self.config.VECTOR_DB_DISTANCE_METHOD,
                 index_threshold = self.config.VECTOR_DB_PGVECTOR_INDEX_THRESHOLD,
+                db_engine = self.db_engine,
+                copy_min_rows = self.config.VECTOR_DB_PGVECTOR_COPY_MIN_ROWS,
+                batches_per_commit = self.config.VECTOR_DB_PGVECTOR_BATCHES_PER_COMMIT,
+                index_type = self.config.VECTOR_DB_PGVECTOR_INDEX_TYPE,
+                hnsw_m = self.config.VECTOR_DB_PGVECTOR_HNSW_M,
+                hnsw_ef_construction = self.config.VECTOR_DB_PGVECTOR_HNSW_EF_CONSTRUCTION,
+                ivfflat_lists = self.config.VECTOR_DB_PGVECTOR_IVFFLAT_LISTS,
+                index_maintenance_work_mem = self.config.VECTOR_DB_PGVECTOR_INDEX_MAINTENANCE_WORK_MEM,
+                index_parallel_workers = self.config.VECTOR_DB_PGVECTOR_INDEX_PARALLEL_WORKERS,
+                partitioned = self.config.VECTOR_DB_PGVECTOR_PARTITIONED,
             )    
+        
+        elif provider == VectorDBEnums.BROKER.value:
+            return VectorDBBrokerProvider(
+                socket_path = self.config.VECTOR_DB_BROKER_SOCKET_PATH,
+                timeout = self.config.VECTOR_DB_BROKER_TIMEOUT,
+                connect_timeout = self.config.VECTOR_DB_BROKER_CONNECT_TIMEOUT,
+                max_batch = self.config.VECTOR_DB_BROKER_MAX_BATCH,
+            )
         return None 
                 
@@ -28,7 +28,8 @@ class VectorInterface(ABC):
         pass
     
     @abstractmethod
-    def create_collection(self , collection_name:str , embedding_size:int , do_reset:bool = False):
+    def create_collection(self , collection_name:str , embedding_size:int , do_reset:bool = False ,
+                          collection_options:dict = None):
         pass
     @abstractmethod
     def insert_one(self , collection_name:str , text:str , vector : List , 
@@ -41,7 +42,22 @@ class VectorInterface(ABC):
                            record_ids:List = None , batch_size:int = 50):
         pass
     @abstractmethod
-    def search_by_vector(self , collection_name:str , vector : List , limit:int) -> List[RetrievedDocument]:
+    def upsert_many(self , collection_name:str , texts:List , vectors:List , 
+                           metadata:List = None,
+                           record_ids:List = None , batch_size:int = 50):
+        pass
+    @abstractmethod
+    def delete_by_record_ids(self , collection_name:str , record_ids:List):
+        pass
+    @abstractmethod
+    def start_vector_index_build(self , collection_name:str , index_type:str = None , do_reset:bool = False):
+        pass
+    @abstractmethod
+    def get_vector_index_build_status(self , collection_name:str):
+        pass
+    @abstractmethod
+    def search_by_vector(self , collection_name:str , vector : List , limit:int ,
+                         search_params:dict = None) -> List[RetrievedDocument]:
         pass
     
     
\ No newline at end of file
@@ -5,22 +5,55 @@ from ..VectorDBEnums import (DistanceMethodEnums ,PgVectorTableSchemesEnums ,
 from models.db_schemes import RetrievedDocument
 import logging 
 from typing import List
-from sqlalchemy import text as sql_text
+from sqlalchemy import text as sql_text , event
 from sqlalchemy.exc import IntegrityError
+from pgvector.asyncpg import register_vector
+from datetime import datetime , timezone
+from contextlib import asynccontextmanager
+import asyncio
 import json 
+import math
+import re
+
+# partitioned layout : the per-project collection names of NLPController.create_collection_name
+# become the LIST partitions (by project_id) of one table per embedding size
+PARTITION_COLLECTION_NAME = re.compile(r"collection_(\d+)_(\d+)")
+
+# first key of the advisory lock held on a collection while its vector index is built
+INDEX_BUILD_LOCK_NAMESPACE = 7302
 
 class PGVectorProvider(VectorInterface):
     
     def __init__(self , db_client , default_vector_size:int = 786 , 
-                 distance_method:str=None , index_threshold:int = 100):
+                 distance_method:str=None , index_threshold:int = 100 ,
+                 db_engine = None , copy_min_rows:int = 200 , batches_per_commit:int = 1 ,
+                 index_type:str = PgVectorIndexTypeEnums.HNSW.value , hnsw_m:int = 16 , hnsw_ef_construction:int = 64 ,
+                 ivfflat_lists:int = 0 , index_maintenance_work_mem:str = None , index_parallel_workers:int = None ,
+                 partitioned:bool = False):
         
         self.db_client = db_client
+        self.db_engine = db_engine
+        # vectors are sent as binary float arrays once the asyncpg codec is registered (see connect)
+        self.is_vector_codec_registered = False
+        self.copy_min_rows = copy_min_rows
+        self.batches_per_commit = batches_per_commit
+        self.staging_table_name = f"{PgVectorTableSchemesEnums._PREFIX.value}_upsert_staging"
         self.default_vector_size = default_vector_size
         
         self.pgvector_table_prefix = PgVectorTableSchemesEnums._PREFIX.value
         self.logger = logging.getLogger("uvicorn")
         
         self.index_threshold = index_threshold
+        # vector index build parameters , the index is built on demand (see start_vector_index_build)
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.ivfflat_lists = ivfflat_lists
+        self.index_maintenance_work_mem = index_maintenance_work_mem
+        self.index_parallel_workers = index_parallel_workers
+        # background builds of this process : collection_name -> task / last build info
+        self.index_build_tasks = {}
+        self.index_builds = {}
         
         if distance_method == DistanceMethodEnums.COSINE.value:
             distance_method = PgVectorDistanceMethodEnums.COSINE.value
@@ -30,6 +63,11 @@ class PGVectorProvider(VectorInterface):
         
         self.distance_method = distance_method
         self.default_index_name = lambda collection_name: f"{collection_name}_vector_idx"
+        self.chunk_id_index_name = lambda collection_name: f"{collection_name}_chunk_id_idx"
+        # collections whose unique chunk_id index was already checked by this process
+        self.chunk_id_indexed_collections = set()
+        
+        self.partitioned = partitioned
     
     async def get_pgvector_index_name(self , collection_name:str): 
         return  f"{collection_name}_vector_idx"
@@ -46,8 +84,61 @@ class PGVectorProvider(VectorInterface):
             # vector extension already exists — safe to ignore
             pass
         
+        # the vector type exists now , every new connection of the engine gets the binary codec
+        # and the connections opened before (without it) are dropped from the pool
+        if self.db_engine is not None:
+            if not event.contains(self.db_engine.sync_engine , "connect" , self.register_vector_codec):
+                event.listen(self.db_engine.sync_engine , "connect" , self.register_vector_codec)
+            await self.db_engine.dispose()
+            self.is_vector_codec_registered = True
+        
+    def register_vector_codec(self , dbapi_connection , connection_record):
+        dbapi_connection.run_async(register_vector)
+        
     async def disconnect(self):
-        pass
+        # an interrupted concurrent build leaves an invalid index , the next build drops it
+        for task in self.index_build_tasks.values():
+            if not task.done():
+                task.cancel()
+        self.index_build_tasks = {}
+    
+    def to_db_vector(self , vector:List):
+        # a plain list goes through the binary codec , without it postgres parses the text form
+        if self.is_vector_codec_registered:
+            return [float(v) for v in vector]
+        return "["+",".join([str(v) for v in vector]) + "]"
+    
+    async def write_batches(self , batches:List , write_batch):
+        # batches_per_commit batches per transaction , 0 keeps the whole call in one transaction
+        batches_per_commit = self.batches_per_commit or len(batches)
+        for i in range(0 , len(batches) , batches_per_commit):
+            async with self.db_client() as session:
+                async with session.begin():
+                    for batch in batches[i:i+batches_per_commit]:
+                        await write_batch(session , batch)
+    
+    def get_partition(self , collection_name:str):
+        # (partitioned table , project id) , the project id is None out of the partitioned layout
+        if self.partitioned:
+            match = PARTITION_COLLECTION_NAME.fullmatch(collection_name)
+            if match:
+                return f"collection_{match.group(1)}" , int(match.group(2))
+        return collection_name , None
+    
+    async def get_partition_info(self , collection_name:str):
+        # None when the table does not exist , parent_name is None for a plain table (not attached)
+        async with self.db_client() as session:
+            async with session.begin():
+                partition_sql = sql_text("""
+                                         SELECT parent.relname AS parent_name , inherits.inhdetachpending AS detach_pending
+                                         FROM pg_class child
+                                         LEFT JOIN pg_inherits inherits ON inherits.inhrelid = child.oid
+                                         LEFT JOIN pg_class parent ON parent.oid = inherits.inhparent
+                                         WHERE child.relname = :collection_name AND child.relkind = 'r'
+                                         """
+                )
+                result = await session.execute(partition_sql , {"collection_name": collection_name})
+                return result.mappings().first()
     
     async def is_collection_existed(self, collection_name: str) -> bool:
         record = None
@@ -91,7 +182,7 @@ class PGVectorProvider(VectorInterface):
                 table_Data = table_info_result.fetchone()
                 if not table_Data:
                     return None 
-                return {
+                collection_info = {
                     "table_info" : {
                         "schemaname": table_Data[0],
                         "tablename": table_Data[1],
@@ -101,8 +192,34 @@ class PGVectorProvider(VectorInterface):
                         },
                     "record_count": record_count.scalar_one()
                 }
+        
+        table_name , project_id = self.get_partition(collection_name)
+        if project_id is not None:
+            partition_info = await self.get_partition_info(collection_name = collection_name)
+            collection_info["partition"] = {
+                "table_name": table_name,
+                "project_id": project_id,
+                "is_attached": partition_info is not None and partition_info["parent_name"] == table_name,
+            }
+        return collection_info
                 
     async def delete_collection(self , collection_name:str):
+        table_name , project_id = self.get_partition(collection_name)
+        if project_id is not None:
+            partition_info = await self.get_partition_info(collection_name = collection_name)
+            if partition_info is not None and partition_info["parent_name"] is not None:
+                # the partition leaves the table first , then it is dropped alone :
+                # no scan and no lock held on the other projects
+                self.logger.info(f"Detaching partition {collection_name} from {partition_info['parent_name']}")
+                if partition_info["detach_pending"]:
+                    # an interrupted DETACH ... CONCURRENTLY
+                    detach_mode = "FINALIZE"
+                else:
+                    detach_mode = "CONCURRENTLY" if self.db_engine is not None else ""
+                await self.execute_maintenance_sql(sql_text(
+                    f'ALTER TABLE {partition_info["parent_name"]} DETACH PARTITION {collection_name} {detach_mode}'
+                ))
+        
         async with self.db_client() as session:
             async with session.begin():
                 self.logger.info(f"Deleting collection {collection_name}")
@@ -110,12 +227,22 @@ class PGVectorProvider(VectorInterface):
                 await session.execute(drop_table_sql, {"collection_name": collection_name})
                 # when you drop or create you should commit the transaction immediately
                 await session.commit()
+            self.chunk_id_indexed_collections.discard(collection_name)
             return True 
     
-    async def create_collection(self , collection_name:str , embedding_size:int , do_reset:bool = False):
+    async def create_collection(self , collection_name:str , embedding_size:int , do_reset:bool = False ,
+                                collection_options:dict = None):
+        # collection_options are the qdrant storage options , the pgvector index is set by start_vector_index_build
         if do_reset :
             _ = await self.delete_collection(collection_name=collection_name)
         
+        table_name , project_id = self.get_partition(collection_name)
+        if project_id is not None:
+            return await self.create_partition(
+                collection_name=collection_name , table_name=table_name ,
+                project_id=project_id , embedding_size=embedding_size
+            )
+        
         is_collection_existed = await self.is_collection_existed(collection_name = collection_name)
         
         if not is_collection_existed:
@@ -134,34 +261,177 @@ class PGVectorProvider(VectorInterface):
                         ')'
                     )
                     await session.execute(create_sql)
+                    # one row per chunk , the upserts conflict on it
+                    await session.execute(sql_text(
+                        f'CREATE UNIQUE INDEX {self.chunk_id_index_name(collection_name)} '
+                        f'ON {collection_name} ({PgVectorTableSchemesEnums.CHUNK_ID.value})'
+                    ))
                     await session.commit()
+                self.chunk_id_indexed_collections.add(collection_name)
                 return True
             
         return False
 
+    async def create_partition(self , collection_name:str , table_name:str , project_id:int , embedding_size:int):
+        # one table per embedding size , LIST partitioned : every project is its own partition
+        # (its own indexes and a DETACH / DROP to delete it) , named like the per-project table it replaces
+        async with self.db_client() as session:
+            async with session.begin():
+                await session.execute(sql_text(
+                    f'CREATE TABLE IF NOT EXISTS {table_name} ('
+                        f'{PgVectorTableSchemesEnums.ID.value} bigserial,'
+                        f'{PgVectorTableSchemesEnums.TEXT.value} text,'
+                        f'{PgVectorTableSchemesEnums.VECTOR.value} vector ({embedding_size}),'
+                        f'{PgVectorTableSchemesEnums.CHUNK_ID.value} integer,'
+                        f'{PgVectorTableSchemesEnums.METADATA.value} jsonb DEFAULT \'{{}}\','
+                        f'{PgVectorTableSchemesEnums.PROJECT_ID.value} integer NOT NULL,'
+                        f'PRIMARY KEY ({PgVectorTableSchemesEnums.ID.value}, {PgVectorTableSchemesEnums.PROJECT_ID.value}),'
+                        f'FOREIGN KEY ({PgVectorTableSchemesEnums.CHUNK_ID.value}) REFERENCES chunks(chunk_id)'
+                    f') PARTITION BY LIST ({PgVectorTableSchemesEnums.PROJECT_ID.value})'
+                ))
+            await session.commit()
+        
+        partition_info = await self.get_partition_info(collection_name = collection_name)
+        if partition_info is not None and partition_info["parent_name"] == table_name:
+            return False
+        
+        async with self.db_client() as session:
+            async with session.begin():
+                if partition_info is None:
+                    self.logger.info(f"creating partition {collection_name} of {table_name}")
+                    # the project_id default of the partition : the rows are written straight into it ,
+                    # the insert / upsert / copy statements stay the same as for a plain table
+                    await session.execute(sql_text(
+                        f'CREATE TABLE {collection_name} PARTITION OF {table_name} ('
+                            f'{PgVectorTableSchemesEnums.PROJECT_ID.value} DEFAULT {project_id}'
+                        f') FOR VALUES IN ({project_id})'
+                    ))
+                else:
+                    # a per-project table created before the partitioned layout , it becomes the partition
+                    self.logger.info(f"attaching table {collection_name} to {table_name}")
+                    await session.execute(sql_text(f'ALTER TABLE {collection_name} DROP CONSTRAINT IF EXISTS {collection_name}_pkey'))
+                    await session.execute(sql_text(
+                        f'ALTER TABLE {collection_name} ADD COLUMN IF NOT EXISTS '
+                        f'{PgVectorTableSchemesEnums.PROJECT_ID.value} integer NOT NULL DEFAULT {project_id}'
+                    ))
+                    await session.execute(sql_text(
+                        f'ALTER TABLE {table_name} ATTACH PARTITION {collection_name} FOR VALUES IN ({project_id})'
+                    ))
+                # one row per chunk , the upserts conflict on it
+                await session.execute(sql_text(
+                    f'CREATE UNIQUE INDEX IF NOT EXISTS {self.chunk_id_index_name(collection_name)} '
+                    f'ON {collection_name} ({PgVectorTableSchemesEnums.CHUNK_ID.value})'
+                ))
+            await session.commit()
+        self.chunk_id_indexed_collections.add(collection_name)
+        # an attached table keeps its rows , it is not a new collection
+        return partition_info is None
+
+    async def ensure_chunk_id_index(self , collection_name:str):
+        # tables created before the unique chunk_id index : keep the newest row of every chunk , then add the index
+        if collection_name in self.chunk_id_indexed_collections:
+            return
+        
+        index_name = self.chunk_id_index_name(collection_name)
+        async with self.db_client() as session:
+            async with session.begin():
+                index_check_sql = sql_text(
+                    "SELECT 1 FROM pg_indexes WHERE tablename = :collection_name AND indexname = :index_name"
+                )
+                result = await session.execute(index_check_sql , {
+                    "collection_name": collection_name,
+                    "index_name": index_name
+                })
+                if not result.scalar_one_or_none():
+                    self.logger.info(f"Removing duplicated chunks and adding {index_name}")
+                    dedupe_sql = sql_text(
+                        f'DELETE FROM {collection_name} older USING {collection_name} newer '
+                        f'WHERE older.{PgVectorTableSchemesEnums.CHUNK_ID.value} = newer.{PgVectorTableSchemesEnums.CHUNK_ID.value} '
+                        f'AND older.{PgVectorTableSchemesEnums.ID.value} < newer.{PgVectorTableSchemesEnums.ID.value}'
+                    )
+                    await session.execute(dedupe_sql)
+                    await session.execute(sql_text(
+                        f'CREATE UNIQUE INDEX IF NOT EXISTS {index_name} '
+                        f'ON {collection_name} ({PgVectorTableSchemesEnums.CHUNK_ID.value})'
+                    ))
+            await session.commit()
+        self.chunk_id_indexed_collections.add(collection_name)
+
 
     async def is_index_existed(self , collection_name :str )-> bool:
+        return await self.get_index_state(collection_name = collection_name) == "valid"
+    
+    async def get_index_state(self , collection_name :str):
+        # None , "valid" or "invalid" (a CREATE INDEX CONCURRENTLY that failed or was interrupted)
         index_name = self.default_index_name(collection_name)
         async with self.db_client() as session:
             async with session.begin():
                 index_check_sql = sql_text("""
-                                           SELECT 1
+                                           SELECT pg_index.indisvalid
                                            FROM pg_indexes 
-                                           WHERE tablename = :collection_name
-                                           AND indexname = :index_name
+                                           JOIN pg_class ON pg_class.relname = pg_indexes.indexname
+                                           JOIN pg_index ON pg_index.indexrelid = pg_class.oid
+                                           WHERE pg_indexes.tablename = :collection_name
+                                           AND pg_indexes.indexname = :index_name
                                            """
                 )
                 result = await session.execute(index_check_sql , {
                     "collection_name": collection_name,
                     "index_name": index_name
                 })
-                
-                return bool(result.scalar_one_or_none())
+                is_valid = result.scalar_one_or_none()
+        
+        if is_valid is None:
+            return None
+        return "valid" if is_valid else "invalid"
+    
+    def get_index_params(self , index_type:str , record_count:int):
+        if index_type == PgVectorIndexTypeEnums.IVFFLAT.value:
+            lists = self.ivfflat_lists
+            if not lists:
+                # pgvector guideline : rows / 1000 up to 1M rows , sqrt(rows) above
+                lists = record_count // 1000 if record_count <= 1000000 else int(math.sqrt(record_count))
+            return f'WITH (lists = {max(lists , 1)})'
+        return f'WITH (m = {self.hnsw_m}, ef_construction = {self.hnsw_ef_construction})'
     
-    async def create_vector_index(self , collection_name:str , index_type:str = PgVectorIndexTypeEnums.HNSW.value):
-        is_index_existed = await self.is_index_existed(collection_name = collection_name)
-        if is_index_existed:
+    async def execute_maintenance_sql(self , maintenance_sql):
+        # CREATE / DROP INDEX CONCURRENTLY can not run inside a transaction block
+        if self.db_engine is None:
+            async with self.db_client() as session:
+                async with session.begin():
+                    await session.execute(maintenance_sql)
+            return
+        
+        async with self.db_engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                if self.index_maintenance_work_mem:
+                    await connection.execute(sql_text(f"SET maintenance_work_mem = '{self.index_maintenance_work_mem}'"))
+                if self.index_parallel_workers is not None:
+                    await connection.execute(sql_text(f"SET max_parallel_maintenance_workers = {int(self.index_parallel_workers)}"))
+                await connection.execute(maintenance_sql)
+            finally:
+                # the connection goes back to the pool
+                await connection.execute(sql_text("RESET maintenance_work_mem"))
+                await connection.execute(sql_text("RESET max_parallel_maintenance_workers"))
+    
+    async def drop_vector_index(self , collection_name:str):
+        index_name = self.default_index_name(collection_name)
+        concurrently = "CONCURRENTLY " if self.db_engine is not None else ""
+        await self.execute_maintenance_sql(sql_text(f"DROP INDEX {concurrently}IF EXISTS {index_name}"))
+    
+    async def create_vector_index(self , collection_name:str , index_type:str = None):
+        # maintenance operation , run once a bulk load is done and not after every insert.
+        # with the engine it is built CONCURRENTLY : the collection keeps accepting writes meanwhile
+        index_type = index_type or self.index_type
+        
+        index_state = await self.get_index_state(collection_name = collection_name)
+        if index_state == "valid":
             return False
+        if index_state == "invalid":
+            # a failed or interrupted build , the running ones are ruled out by run_vector_index_build
+            self.logger.info(f"Dropping the invalid vector index of collection {collection_name}")
+            await self.drop_vector_index(collection_name = collection_name)
         
         async with self.db_client() as session:
             async with session.begin():
@@ -169,76 +439,153 @@ class PGVectorProvider(VectorInterface):
                 result = await session.execute(count_sql)
                 record_count = result.scalar_one()
                 
-                if record_count < self.index_threshold:
-                    self.logger.info(f"Skipping index creation for collection {collection_name} as record count {record_count} is below threshold {self.index_threshold}")
-                    return False
-                
-                self.logger.info(f"START : Creating index for collection {collection_name} with index type {index_type}")
-
-                index_name = await self.get_pgvector_index_name(collection_name = collection_name)
-                create_idx_sql = sql_text(
-                    f'CREATE INDEX {index_name} ON {collection_name} '
-                    f'USING {index_type} ({PgVectorTableSchemesEnums.VECTOR.value} {self.distance_method}) '
-                )
-                
-                # for debugging purpose
-                print(create_idx_sql)
-                
-                await session.execute(create_idx_sql)
-                await session.commit()
-                self.logger.info(f"END: Created vector index for collection {collection_name}")
-                
-                
-    
+        if record_count < self.index_threshold:
+            self.logger.info(f"Skipping index creation for collection {collection_name} as record count {record_count} is below threshold {self.index_threshold}")
+            return False
+        
+        self.logger.info(f"START : Creating index for collection {collection_name} with index type {index_type}")
+        
+        index_name = await self.get_pgvector_index_name(collection_name = collection_name)
+        concurrently = "CONCURRENTLY " if self.db_engine is not None else ""
+        create_idx_sql = sql_text(
+            f'CREATE INDEX {concurrently}IF NOT EXISTS {index_name} ON {collection_name} '
+            f'USING {index_type} ({PgVectorTableSchemesEnums.VECTOR.value} {self.distance_method}) '
+            f'{self.get_index_params(index_type=index_type , record_count=record_count)}'
+        )
+        await self.execute_maintenance_sql(create_idx_sql)
+        
+        self.logger.info(f"END: Created vector index for collection {collection_name}")
+        return True
     
     async def reset_vector_index(self , collection_name:str , 
-                                 index_type:str = PgVectorIndexTypeEnums.HNSW.value) -> bool:
-        index_name = self.default_index_name(collection_name)
+                                 index_type:str = None) -> bool:
+        await self.drop_vector_index(collection_name = collection_name)
+        return await self.create_vector_index(collection_name = collection_name , index_type = index_type)
+    
+    async def is_vector_index_build_running(self , collection_name:str):
+        # a CREATE INDEX of the collection in progress , started by any process (or by hand in psql) ,
+        # its index is still invalid and must not be taken for a failed build
         async with self.db_client() as session:
             async with session.begin():
-                drop_sql = sql_text(f"DROP INDEX IF EXISTS {index_name}")
-                await session.execute(drop_sql)
-                await session.commit()
-        
-        return await self.create_vector_index(collection_name = collection_name , index_type = index_type)
-        
+                progress_sql = sql_text("""
+                                        SELECT EXISTS (
+                                            SELECT 1 FROM pg_stat_progress_create_index
+                                            WHERE relid = to_regclass(:collection_name)
+                                        )
+                                        """
+                )
+                result = await session.execute(progress_sql , {"collection_name": collection_name})
+                return result.scalar()
     
+    @asynccontextmanager
+    async def vector_index_build_lock(self , collection_name:str):
+        # session advisory lock on its own autocommit connection , held for the whole build :
+        # two builds of the same collection never overlap , whichever uvicorn worker started them.
+        # without the engine the build runs in one transaction and leaves no invalid index behind
+        if self.db_engine is None:
+            yield True
+            return
+        
+        lock_params = {"namespace": INDEX_BUILD_LOCK_NAMESPACE , "collection_name": collection_name}
+        async with self.db_engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            result = await connection.execute(
+                sql_text("SELECT pg_try_advisory_lock(:namespace , hashtext(:collection_name))") , lock_params
+            )
+            is_locked = result.scalar()
+            try:
+                yield is_locked
+            finally:
+                if is_locked:
+                    try:
+                        await connection.execute(
+                            sql_text("SELECT pg_advisory_unlock(:namespace , hashtext(:collection_name))") , lock_params
+                        )
+                    except BaseException:
+                        # the lock must not stay on a pooled connection , closing it releases the lock
+                        await connection.invalidate()
+                        raise
     
+    async def run_vector_index_build(self , collection_name:str , index_type:str , do_reset:bool):
+        build = self.index_builds[collection_name]
+        try:
+            async with self.vector_index_build_lock(collection_name = collection_name) as is_locked:
+                if not is_locked or await self.is_vector_index_build_running(collection_name = collection_name):
+                    # another process is building this index , it is left alone
+                    build["status"] = "already_running"
+                    return
+                if do_reset:
+                    is_created = await self.reset_vector_index(collection_name = collection_name , index_type = index_type)
+                else:
+                    is_created = await self.create_vector_index(collection_name = collection_name , index_type = index_type)
+            build["status"] = "completed" if is_created else "skipped"
+        except asyncio.CancelledError:
+            build["status"] = "cancelled"
+            raise
+        except Exception as e:
+            self.logger.error(f"Error while building the vector index of collection {collection_name}: {e}")
+            build["status"] = "failed"
+            build["error"] = str(e)
+        finally:
+            build["finished_at"] = datetime.now(timezone.utc).isoformat()
     
+    async def start_vector_index_build(self , collection_name:str , index_type:str = None , do_reset:bool = False):
+        # False when a build of this collection is already running , in this process or in another one
+        task = self.index_build_tasks.get(collection_name)
+        if task is not None and not task.done():
+            return False
+        if await self.is_vector_index_build_running(collection_name = collection_name):
+            return False
+        
+        index_type = index_type or self.index_type
+        self.index_builds[collection_name] = {
+            "status": "running",
+            "index_type": index_type,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "error": None,
+        }
+        self.index_build_tasks[collection_name] = asyncio.create_task(self.run_vector_index_build(
+            collection_name = collection_name , index_type = index_type , do_reset = do_reset
+        ))
+        return True
     
+    async def get_vector_index_build_status(self , collection_name:str):
+        # the progress view covers the builds started by any process (or by hand in psql)
+        async with self.db_client() as session:
+            async with session.begin():
+                progress_sql = sql_text("""
+                                        SELECT phase , blocks_done , blocks_total , tuples_done , tuples_total
+                                        FROM pg_stat_progress_create_index
+                                        WHERE relid = to_regclass(:collection_name)
+                                        """
+                )
+                result = await session.execute(progress_sql , {"collection_name": collection_name})
+                progress = result.mappings().first()
+        
+        return {
+            "index_name": self.default_index_name(collection_name),
+            "index_state": await self.get_index_state(collection_name = collection_name),
+            "build": self.index_builds.get(collection_name),
+            "progress": dict(progress) if progress else None,
+        }
     
     async def insert_one(self , collection_name:str , text:str , vector : List , 
                           metadata:dict = None,
                           record_id:str = None):
         
-        is_collection_existed = await self.is_collection_existed(collection_name = collection_name)
-        
-        if not is_collection_existed:
-            self.logger.error(f"can not insert to non-existing collection {collection_name}")
-            return False
-        
         if not record_id:
             self.logger.error(f"Can not insert new record without chunk_id: {collection_name}")
             return False
         
-        async with self.db_client() as session:
-            async with session.begin():
-                insert_sql = sql_text(f'INSERT INTO {collection_name} '
-                                      f'({PgVectorTableSchemesEnums.TEXT.value}, {PgVectorTableSchemesEnums.VECTOR.value}, {PgVectorTableSchemesEnums.METADATA.value}, {PgVectorTableSchemesEnums.CHUNK_ID.value}) '
-                                      '(VALUES (:text, :vector, :metadata, :chunk_id))'
-                                      )
-                await session.execute(insert_sql, {
-                    "text":text ,
-                    # postgres expects vector in string format
-                    "vector": "["+",".join([str(v) for v in vector]) + "]",
-                    "metadata":json.dumps(metadata , ensure_ascii=False) if metadata else "{}",
-                    "chunk_id": record_id
-                })
-                session.commit()
-                
-            await self.create_vector_index(collection_name = collection_name)
-                
-            return True
+        # same conflict rule as upsert_many (unique chunk_id) : inserting a chunk again replaces its vector
+        return await self.upsert_many(
+            collection_name = collection_name,
+            texts = [text],
+            vectors = [vector],
+            metadata = [metadata],
+            record_ids = [record_id]
+        )
                                     
     async def insert_many(self , collection_name:str , texts:List , vectors:List , 
                            metadata:List = None,
@@ -257,45 +604,151 @@ class PGVectorProvider(VectorInterface):
         if not metadata or len(metadata) == 0:
             metadata = [None] * len(texts)
         
+        values = []
+        for _text , _vector , _metadata , _record_id in zip(texts , vectors , metadata , record_ids):
+            meta_json = json.dumps(_metadata , ensure_ascii=False) if _metadata else "{}"
+            values.append({
+                "text": _text,
+                "vector": self.to_db_vector(_vector),
+                "metadata": meta_json,
+                "chunk_id": _record_id
+            })
+        
+        batch_insert_sql = sql_text(f'INSERT INTO {collection_name} '
+                              f'({PgVectorTableSchemesEnums.TEXT.value}, '
+                              f'{PgVectorTableSchemesEnums.VECTOR.value}, '
+                              f'{PgVectorTableSchemesEnums.METADATA.value}, '
+                              f'{PgVectorTableSchemesEnums.CHUNK_ID.value}) '
+                              'VALUES (:text, :vector, :metadata, :chunk_id)'
+                              )
+        
+        async def write_batch(session , batch_values):
+            await session.execute(batch_insert_sql , batch_values)
+        
+        await self.write_batches(
+            batches=[values[i:i+batch_size] for i in range(0 , len(values) , batch_size)],
+            write_batch=write_batch
+        )
+        
+        return True
+
+    async def upsert_many(self , collection_name:str , texts:List , vectors:List , 
+                           metadata:List = None,
+                           record_ids:List = None , batch_size:int = 50):
+        # same as insert_many but keyed by chunk_id : a retried or repeated push replaces the vectors in place
+        is_collection_existed = await self.is_collection_existed(collection_name = collection_name)
+        
+        if not is_collection_existed:
+            self.logger.error(f"can not upsert to non-existing collection {collection_name}")
+            return False
+        
+        if len(vectors) != len(texts) or not record_ids or len(record_ids) != len(texts):
+            self.logger.error(f"Invalid data items for collection: {collection_name}")
+            return False
+        
+        if not metadata or len(metadata) == 0:
+            metadata = [None] * len(texts)
+        
+        await self.ensure_chunk_id_index(collection_name = collection_name)
+        
+        # postgres refuses to update the same row twice in one statement , the last item of a chunk wins
+        items = {}
+        for _text , _vector , _metadata , _record_id in zip(texts , vectors , metadata , record_ids):
+            items[_record_id] = {
+                "text": _text,
+                "vector": self.to_db_vector(_vector),
+                "metadata": json.dumps(_metadata , ensure_ascii=False) if _metadata else "{}",
+                "chunk_id": _record_id
+            }
+        values = list(items.values())
+        
+        upsert_sql = sql_text(f'INSERT INTO {collection_name} '
+                              f'({PgVectorTableSchemesEnums.TEXT.value}, '
+                              f'{PgVectorTableSchemesEnums.VECTOR.value}, '
+                              f'{PgVectorTableSchemesEnums.METADATA.value}, '
+                              f'{PgVectorTableSchemesEnums.CHUNK_ID.value}) '
+                              'VALUES (:text, :vector, :metadata, :chunk_id) '
+                              f'ON CONFLICT ({PgVectorTableSchemesEnums.CHUNK_ID.value}) DO UPDATE SET '
+                              f'{PgVectorTableSchemesEnums.TEXT.value} = EXCLUDED.{PgVectorTableSchemesEnums.TEXT.value}, '
+                              f'{PgVectorTableSchemesEnums.VECTOR.value} = EXCLUDED.{PgVectorTableSchemesEnums.VECTOR.value}, '
+                              f'{PgVectorTableSchemesEnums.METADATA.value} = EXCLUDED.{PgVectorTableSchemesEnums.METADATA.value}'
+                              )
+        async def write_batch(session , batch_values):
+            # big batches : binary COPY into the staging table , then one INSERT ... SELECT with the same conflict rule
+            if self.is_vector_codec_registered and self.copy_min_rows and len(batch_values) >= self.copy_min_rows:
+                await self.copy_upsert_batch(session=session , collection_name=collection_name , values=batch_values)
+            else:
+                await session.execute(upsert_sql , batch_values)
+        
+        await self.write_batches(
+            batches=[values[i:i+batch_size] for i in range(0 , len(values) , batch_size)],
+            write_batch=write_batch
+        )
+        
+        return True
+
+    async def copy_upsert_batch(self , session , collection_name:str , values:List[dict]):
+        columns = [
+            PgVectorTableSchemesEnums.TEXT.value,
+            PgVectorTableSchemesEnums.VECTOR.value,
+            PgVectorTableSchemesEnums.METADATA.value,
+            PgVectorTableSchemesEnums.CHUNK_ID.value,
+        ]
+        # one staging table per connection , emptied at every commit
+        await session.execute(sql_text(
+            f'CREATE TEMP TABLE IF NOT EXISTS {self.staging_table_name} ('
+                f'{PgVectorTableSchemesEnums.TEXT.value} text,'
+                f'{PgVectorTableSchemesEnums.VECTOR.value} vector,'
+                f'{PgVectorTableSchemesEnums.METADATA.value} jsonb,'
+                f'{PgVectorTableSchemesEnums.CHUNK_ID.value} integer'
+            ') ON COMMIT DELETE ROWS'
+        ))
+        
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        # asyncpg COPY uses the binary format , the vectors go through the pgvector codec as float arrays
+        # (the jsonb codec of the SQLAlchemy asyncpg connection expects the json string)
+        await raw_connection.driver_connection.copy_records_to_table(
+            self.staging_table_name,
+            records=[tuple(value[column] for column in columns) for value in values],
+            columns=columns
+        )
+        
+        await session.execute(sql_text(
+            f'INSERT INTO {collection_name} ({", ".join(columns)}) '
+            f'SELECT {", ".join(columns)} FROM {self.staging_table_name} '
+            f'ON CONFLICT ({PgVectorTableSchemesEnums.CHUNK_ID.value}) DO UPDATE SET '
+            f'{PgVectorTableSchemesEnums.TEXT.value} = EXCLUDED.{PgVectorTableSchemesEnums.TEXT.value}, '
+            f'{PgVectorTableSchemesEnums.VECTOR.value} = EXCLUDED.{PgVectorTableSchemesEnums.VECTOR.value}, '
+            f'{PgVectorTableSchemesEnums.METADATA.value} = EXCLUDED.{PgVectorTableSchemesEnums.METADATA.value}'
+        ))
+        # several batches can share the transaction (batches_per_commit > 1)
+        await session.execute(sql_text(f'TRUNCATE {self.staging_table_name}'))
+
+    async def delete_by_record_ids(self , collection_name:str , record_ids:List):
+        is_collection_existed = await self.is_collection_existed(collection_name = collection_name)
+        if not is_collection_existed:
+            return 0
+
         async with self.db_client() as session:
             async with session.begin():
-                for i in range(0 , len(texts) , batch_size):
-                    batch_texts = texts[i:i+batch_size]
-                    batch_vectors = vectors[i:i+batch_size]
-                    batch_metadata = metadata[i:i+batch_size]
-                    batch_record_ids = record_ids[i:i+batch_size] 
-                    
-                    values = []
-                    
-                    for _text , _vector , _metadata , _record_id in zip(batch_texts , batch_vectors , batch_metadata , batch_record_ids):
-                        meta_json = json.dumps(_metadata , ensure_ascii=False) if _metadata else "{}"
-                        values.append({
-                            "text": _text,
-                            "vector": "["+",".join([str(v) for v in _vector]) + "]",
-                            "metadata": meta_json,
-                            "chunk_id": _record_id
-                        })
-                    
-                    batch_insert_sql = sql_text(f'INSERT INTO {collection_name} '
-                                          f'({PgVectorTableSchemesEnums.TEXT.value}, '
-                                          f'{PgVectorTableSchemesEnums.VECTOR.value}, '
-                                          f'{PgVectorTableSchemesEnums.METADATA.value}, '
-                                          f'{PgVectorTableSchemesEnums.CHUNK_ID.value}) '
-                                          'VALUES (:text, :vector, :metadata, :chunk_id)'
-                                          )
-                    await session.execute(batch_insert_sql , values)
-                                    
-            await self.create_vector_index(collection_name = collection_name)
-            
-            return True
+                delete_sql = sql_text(
+                    f'DELETE FROM {collection_name} '
+                    f'WHERE {PgVectorTableSchemesEnums.CHUNK_ID.value} = ANY(:record_ids)'
+                )
+                result = await session.execute(delete_sql, {"record_ids": list(record_ids)})
+            await session.commit()
+        return result.rowcount
 
-    async def search_by_vector(self , collection_name:str , vector : List , limit:int) -> List[RetrievedDocument]:
+    async def search_by_vector(self , collection_name:str , vector : List , limit:int ,
+                               search_params:dict = None) -> List[RetrievedDocument]:
+        # search_params (hnsw_ef / oversampling) are qdrant only
         is_collection_existed = await self.is_collection_existed(collection_name = collection_name)
         if not is_collection_existed:
             self.logger.error(f"can not search in non-existing collection {collection_name}")
             return False
         
-        vector = "["+",".join([str(v) for v in vector]) + "]"
+        vector = self.to_db_vector(vector)
         async with self.db_client() as session:
             async with session.begin():
                 search_sql = sql_text(
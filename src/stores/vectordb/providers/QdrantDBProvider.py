@@ -1,150 +1,429 @@
-from qdrant_client import QdrantClient , models
+from qdrant_client import AsyncQdrantClient , models
 from ..VectorInterface import VectorInterface
-from ..VectorDBEnums import DistanceMethodEnums 
+from ..VectorDBEnums import DistanceMethodEnums , QdrantQuantizationEnums
 from models.db_schemes import RetrievedDocument
-import logging 
+import logging
 from typing import List
+import asyncio
 import json
+import re
+import uuid
+
+# multi tenant layout : the per-project collection names of NLPController.create_collection_name
+# map to one shared collection per embedding size , the project is a payload field
+TENANT_COLLECTION_NAME = re.compile(r"collection_(\d+)_(.+)")
+TENANT_FIELD = "project_id"
 
 class QdrantDBProvider(VectorInterface):
-    def __init__(self , db_client :str ,default_vector_size:int = 786 , 
-                 distance_method:str=None , index_threshold:int = 100):
-        
-        self.client = None 
+    def __init__(self , db_client :str ,default_vector_size:int = 786 ,
+                 distance_method:str=None , index_threshold:int = 100 ,
+                 url:str = None , api_key:str = None , prefer_grpc:bool = False , grpc_port:int = 6334 ,
+                 timeout:int = None , upload_batch_size:int = 256 , upload_parallel:int = 1 ,
+                 quantization:str = None , quantization_always_ram:bool = True , on_disk:bool = False ,
+                 hnsw_m:int = None , hnsw_ef_construct:int = None ,
+                 search_hnsw_ef:int = None , search_oversampling:float = None , search_rescore:bool = True ,
+                 multi_tenant:bool = False):
+
+        self.client = None
+        # db_client is the local storage path , used when no server url is set
         self.db_client = db_client
-        self.distance_method = None 
+        self.url = url
+        self.api_key = api_key
+        self.prefer_grpc = prefer_grpc
+        self.grpc_port = grpc_port
+        self.timeout = timeout
+        self.upload_batch_size = upload_batch_size
+        self.upload_parallel = upload_parallel
+
+        # defaults of the new collections , the push request can override them
+        self.collection_options = {
+            "quantization": quantization,
+            "quantization_always_ram": quantization_always_ram,
+            "on_disk": on_disk,
+            "hnsw_m": hnsw_m,
+            "hnsw_ef_construct": hnsw_ef_construct,
+        }
+        # defaults of the searches , the search request can override them
+        self.search_hnsw_ef = search_hnsw_ef
+        self.search_oversampling = search_oversampling
+        self.search_rescore = search_rescore
+
+        self.multi_tenant = multi_tenant
+        # the shared collections are created by the first project pushed , once
+        self.create_lock = asyncio.Lock()
+
+        self.distance_method = None
         self.default_vector_size = default_vector_size
         if distance_method == DistanceMethodEnums.COSINE.value:
             self.distance_method = models.Distance.COSINE
         elif distance_method == DistanceMethodEnums.DOT.value:
             self.distance_method = models.Distance.DOT
-            
+
         self.logger = logging.getLogger("uvicorn")
-        
+
+    @property
+    def is_local(self):
+        return not self.url
+
     async def connect(self):
-        self.client = QdrantClient(path=self.db_client)
-    
+        if self.is_local:
+            # embedded storage inside this process
+            self.client = AsyncQdrantClient(path=self.db_client)
+        else:
+            # qdrant server , over http or grpc
+            self.client = AsyncQdrantClient(
+                url = self.url,
+                api_key = self.api_key,
+                prefer_grpc = self.prefer_grpc,
+                grpc_port = self.grpc_port,
+                timeout = self.timeout
+            )
+
     async def disconnect(self):
-        self.client = None 
-        
+        if self.client is not None:
+            await self.client.close()
+        self.client = None
+
+    def get_tenant(self , collection_name:str):
+        # (collection to query , project id) , the project id is None out of the multi tenant layout
+        if self.multi_tenant:
+            match = TENANT_COLLECTION_NAME.fullmatch(collection_name)
+            if match:
+                return f"collection_{match.group(1)}" , match.group(2)
+        return collection_name , None
+
+    def get_tenant_filter(self , tenant_id:str):
+        if tenant_id is None:
+            return None
+        return models.Filter(must=[
+            models.FieldCondition(key=TENANT_FIELD , match=models.MatchValue(value=tenant_id))
+        ])
+
+    async def count_tenant_points(self , collection_name:str , tenant_id:str):
+        result = await self.client.count(
+            collection_name = collection_name,
+            count_filter = self.get_tenant_filter(tenant_id),
+            exact = True
+        )
+        return result.count
+
     async def is_collection_existed(self, collection_name: str) -> bool:
-        return self.client.collection_exists(collection_name = collection_name)
-    
+        collection_name , tenant_id = self.get_tenant(collection_name)
+        is_collection_existed = await self.client.collection_exists(collection_name = collection_name)
+        if not is_collection_existed or tenant_id is None:
+            return is_collection_existed
+        # a project exists in the shared collection once it has points
+        return await self.count_tenant_points(collection_name=collection_name , tenant_id=tenant_id) > 0
+
     async def list_all_collections(self) -> List:
-        return self.client.get_collections()
-    
+        return await self.client.get_collections()
+
     async def get_collection_info(self, collection_name: str) -> dict:
-        return self.client.get_collection(collection_name = collection_name)
-    
+        collection_name , tenant_id = self.get_tenant(collection_name)
+        collection_info = await self.client.get_collection(collection_name = collection_name)
+
+        memory_estimate = self.estimate_memory(collection_info=collection_info)
+        collection_info = json.loads(json.dumps(collection_info , default=lambda x: x.__dict__))
+        collection_info["memory_estimate"] = memory_estimate
+        if tenant_id is not None:
+            collection_info["tenant"] = {
+                TENANT_FIELD: tenant_id,
+                "points_count": await self.count_tenant_points(collection_name=collection_name , tenant_id=tenant_id),
+            }
+        return collection_info
+
+    def estimate_memory(self , collection_info , vectors_count:int = 1_000_000):
+        # rough size of the vectors and of the hnsw graph (payload and segments overhead not counted)
+        config = collection_info.config
+        vectors_params = config.params.vectors
+        if not isinstance(vectors_params , models.VectorParams):
+            # named vectors , not created by this provider
+            return None
+
+        # m = 0 in the multi tenant layout , the graphs are built per tenant with payload_m
+        hnsw_m = config.hnsw_config.m or config.hnsw_config.payload_m or 0
+        if vectors_params.hnsw_config is not None and vectors_params.hnsw_config.m is not None:
+            hnsw_m = vectors_params.hnsw_config.m
+        quantization_config = vectors_params.quantization_config or config.quantization_config
+
+        # float32 originals , mmap-ed from disk when on_disk (only the hot pages stay in the page cache)
+        original_bytes = vectors_params.size * 4
+        original_in_ram = not vectors_params.on_disk
+
+        quantized_bytes , quantized_in_ram = 0 , False
+        if isinstance(quantization_config , models.ScalarQuantization):
+            quantized_bytes = vectors_params.size  # int8
+            quantized_in_ram = bool(quantization_config.scalar.always_ram)
+        elif isinstance(quantization_config , models.BinaryQuantization):
+            quantized_bytes = (vectors_params.size + 7) // 8  # 1 bit per dimension
+            quantized_in_ram = bool(quantization_config.binary.always_ram)
+
+        # layer 0 of the graph keeps 2 * m links of 4 bytes per vector , the upper layers are negligible
+        hnsw_bytes = 2 * hnsw_m * 4
+
+        ram_bytes = hnsw_bytes
+        if original_in_ram:
+            ram_bytes += original_bytes
+        if quantized_in_ram:
+            ram_bytes += quantized_bytes
+        disk_bytes = original_bytes + quantized_bytes + hnsw_bytes
+
+        to_mb = lambda vector_bytes: round(vector_bytes * vectors_count / (1024 * 1024) , 1)
+        points_count = collection_info.points_count or 0
+        return {
+            "vectors_count": vectors_count,
+            "original_vectors_mb": to_mb(original_bytes),
+            "original_vectors_in_ram": original_in_ram,
+            "quantized_vectors_mb": to_mb(quantized_bytes),
+            "quantized_vectors_in_ram": quantized_in_ram,
+            "hnsw_graph_mb": to_mb(hnsw_bytes),
+            "ram_mb": to_mb(ram_bytes),
+            "disk_mb": to_mb(disk_bytes),
+            "points_count": points_count,
+            "points_ram_mb": round(ram_bytes * points_count / (1024 * 1024) , 1),
+        }
+
     async def delete_collection(self , collection_name:str):
-        if self.is_collection_existed(collection_name):
+        collection_name , tenant_id = self.get_tenant(collection_name)
+        if tenant_id is not None:
+            # only the points of the project , the shared collection stays
+            if not await self.client.collection_exists(collection_name = collection_name):
+                return None
+            self.logger.info(f"Deleting project {tenant_id} from collection {collection_name}")
+            return await self.client.delete(
+                collection_name = collection_name,
+                points_selector = models.FilterSelector(filter=self.get_tenant_filter(tenant_id))
+            )
+
+        if await self.is_collection_existed(collection_name):
             self.logger.info(f"Deleting collection {collection_name}")
-            return self.client.delete_collection(collection_name = collection_name)
+            return await self.client.delete_collection(collection_name = collection_name)
         return None
-        
-    async def create_collection(self , collection_name:str , embedding_size:int , do_reset:int = 0):
+
+    def get_quantization_config(self , quantization:str , always_ram:bool):
+        if quantization == QdrantQuantizationEnums.SCALAR.value:
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=always_ram
+                )
+            )
+        if quantization == QdrantQuantizationEnums.BINARY.value:
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=always_ram)
+            )
+        return None
+
+    async def create_collection(self , collection_name:str , embedding_size:int , do_reset:int = 0 ,
+                                collection_options:dict = None):
         if do_reset :
             # _ means the return value is ignored
-            _ = self.delete_collection(collection_name=collection_name)
-            
-             
-        if not self.is_collection_existed(collection_name):
-            self.logger.info(f"creating new qdrant collection: {collection_name} with embedding size: {embedding_size} ")
-            
-            _ = self.client.create_collection(
-                collection_name = collection_name,
-                vectors_config=models.VectorParams(
-                    size=embedding_size,
-                    distance = self.distance_method
-                ))
+            _ = await self.delete_collection(collection_name=collection_name)
+
+        shared_collection_name , tenant_id = self.get_tenant(collection_name)
+        if tenant_id is not None:
+            async with self.create_lock:
+                if not await self.client.collection_exists(collection_name = shared_collection_name):
+                    await self.create_qdrant_collection(
+                        collection_name=shared_collection_name , embedding_size=embedding_size ,
+                        collection_options=collection_options , is_shared=True
+                    )
+            # a project without points is a new collection for the callers , all its chunks are pushed
+            return await self.count_tenant_points(collection_name=shared_collection_name , tenant_id=tenant_id) == 0
+
+        if not await self.is_collection_existed(collection_name):
+            await self.create_qdrant_collection(
+                collection_name=collection_name , embedding_size=embedding_size ,
+                collection_options=collection_options
+            )
             return True
-         
+
         return False
-    
-    async def insert_one(self , collection_name:str , text:str , vector : List , 
+
+    async def create_qdrant_collection(self , collection_name:str , embedding_size:int ,
+                                       collection_options:dict = None , is_shared:bool = False):
+        # the options only apply to a new collection , do_reset rebuilds an existing one with them
+        # (the shared collection of the multi tenant layout takes the options of the first push)
+        options = {
+            **self.collection_options,
+            **{key: value for key , value in (collection_options or {}).items() if value is not None}
+        }
+        self.logger.info(f"creating new qdrant collection: {collection_name} with embedding size: {embedding_size} "
+                         f"and options: {options}")
+
+        hnsw_config = None
+        if is_shared:
+            # every search is filtered by project : no global graph (m=0) , one graph per project (payload_m)
+            hnsw_config = models.HnswConfigDiff(m=0 , payload_m=options["hnsw_m"] or 16 ,
+                                                ef_construct=options["hnsw_ef_construct"])
+        elif options["hnsw_m"] is not None or options["hnsw_ef_construct"] is not None:
+            hnsw_config = models.HnswConfigDiff(m=options["hnsw_m"] , ef_construct=options["hnsw_ef_construct"])
+
+        _ = await self.client.create_collection(
+            collection_name = collection_name,
+            vectors_config=models.VectorParams(
+                size=embedding_size,
+                distance = self.distance_method,
+                # the originals are only read back to rescore when the collection is quantized
+                on_disk = bool(options["on_disk"])
+            ),
+            hnsw_config = hnsw_config,
+            quantization_config = self.get_quantization_config(
+                quantization=options["quantization"],
+                always_ram=options["quantization_always_ram"]
+            ))
+
+        if is_shared:
+            # the points of a project are stored together , the filtered searches read only them
+            _ = await self.client.create_payload_index(
+                collection_name = collection_name,
+                field_name = TENANT_FIELD,
+                field_schema = models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD , is_tenant=True)
+            )
+
+    def build_points(self , texts:List , vectors:List , metadata:List = None , record_ids:List = None ,
+                     tenant_id:str = None):
+        if metadata is None:
+            metadata = [None] * len(texts)
+        if record_ids is None:
+            record_ids = [None] * len(texts)
+
+        return [
+            models.PointStruct(
+                # every point needs an id , a random uuid when the chunk id is unknown
+                id = record_id if record_id is not None else str(uuid.uuid4()),
+                vector = vector,
+                payload = {
+                    "text": text,
+                    "metadata": _metadata,
+                    **({TENANT_FIELD: tenant_id} if tenant_id is not None else {})
+                }
+            )
+            for text , vector , _metadata , record_id in zip(texts , vectors , metadata , record_ids)
+        ]
+
+    async def upload_points(self , collection_name:str , points:List , batch_size:int = None):
+        # the caller batch is split further so the upload can spread over upload_parallel workers
+        batch_size = min(batch_size , self.upload_batch_size) if batch_size else self.upload_batch_size
+        if self.is_local:
+            # the embedded storage is not thread safe , plain upserts on the event loop
+            for i in range(0 , len(points) , batch_size):
+                _ = await self.client.upsert(
+                    collection_name = collection_name,
+                    points = points[i:i+batch_size]
+                )
+            return
+
+        # upload_points of the async client runs the sync uploaders (and worker processes when parallel > 1) ,
+        # it goes to a thread so the event loop keeps serving the other requests meanwhile
+        await asyncio.to_thread(
+            self.client.upload_points,
+            collection_name = collection_name,
+            points = points,
+            batch_size = batch_size,
+            parallel = self.upload_parallel,
+            wait = True
+        )
+
+    async def insert_one(self , collection_name:str , text:str , vector : List ,
                           metadata:dict = None,
                           record_id:str = None):
-        # insert a row 
-        if not self.is_collection_existed(collection_name):
+        # insert a row
+        collection_name , tenant_id = self.get_tenant(collection_name)
+        if not await self.client.collection_exists(collection_name = collection_name):
             self.logger.error(f"Collection {collection_name} does not exist.")
-            return False 
-        
+            return False
+
         try:
-            record_params = {
-                "vector": vector,
-                "payload": {
-                    "text": text,
-                    "metadata": metadata
-                }
-            }
-            if record_id is not None:
-                record_params["id"] = record_id
-            
-            _ = self.client.upload_records(
+            _ = await self.client.upsert(
                 collection_name = collection_name,
-                records = [models.Record(**record_params)]
+                points = self.build_points(texts=[text] , vectors=[vector] , metadata=[metadata] ,
+                                           record_ids=[record_id] , tenant_id=tenant_id)
             )
         except Exception as e:
             self.logger.error(f"Error inserting record into {collection_name}: {e}")
             return False
-        
+
         return True
-    
-    async def insert_many(self , collection_name:str , texts:List , vectors:List , 
+
+    async def insert_many(self , collection_name:str , texts:List , vectors:List ,
                            metadata:List = None,
-                           record_ids:List = None , batch_size:int = 50):
-        if metadata is None:
-            metadata = [None] * len(texts)
-        if record_ids is None:
-            record_ids = [None] * len(texts)
-        
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i+batch_size]
-            batch_vectors = vectors[i:i+batch_size]
-            batch_metadata = metadata[i:i+batch_size]
-            batch_records_ids = record_ids[i:i+batch_size]
-            
-            batch_records = []
-            for x in range(len(batch_texts)):
-                record_params = {
-                    "vector": batch_vectors[x],
-                    "payload": {
-                        "text": batch_texts[x],
-                        "metadata": batch_metadata[x]
-                    }
-                }
-                if batch_records_ids[x] is not None:
-                    record_params["id"] = batch_records_ids[x]
-                
-                batch_records.append(models.Record(**record_params))
-            try:
-                _ = self.client.upload_records(
-                    collection_name = collection_name,
-                    records = batch_records
-                )
-            except Exception as e:
-                self.logger.error(f"Error inserting batch into {collection_name}: {e}")
-                return False
+                           record_ids:List = None , batch_size:int = None):
+        collection_name , tenant_id = self.get_tenant(collection_name)
+        points = self.build_points(texts=texts , vectors=vectors , metadata=metadata , record_ids=record_ids ,
+                                   tenant_id=tenant_id)
+        try:
+            await self.upload_points(collection_name=collection_name , points=points , batch_size=batch_size)
+        except Exception as e:
+            self.logger.error(f"Error inserting batch into {collection_name}: {e}")
+            return False
         return True
-    
-    
-    async def search_by_vector(self , collection_name:str , vector : List , limit:int = 5):
-        results = self.client.search(
+
+    async def upsert_many(self , collection_name:str , texts:List , vectors:List ,
+                           metadata:List = None,
+                           record_ids:List = None , batch_size:int = None):
+        # the chunk_id is the point id , an existing point is overwritten in place
+        if not record_ids or len(record_ids) != len(texts):
+            self.logger.error(f"Can not upsert into {collection_name} without the chunks ids")
+            return False
+        return await self.insert_many(
+            collection_name=collection_name, texts=texts, vectors=vectors,
+            metadata=metadata, record_ids=record_ids, batch_size=batch_size
+        )
+
+    async def delete_by_record_ids(self , collection_name:str , record_ids:List):
+        # the chunk ids are unique over all the projects , no need for the project filter
+        collection_name , _ = self.get_tenant(collection_name)
+        if not await self.client.collection_exists(collection_name = collection_name):
+            return None
+        return await self.client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=record_ids)
+        )
+
+    async def start_vector_index_build(self , collection_name:str , index_type:str = None , do_reset:bool = False):
+        # qdrant builds and maintains its hnsw graph by itself
+        return None
+
+    async def get_vector_index_build_status(self , collection_name:str):
+        return None
+
+    def get_search_params(self , search_params:dict = None):
+        search_params = search_params or {}
+        hnsw_ef = search_params.get("hnsw_ef") or self.search_hnsw_ef
+        oversampling = search_params.get("oversampling") or self.search_oversampling
+
+        # ignored by qdrant on a collection without quantization
+        quantization = None
+        if oversampling is not None or not self.search_rescore:
+            quantization = models.QuantizationSearchParams(rescore=self.search_rescore , oversampling=oversampling)
+
+        if hnsw_ef is None and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=hnsw_ef , quantization=quantization)
+
+    async def search_by_vector(self , collection_name:str , vector : List , limit:int = 5 , search_params:dict = None):
+        collection_name , tenant_id = self.get_tenant(collection_name)
+        response = await self.client.query_points(
             collection_name = collection_name,
-            query_vector = vector,
-            limit = limit
+            query = vector,
+            query_filter = self.get_tenant_filter(tenant_id),
+            limit = limit,
+            # hnsw_ef widens the graph search , oversampling fetches limit * oversampling candidates
+            # on the quantized vectors and rescores them with the originals
+            search_params = self.get_search_params(search_params=search_params),
+            with_payload = True
         )
+        results = response.points
         if not results or len(results) == 0:
             return None
-        
-        # the results may contain non-serializable objects, convert them to dict
-        # return json.loads(json.dumps(results, default=lambda x: x.__dict__)) 
-        
-        # to make it work with faiss , or ChromaDB we will use database schema  
+
+        # to make it work with faiss , or ChromaDB we will use database schema
         return [
             RetrievedDocument(**{
                 "score": result.score,
                 "text": result.payload["text"]
             })
-            for result in results 
-        ]
\ No newline at end of file
+            for result in results
+        ]
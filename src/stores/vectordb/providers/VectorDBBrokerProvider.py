@@ -0,0 +1,177 @@
+from ..VectorInterface import VectorInterface
+from ..VectorDBBroker import FrameSender , read_frame
+from models.db_schemes import RetrievedDocument
+from typing import List
+import asyncio
+import itertools
+import logging
+
+class VectorDBBrokerProvider(VectorInterface):
+    """
+    Client side of stores/vectordb/VectorDBBroker.py : every uvicorn worker forwards its calls
+    to the broker process that owns the embedded store , over one multiplexed unix socket connection.
+    """
+    def __init__(self , socket_path:str , timeout:float = 60.0 , connect_timeout:float = 30.0 , max_batch:int = 256):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_batch = max_batch
+
+        self.reader = None
+        self.writer = None
+        self.sender = None
+        self.tasks = []
+        # request id -> future of its answer
+        self.pending = {}
+        self.request_ids = itertools.count()
+        self.connect_lock = asyncio.Lock()
+
+        self.logger = logging.getLogger("uvicorn")
+
+    @property
+    def is_connected(self):
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self):
+        async with self.connect_lock:
+            if self.is_connected:
+                return
+            # what is left of a lost connection : its tasks and the calls still waiting on it
+            self._reset(ConnectionError("Vector db broker connection lost"))
+
+            # the broker may still be starting (or restarting) , retry until connect_timeout
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.connect_timeout
+            while True:
+                try:
+                    self.reader , self.writer = await asyncio.open_unix_connection(path=self.socket_path)
+                    break
+                except (FileNotFoundError , ConnectionRefusedError):
+                    if loop.time() >= deadline:
+                        raise ConnectionError(f"Vector db broker is not listening on {self.socket_path}")
+                    await asyncio.sleep(0.5)
+
+            self.sender = FrameSender(writer=self.writer , max_batch=self.max_batch)
+            self.tasks = [
+                asyncio.create_task(self.send_requests()),
+                asyncio.create_task(self.read_responses()),
+            ]
+            self.logger.info(f"Connected to the vector db broker on {self.socket_path}")
+
+    async def disconnect(self):
+        self._reset(ConnectionError("Vector db broker connection closed"))
+
+    def _reset(self , error:Exception):
+        # every way out of a connection ends here : both tasks stopped , socket closed , waiting calls failed
+        current_task = asyncio.current_task()
+        for task in self.tasks:
+            if task is not current_task:
+                task.cancel()
+        self.tasks = []
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+        self.sender = None
+        self.fail_pending(error)
+
+    def fail_pending(self , error:Exception):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending = {}
+
+    async def send_requests(self):
+        try:
+            await self.sender.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # broken socket or a request that can not be pickled
+            self.logger.error(f"Vector db broker connection lost while sending: {e}")
+            self._reset(ConnectionError(f"Vector db broker connection lost: {e}"))
+
+    async def read_responses(self):
+        try:
+            while True:
+                for response in await read_frame(self.reader):
+                    future = self.pending.pop(response["id"] , None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in response:
+                        future.set_exception(RuntimeError(response["error"]))
+                    else:
+                        future.set_result(response["result"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # the broker restarted (or sent a frame that can not be read) , the next call reconnects
+            self.logger.error(f"Vector db broker connection lost: {e}")
+            self._reset(ConnectionError(f"Vector db broker connection lost: {e}"))
+
+    async def call(self , method:str , **kwargs):
+        if not self.is_connected:
+            await self.connect()
+        sender = self.sender
+        if sender is None:
+            raise ConnectionError("Vector db broker connection lost")
+
+        request_id = next(self.request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        await sender.queue.put({"id": request_id , "method": method , "kwargs": kwargs})
+        try:
+            return await asyncio.wait_for(future , timeout=self.timeout)
+        finally:
+            self.pending.pop(request_id , None)
+
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        return await self.call("is_collection_existed" , collection_name=collection_name)
+
+    async def list_all_collections(self) -> List:
+        return await self.call("list_all_collections")
+
+    async def get_collection_info(self, collection_name: str) -> dict:
+        return await self.call("get_collection_info" , collection_name=collection_name)
+
+    async def delete_collection(self , collection_name:str):
+        return await self.call("delete_collection" , collection_name=collection_name)
+
+    async def create_collection(self , collection_name:str , embedding_size:int , do_reset:bool = False ,
+                                collection_options:dict = None):
+        return await self.call("create_collection" , collection_name=collection_name ,
+                               embedding_size=embedding_size , do_reset=do_reset ,
+                               collection_options=collection_options)
+
+    async def insert_one(self , collection_name:str , text:str , vector : List ,
+                          metadata:dict = None,
+                          record_id:str = None):
+        return await self.call("insert_one" , collection_name=collection_name , text=text , vector=vector ,
+                               metadata=metadata , record_id=record_id)
+
+    async def insert_many(self , collection_name:str , texts:List , vectors:List ,
+                           metadata:List = None,
+                           record_ids:List = None , batch_size:int = None):
+        return await self.call("insert_many" , collection_name=collection_name , texts=texts , vectors=vectors ,
+                               metadata=metadata , record_ids=record_ids , batch_size=batch_size)
+
+    async def upsert_many(self , collection_name:str , texts:List , vectors:List ,
+                           metadata:List = None,
+                           record_ids:List = None , batch_size:int = None):
+        return await self.call("upsert_many" , collection_name=collection_name , texts=texts , vectors=vectors ,
+                               metadata=metadata , record_ids=record_ids , batch_size=batch_size)
+
+    async def delete_by_record_ids(self , collection_name:str , record_ids:List):
+        return await self.call("delete_by_record_ids" , collection_name=collection_name , record_ids=list(record_ids))
+
+    async def start_vector_index_build(self , collection_name:str , index_type:str = None , do_reset:bool = False):
+        return await self.call("start_vector_index_build" , collection_name=collection_name ,
+                               index_type=index_type , do_reset=do_reset)
+
+    async def get_vector_index_build_status(self , collection_name:str):
+        return await self.call("get_vector_index_build_status" , collection_name=collection_name)
+
+    async def search_by_vector(self , collection_name:str , vector : List , limit:int = 5 ,
+                               search_params:dict = None) -> List[RetrievedDocument]:
+        return await self.call("search_by_vector" , collection_name=collection_name , vector=vector , limit=limit ,
+                               search_params=search_params)
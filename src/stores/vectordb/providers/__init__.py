@@ -1,2 +1,3 @@
 from .QdrantDBProvider import QdrantDBProvider
 from .PGVectorProvider import PGVectorProvider
+from .VectorDBBrokerProvider import VectorDBBrokerProvider
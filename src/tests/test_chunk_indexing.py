@@ -0,0 +1,139 @@
+import pytest
+
+# postgres backed , see run_with_database in conftest.py
+chunk_model_module = pytest.importorskip("models.ChunkModel")
+ChunkModel = chunk_model_module.ChunkModel
+IndexingPipeline = pytest.importorskip("workers.IndexingPipeline").IndexingPipeline
+from models.db_schemes import Project , Asset
+
+async def add_project_chunks(db_client , project_id: int , chunks_count: int):
+    async with db_client() as session:
+        async with session.begin():
+            session.add(Project(project_id=project_id))
+            await session.flush()
+            asset = Asset(asset_type="file" , asset_name=f"file_{project_id}.txt" , asset_size=10 ,
+                          asset_project_id=project_id)
+            session.add(asset)
+        await session.commit()
+
+    chunk_model = ChunkModel(db_client=db_client)
+    return sorted(await chunk_model.insert_chunk_rows(rows=[
+        {
+            "chunk_text": f"project {project_id} chunk {i}",
+            "chunk_metadata": {},
+            "chunk_order": i + 1,
+            "chunk_project_id": project_id,
+            "chunk_asset_id": asset.asset_id,
+        }
+        for i in range(chunks_count)
+    ]))
+
+class FakeVectorDB:
+    # records the pushed batches and the unindexed chunks count seen when each batch comes in
+    def __init__(self , chunk_model , project_id: int , fail_at_batch: int = None):
+        self.chunk_model = chunk_model
+        self.project_id = project_id
+        self.fail_at_batch = fail_at_batch
+        self.batches = []
+        self.unindexed_counts = []
+
+    async def upsert_many(self , collection_name , texts , vectors , metadata = None , record_ids = None , batch_size = None):
+        if self.fail_at_batch is not None and len(self.batches) == self.fail_at_batch:
+            return False
+        self.unindexed_counts.append(await self.chunk_model.get_total_chunks_count(
+            project_id=self.project_id , only_unindexed=True
+        ))
+        self.batches.append(list(record_ids))
+        return True
+
+class FakeNLPController:
+    def __init__(self , vectordb_client):
+        self.vectordb_client = vectordb_client
+
+    async def embed_documents(self , texts):
+        return [[1.0 , 0.0] for _ in texts]
+
+async def push(chunk_model , vectordb_client , project_id: int , page_size: int = 3):
+    # one worker per stage : the batches come in chunk_id order
+    pipeline = IndexingPipeline(
+        nlp_controller=FakeNLPController(vectordb_client=vectordb_client),
+        chunk_model=chunk_model,
+        collection_name=f"collection_2_{project_id}",
+        page_size=page_size,
+        fetch_concurrency=1,
+        embed_concurrency=1,
+        insert_concurrency=1
+    )
+    return await pipeline.run(project_id=project_id)
+
+def test_push_streams_the_unindexed_chunks_and_marks_every_batch(run_with_database):
+    async def scenario(db_client):
+        chunks_ids = await add_project_chunks(db_client , project_id=1 , chunks_count=8)
+        _ = await add_project_chunks(db_client , project_id=2 , chunks_count=3)
+        chunk_model = ChunkModel(db_client=db_client)
+        # pushed before , not in this push
+        _ = await chunk_model.mark_chunks_indexed(chunks_ids=chunks_ids[:2])
+
+        vectordb_client = FakeVectorDB(chunk_model=chunk_model , project_id=1)
+        inserted_count = await push(chunk_model , vectordb_client , project_id=1)
+        unindexed_count = await chunk_model.get_total_chunks_count(project_id=1 , only_unindexed=True)
+        other_unindexed_count = await chunk_model.get_total_chunks_count(project_id=2 , only_unindexed=True)
+        return chunks_ids , vectordb_client , inserted_count , unindexed_count , other_unindexed_count
+
+    chunks_ids , vectordb_client , inserted_count , unindexed_count , other_unindexed_count = run_with_database(scenario)
+    assert inserted_count == 6
+    assert vectordb_client.batches == [chunks_ids[2:5] , chunks_ids[5:8]]
+    # the previous batch is marked by the time the next one is inserted
+    assert vectordb_client.unindexed_counts == [6 , 3]
+    assert unindexed_count == 0
+    assert other_unindexed_count == 3
+
+def test_second_push_finds_nothing(run_with_database):
+    async def scenario(db_client):
+        _ = await add_project_chunks(db_client , project_id=1 , chunks_count=5)
+        chunk_model = ChunkModel(db_client=db_client)
+        first_count = await push(chunk_model , FakeVectorDB(chunk_model=chunk_model , project_id=1) , project_id=1)
+        vectordb_client = FakeVectorDB(chunk_model=chunk_model , project_id=1)
+        second_count = await push(chunk_model , vectordb_client , project_id=1)
+        return first_count , second_count , vectordb_client.batches
+
+    first_count , second_count , second_batches = run_with_database(scenario)
+    assert first_count == 5
+    assert second_count == 0
+    assert second_batches == []
+
+def test_failed_push_resumes_after_the_inserted_batches(run_with_database):
+    async def scenario(db_client):
+        chunks_ids = await add_project_chunks(db_client , project_id=1 , chunks_count=9)
+        chunk_model = ChunkModel(db_client=db_client)
+        with pytest.raises(ValueError):
+            _ = await push(chunk_model , FakeVectorDB(chunk_model=chunk_model , project_id=1 , fail_at_batch=2) ,
+                           project_id=1)
+        vectordb_client = FakeVectorDB(chunk_model=chunk_model , project_id=1)
+        inserted_count = await push(chunk_model , vectordb_client , project_id=1)
+        return chunks_ids , inserted_count , vectordb_client.batches
+
+    chunks_ids , inserted_count , batches = run_with_database(scenario)
+    assert inserted_count == 3
+    assert batches == [chunks_ids[6:9]]
+
+def test_reset_collection_pushes_every_chunk_again(run_with_database):
+    async def scenario(db_client):
+        chunks_ids = await add_project_chunks(db_client , project_id=1 , chunks_count=4)
+        other_chunks_ids = await add_project_chunks(db_client , project_id=2 , chunks_count=2)
+        chunk_model = ChunkModel(db_client=db_client)
+        _ = await chunk_model.mark_chunks_indexed(chunks_ids=chunks_ids + other_chunks_ids)
+
+        # what the push does when the collection is new or reset
+        reset_count = await chunk_model.reset_project_chunks_indexed(project_id=1)
+        vectordb_client = FakeVectorDB(chunk_model=chunk_model , project_id=1)
+        inserted_count = await push(chunk_model , vectordb_client , project_id=1 , page_size=10)
+        other_unindexed_count = await chunk_model.get_total_chunks_count(project_id=2 , only_unindexed=True)
+        return chunks_ids , reset_count , inserted_count , vectordb_client.batches , other_unindexed_count
+
+    chunks_ids , reset_count , inserted_count , batches , other_unindexed_count = run_with_database(scenario)
+    assert reset_count == 4
+    assert inserted_count == 4
+    assert batches == [chunks_ids]
+    # the markers of the other projects stay
+    assert other_unindexed_count == 0
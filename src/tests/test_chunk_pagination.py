@@ -0,0 +1,87 @@
+import pytest
+
+# postgres backed , see run_with_database in conftest.py
+chunk_model_module = pytest.importorskip("models.ChunkModel")
+ChunkModel = chunk_model_module.ChunkModel
+from models.db_schemes import Project , Asset
+
+async def add_project_chunks(db_client , project_id: int , chunks_count: int):
+    async with db_client() as session:
+        async with session.begin():
+            session.add(Project(project_id=project_id))
+            await session.flush()
+            asset = Asset(asset_type="file" , asset_name=f"file_{project_id}.txt" , asset_size=10 ,
+                          asset_project_id=project_id)
+            session.add(asset)
+        await session.commit()
+
+    chunk_model = ChunkModel(db_client=db_client)
+    return await chunk_model.insert_chunk_rows(rows=[
+        {
+            "chunk_text": f"project {project_id} chunk {i}",
+            "chunk_metadata": {},
+            "chunk_order": i + 1,
+            "chunk_project_id": project_id,
+            "chunk_asset_id": asset.asset_id,
+        }
+        for i in range(chunks_count)
+    ])
+
+async def collect_pages(chunk_model , project_id: int , **kwargs):
+    pages = []
+    async for page_chunks in chunk_model.iter_project_chunks(project_id=project_id , **kwargs):
+        pages.append([chunk.chunk_id for chunk in page_chunks])
+    return pages
+
+@pytest.mark.parametrize("use_server_cursor" , [False , True])
+def test_pages_cover_the_project_in_order(run_with_database , use_server_cursor):
+    async def scenario(db_client):
+        chunks_ids = await add_project_chunks(db_client , project_id=1 , chunks_count=10)
+        _ = await add_project_chunks(db_client , project_id=2 , chunks_count=4)
+        pages = await collect_pages(ChunkModel(db_client=db_client) , project_id=1 , page_size=3 ,
+                                    use_server_cursor=use_server_cursor)
+        return chunks_ids , pages
+
+    chunks_ids , pages = run_with_database(scenario)
+    assert [len(page) for page in pages] == [3 , 3 , 3 , 1]
+    assert [chunk_id for page in pages for chunk_id in page] == sorted(chunks_ids)
+
+def test_bounded_scan(run_with_database):
+    async def scenario(db_client):
+        chunks_ids = sorted(await add_project_chunks(db_client , project_id=1 , chunks_count=10))
+        chunk_model = ChunkModel(db_client=db_client)
+        pages = await collect_pages(chunk_model , project_id=1 , page_size=4 ,
+                                    after_chunk_id=chunks_ids[1] , max_chunk_id=chunks_ids[7])
+        return chunks_ids , pages
+
+    chunks_ids , pages = run_with_database(scenario)
+    # (after_chunk_id , max_chunk_id]
+    assert [chunk_id for page in pages for chunk_id in page] == chunks_ids[2:8]
+
+def test_only_unindexed(run_with_database):
+    async def scenario(db_client):
+        chunks_ids = sorted(await add_project_chunks(db_client , project_id=1 , chunks_count=6))
+        chunk_model = ChunkModel(db_client=db_client)
+        _ = await chunk_model.mark_chunks_indexed(chunks_ids=chunks_ids[::2])
+        pages = await collect_pages(chunk_model , project_id=1 , page_size=2 , only_unindexed=True)
+        unindexed_count = await chunk_model.get_total_chunks_count(project_id=1 , only_unindexed=True)
+        return chunks_ids , pages , unindexed_count
+
+    chunks_ids , pages , unindexed_count = run_with_database(scenario)
+    assert [chunk_id for page in pages for chunk_id in page] == chunks_ids[1::2]
+    assert unindexed_count == 3
+
+def test_deleted_rows_do_not_shift_the_pages(run_with_database):
+    async def scenario(db_client):
+        chunks_ids = sorted(await add_project_chunks(db_client , project_id=1 , chunks_count=9))
+        chunk_model = ChunkModel(db_client=db_client)
+        seen_ids = []
+        async for page_chunks in chunk_model.iter_project_chunks(project_id=1 , page_size=3):
+            seen_ids.extend(chunk.chunk_id for chunk in page_chunks)
+            if len(seen_ids) == 3:
+                # an offset scan would skip the first rows of the next page after this delete
+                _ = await chunk_model.delete_chunks_by_ids(chunks_ids=seen_ids[:2])
+        return chunks_ids , seen_ids
+
+    chunks_ids , seen_ids = run_with_database(scenario)
+    assert seen_ids == chunks_ids
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("pydantic_settings")
+
+from controllers.DataController import DataController
+
+@pytest.fixture
+def data_controller():
+    # parse_content_range does not read the settings , skip loading them from .env
+    return DataController.__new__(DataController)
+
+@pytest.mark.parametrize("content_range , expected" , [
+    ("bytes 0-99/1000" , (0 , 100)),
+    ("bytes 900-999/1000" , (900 , 1000)),
+    ("bytes 0-999/1000" , (0 , 1000)),
+    ("bytes 10-10/1000" , (10 , 11)),
+    ("bytes 0-99/*" , (0 , 100)),
+    ("  bytes 0-99/1000  " , (0 , 100)),
+])
+def test_valid_ranges(data_controller , content_range , expected):
+    assert data_controller.parse_content_range(content_range=content_range , file_size=1000) == expected
+
+@pytest.mark.parametrize("content_range" , [
+    None,
+    "",
+    "0-99/1000",
+    "bytes=0-99/1000",
+    "bytes 0-99",
+    "bytes -5-99/1000",
+    "bytes 99-0/1000",
+    "bytes 0-1000/1000",
+    "bytes 0-99/2000",
+    "items 0-99/1000",
+    "bytes a-99/1000",
+])
+def test_invalid_ranges(data_controller , content_range):
+    assert data_controller.parse_content_range(content_range=content_range , file_size=1000) is None
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+
+# stores.llm imports the provider SDKs and Utils.metrics (prometheus_client) , all in requirements.txt
+embedding_batcher = pytest.importorskip("stores.llm.EmbeddingBatcher")
+EmbeddingBatcher , estimate_tokens = embedding_batcher.EmbeddingBatcher , embedding_batcher.estimate_tokens
+from stores.llm.LLMEnums import LLMEnum
+
+class FakeEmbeddingClient:
+    # one vector per text : [index of the text] , the first calls are the slowest ones
+    def __init__(self , fail_at_call: int = None):
+        self.calls = []
+        self.fail_at_call = fail_at_call
+
+    async def embed_text_async(self , text , document_type = None):
+        call_index = len(self.calls)
+        self.calls.append(len(text))
+        await asyncio.sleep(0.01 * (10 - call_index) if call_index < 10 else 0)
+        if call_index == self.fail_at_call:
+            return None
+        return [[float(item.split(" ")[0])] for item in text]
+
+def make_texts(count: int , length: int = 3):
+    return [f"{i} ".ljust(length , "x") for i in range(count)]
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("abc") == 2
+    assert estimate_tokens("a" * 3000) == 1001
+
+@pytest.mark.parametrize("backend , max_items" , [
+    (LLMEnum.OPENAI.value , 2048),
+    (LLMEnum.cohere.value , 96),
+    (LLMEnum.GEMINI.value , 100),
+    ("unknown" , 50),
+])
+def test_item_limits(backend , max_items):
+    batcher = EmbeddingBatcher(embedding_client=None , backend=backend)
+
+    assert batcher.split_batches(make_texts(max_items)) == [(0 , max_items)]
+    assert batcher.split_batches(make_texts(max_items + 1)) == [(0 , max_items) , (max_items , max_items + 1)]
+    assert batcher.split_batches(make_texts(2 * max_items + 3)) == [
+        (0 , max_items) , (max_items , 2 * max_items) , (2 * max_items , 2 * max_items + 3)
+    ]
+
+def test_token_limit():
+    batcher = EmbeddingBatcher(embedding_client=None , backend=LLMEnum.OPENAI.value)
+    # 1001 estimated tokens per text : 299 texts fit in 300000 tokens , far below the 2048 items
+    texts = make_texts(600 , length=3000)
+
+    assert batcher.split_batches(texts) == [(0 , 299) , (299 , 598) , (598 , 600)]
+
+def test_text_over_the_token_limit_is_sent_alone():
+    batcher = EmbeddingBatcher(embedding_client=None , backend="unknown" , max_tokens=100)
+    texts = ["a" * 30 , "b" * 600 , "c" * 30]
+
+    assert batcher.split_batches(texts) == [(0 , 1) , (1 , 2) , (2 , 3)]
+
+def test_limits_override():
+    batcher = EmbeddingBatcher(embedding_client=None , backend=LLMEnum.OPENAI.value , max_items=10 , max_tokens=7)
+    # 2 estimated tokens per text
+    assert batcher.split_batches(make_texts(10)) == [(0 , 3) , (3 , 6) , (6 , 9) , (9 , 10)]
+
+def test_vectors_keep_the_input_order():
+    embedding_client = FakeEmbeddingClient()
+    batcher = EmbeddingBatcher(embedding_client=embedding_client , backend=LLMEnum.cohere.value , concurrency=4)
+    texts = make_texts(250)
+
+    vectors = asyncio.run(batcher.embed_text_async(text=texts))
+
+    assert embedding_client.calls == [96 , 96 , 58]
+    assert vectors == [[float(i)] for i in range(250)]
+
+def test_failed_sub_batch():
+    batcher = EmbeddingBatcher(embedding_client=FakeEmbeddingClient(fail_at_call=1) , backend=LLMEnum.cohere.value)
+
+    assert asyncio.run(batcher.embed_text_async(text=make_texts(200))) is None
+
+def test_single_text_and_empty_list():
+    batcher = EmbeddingBatcher(embedding_client=FakeEmbeddingClient() , backend=LLMEnum.cohere.value)
+
+    assert asyncio.run(batcher.embed_text_async(text="7 text")) == [[7.0]]
+    assert asyncio.run(batcher.embed_text_async(text=[])) == []
@@ -0,0 +1,110 @@
+import asyncio
+import struct
+import pytest
+
+# the cache model imports sqlalchemy , see requirements.txt
+embedding_cache_module = pytest.importorskip("models.EmbeddingCacheModel")
+pack_vector , unpack_vector = embedding_cache_module.pack_vector , embedding_cache_module.unpack_vector
+
+def test_round_trip():
+    # values exactly representable in float32 come back unchanged
+    vector = [0.0 , 1.0 , -2.5 , 0.125 , 1024.0 , -0.0009765625]
+    assert unpack_vector(pack_vector(vector)) == vector
+
+def test_float32_storage():
+    vector = [0.1 , -0.3333333333 , 3.14159265358979]
+    data = pack_vector(vector)
+
+    # 4 bytes per dimension , little endian float32
+    assert len(data) == 4 * len(vector)
+    assert data[:4] == struct.pack("<f" , 0.1)
+    assert unpack_vector(data) == pytest.approx(vector , rel=1e-6)
+
+def test_empty_vector():
+    assert pack_vector([]) == b""
+    assert unpack_vector(b"") == []
+
+def test_large_vector():
+    vector = [float(i % 97) / 8 for i in range(3072)]
+    assert unpack_vector(pack_vector(vector)) == vector
+
+# postgres backed , see run_with_database in conftest.py
+EmbeddingCacheModel = embedding_cache_module.EmbeddingCacheModel
+CACHE_KEY = {"backend": "OPENAI" , "model_id": "model-a" , "embedding_size": 2 , "document_type": "document"}
+
+def test_hits_and_misses(run_with_database):
+    async def scenario(db_client):
+        cache = EmbeddingCacheModel(db_client=db_client)
+        put_count = await cache.put_vectors(**CACHE_KEY , vectors={"hash_1": [1.0 , 2.0] , "hash_2": [3.0 , 4.0]})
+        vectors = await cache.get_vectors(**CACHE_KEY , texts_hashes=["hash_1" , "hash_2" , "hash_3"])
+        return put_count , vectors
+
+    put_count , vectors = run_with_database(scenario)
+    assert put_count == 2
+    assert vectors == {"hash_1": [1.0 , 2.0] , "hash_2": [3.0 , 4.0]}
+
+@pytest.mark.parametrize("other_key" , [
+    {"model_id": "model-b"},
+    {"backend": "COHERE"},
+    {"embedding_size": 3},
+    {"document_type": "query"},
+])
+def test_other_model_does_not_reuse_the_vectors(run_with_database , other_key):
+    async def scenario(db_client):
+        cache = EmbeddingCacheModel(db_client=db_client)
+        _ = await cache.put_vectors(**CACHE_KEY , vectors={"hash_1": [1.0 , 2.0]})
+        return await cache.get_vectors(**{**CACHE_KEY , **other_key} , texts_hashes=["hash_1"])
+
+    assert run_with_database(scenario) == {}
+
+def test_first_write_wins(run_with_database):
+    async def scenario(db_client):
+        cache = EmbeddingCacheModel(db_client=db_client)
+        _ = await cache.put_vectors(**CACHE_KEY , vectors={"hash_1": [1.0 , 1.0]})
+        _ = await cache.put_vectors(**CACHE_KEY , vectors={"hash_1": [2.0 , 2.0] , "hash_2": [2.0 , 2.0]})
+        return await cache.get_vectors(**CACHE_KEY , texts_hashes=["hash_1" , "hash_2"])
+
+    assert run_with_database(scenario) == {"hash_1": [1.0 , 1.0] , "hash_2": [2.0 , 2.0]}
+
+def test_concurrent_writes_of_the_same_texts(run_with_database):
+    async def scenario(db_client):
+        cache = EmbeddingCacheModel(db_client=db_client)
+        # two workers embedding the same batch at the same time : no unique violation , one row per text
+        writes = [
+            {f"hash_{i}": [float(worker) , float(i)] for i in range(50)}
+            for worker in range(2)
+        ]
+        _ = await asyncio.gather(*[cache.put_vectors(**CACHE_KEY , vectors=vectors) for vectors in writes])
+        return await cache.get_vectors(**CACHE_KEY , texts_hashes=[f"hash_{i}" for i in range(50)])
+
+    vectors = run_with_database(scenario)
+    assert len(vectors) == 50
+    assert all(vectors[f"hash_{i}"] in ([0.0 , float(i)] , [1.0 , float(i)]) for i in range(50))
+
+class FakeEmbeddingClient:
+    embedding_model_id = CACHE_KEY["model_id"]
+    embedding_size = CACHE_KEY["embedding_size"]
+
+    def __init__(self):
+        self.calls = []
+
+    async def embed_text_async(self , text , document_type = None):
+        self.calls.append(list(text))
+        return [[float(len(item)) , 0.5] for item in text]
+
+def test_only_the_misses_go_to_the_provider(run_with_database):
+    NLPController = pytest.importorskip("controllers").NLPController
+
+    async def scenario(db_client):
+        embedding_client = FakeEmbeddingClient()
+        nlp_controller = NLPController(vectordb_client=None , generation_client=None , embedding_client=embedding_client ,
+                                       template_parser=None , embedding_cache=EmbeddingCacheModel(db_client=db_client))
+        first_vectors = await nlp_controller.embed_documents(texts=["a" , "bb" , "a"])
+        second_vectors = await nlp_controller.embed_documents(texts=["bb" , "ccc" , "a"])
+        return embedding_client.calls , first_vectors , second_vectors
+
+    calls , first_vectors , second_vectors = run_with_database(scenario)
+    # a text repeated in the batch is embedded once , the cached ones are not embedded again
+    assert calls == [["a" , "bb"] , ["ccc"]]
+    assert first_vectors == [[1.0 , 0.5] , [2.0 , 0.5] , [1.0 , 0.5]]
+    assert second_vectors == [[2.0 , 0.5] , [3.0 , 0.5] , [1.0 , 0.5]]
@@ -0,0 +1,168 @@
+import pytest
+
+# the pgvector provider imports sqlalchemy , see requirements.txt
+pgvector_module = pytest.importorskip("stores.vectordb.providers.PGVectorProvider")
+PGVectorProvider = pgvector_module.PGVectorProvider
+from models.ChunkModel import ChunkModel
+from models.db_schemes import Project , Asset
+from sqlalchemy import text as sql_text
+
+@pytest.fixture
+def partitioned_provider():
+    return PGVectorProvider(db_client=None , partitioned=True)
+
+@pytest.mark.parametrize("collection_name , expected" , [
+    ("collection_384_1" , ("collection_384" , 1)),
+    ("collection_1536_42" , ("collection_1536" , 42)),
+    ("collection_768_007" , ("collection_768" , 7)),
+])
+def test_project_collections_map_to_a_partition(partitioned_provider , collection_name , expected):
+    assert partitioned_provider.get_partition(collection_name) == expected
+
+@pytest.mark.parametrize("collection_name" , [
+    # the partitioned tables themselves and names out of the collection_{size}_{project_id} scheme
+    "collection_384",
+    "collection_384_abc",
+    "collection_384_1_2",
+    "pgvector_upsert_staging",
+    "my_collection_384_1",
+])
+def test_other_names_are_plain_tables(partitioned_provider , collection_name):
+    assert partitioned_provider.get_partition(collection_name) == (collection_name , None)
+
+def test_not_partitioned_layout():
+    provider = PGVectorProvider(db_client=None , partitioned=False)
+    assert provider.get_partition("collection_384_1") == ("collection_384_1" , None)
+
+# postgres backed (with the pgvector extension) , see run_with_database in conftest.py
+EMBEDDING_SIZE = 4
+
+async def add_project_chunks(db_client , project_id: int , chunks_count: int):
+    async with db_client() as session:
+        async with session.begin():
+            session.add(Project(project_id=project_id))
+            await session.flush()
+            asset = Asset(asset_type="file" , asset_name=f"file_{project_id}.txt" , asset_size=10 ,
+                          asset_project_id=project_id)
+            session.add(asset)
+        await session.commit()
+
+    return await ChunkModel(db_client=db_client).insert_chunk_rows(rows=[
+        {
+            "chunk_text": f"project {project_id} chunk {i}",
+            "chunk_metadata": {},
+            "chunk_order": i + 1,
+            "chunk_project_id": project_id,
+            "chunk_asset_id": asset.asset_id,
+        }
+        for i in range(chunks_count)
+    ])
+
+async def connect_provider(db_client , partitioned: bool = True):
+    provider = PGVectorProvider(db_client=db_client , default_vector_size=EMBEDDING_SIZE ,
+                                distance_method="cosine" , partitioned=partitioned)
+    await provider.connect()
+    return provider
+
+async def push_chunks(provider , collection_name: str , chunks_ids: list , label: str):
+    return await provider.upsert_many(
+        collection_name=collection_name,
+        texts=[f"{label} {chunk_id}" for chunk_id in chunks_ids],
+        vectors=[[1.0 , float(i) , 0.0 , 0.5] for i in range(len(chunks_ids))],
+        record_ids=chunks_ids
+    )
+
+async def fetch_rows(db_client , table_name: str):
+    async with db_client() as session:
+        result = await session.execute(sql_text(f"SELECT chunk_id , project_id , text FROM {table_name} ORDER BY chunk_id"))
+        return [tuple(row) for row in result.all()]
+
+def test_projects_become_partitions(run_with_database):
+    async def scenario(db_client):
+        provider = await connect_provider(db_client)
+        first_ids = await add_project_chunks(db_client , project_id=1 , chunks_count=3)
+        second_ids = await add_project_chunks(db_client , project_id=2 , chunks_count=2)
+
+        is_created = await provider.create_collection(collection_name="collection_4_1" , embedding_size=EMBEDDING_SIZE)
+        is_created_again = await provider.create_collection(collection_name="collection_4_1" , embedding_size=EMBEDDING_SIZE)
+        _ = await provider.create_collection(collection_name="collection_4_2" , embedding_size=EMBEDDING_SIZE)
+        partition_info = await provider.get_partition_info(collection_name="collection_4_2")
+
+        _ = await push_chunks(provider , "collection_4_1" , first_ids , label="first")
+        _ = await push_chunks(provider , "collection_4_2" , second_ids , label="second")
+        results = await provider.search_by_vector(collection_name="collection_4_1" , vector=[1.0 , 0.0 , 0.0 , 0.5] , limit=10)
+        return (first_ids , second_ids , is_created , is_created_again , partition_info ,
+                await fetch_rows(db_client , "collection_4") , results)
+
+    first_ids , second_ids , is_created , is_created_again , partition_info , rows , results = run_with_database(scenario)
+    assert is_created and not is_created_again
+    assert partition_info["parent_name"] == "collection_4"
+    # the rows get the project_id of their partition
+    assert rows == [(chunk_id , 1 , f"first {chunk_id}") for chunk_id in first_ids] + \
+                   [(chunk_id , 2 , f"second {chunk_id}") for chunk_id in second_ids]
+    # a partition is searched alone
+    assert sorted(result.text for result in results) == sorted(f"first {chunk_id}" for chunk_id in first_ids)
+
+def test_upsert_replaces_the_chunk_row_in_its_partition(run_with_database):
+    async def scenario(db_client):
+        provider = await connect_provider(db_client)
+        chunks_ids = await add_project_chunks(db_client , project_id=1 , chunks_count=3)
+        _ = await provider.create_collection(collection_name="collection_4_1" , embedding_size=EMBEDDING_SIZE)
+
+        _ = await push_chunks(provider , "collection_4_1" , chunks_ids , label="old")
+        # ON CONFLICT (chunk_id) : a repeated push of a chunk replaces its row
+        _ = await push_chunks(provider , "collection_4_1" , chunks_ids[:2] , label="new")
+        _ = await provider.insert_one(collection_name="collection_4_1" , text=f"one {chunks_ids[2]}" ,
+                                      vector=[0.0 , 1.0 , 0.0 , 0.0] , record_id=chunks_ids[2])
+        return chunks_ids , await fetch_rows(db_client , "collection_4_1")
+
+    chunks_ids , rows = run_with_database(scenario)
+    assert rows == [
+        (chunks_ids[0] , 1 , f"new {chunks_ids[0]}"),
+        (chunks_ids[1] , 1 , f"new {chunks_ids[1]}"),
+        (chunks_ids[2] , 1 , f"one {chunks_ids[2]}"),
+    ]
+
+def test_per_project_table_is_attached(run_with_database):
+    async def scenario(db_client):
+        chunks_ids = await add_project_chunks(db_client , project_id=1 , chunks_count=3)
+        # a collection pushed before the partitioned layout
+        plain_provider = await connect_provider(db_client , partitioned=False)
+        _ = await plain_provider.create_collection(collection_name="collection_4_1" , embedding_size=EMBEDDING_SIZE)
+        _ = await push_chunks(plain_provider , "collection_4_1" , chunks_ids , label="legacy")
+
+        provider = await connect_provider(db_client)
+        is_created = await provider.create_collection(collection_name="collection_4_1" , embedding_size=EMBEDDING_SIZE)
+        partition_info = await provider.get_partition_info(collection_name="collection_4_1")
+        _ = await push_chunks(provider , "collection_4_1" , chunks_ids[:1] , label="new")
+        return chunks_ids , is_created , partition_info , await fetch_rows(db_client , "collection_4")
+
+    chunks_ids , is_created , partition_info , rows = run_with_database(scenario)
+    # the table keeps its rows , it is not a new collection (the chunks are not pushed again)
+    assert not is_created
+    assert partition_info["parent_name"] == "collection_4"
+    assert rows == [(chunks_ids[0] , 1 , f"new {chunks_ids[0]}")] + \
+                   [(chunk_id , 1 , f"legacy {chunk_id}") for chunk_id in chunks_ids[1:]]
+
+def test_delete_detaches_and_drops_one_partition(run_with_database):
+    async def scenario(db_client):
+        provider = await connect_provider(db_client)
+        first_ids = await add_project_chunks(db_client , project_id=1 , chunks_count=2)
+        second_ids = await add_project_chunks(db_client , project_id=2 , chunks_count=2)
+        for collection_name , chunks_ids in [("collection_4_1" , first_ids) , ("collection_4_2" , second_ids)]:
+            _ = await provider.create_collection(collection_name=collection_name , embedding_size=EMBEDDING_SIZE)
+            _ = await push_chunks(provider , collection_name , chunks_ids , label=collection_name)
+
+        _ = await provider.delete_collection(collection_name="collection_4_1")
+        is_deleted_existed = await provider.is_collection_existed(collection_name="collection_4_1")
+        is_other_existed = await provider.is_collection_existed(collection_name="collection_4_2")
+        # a reset push creates the partition again , empty
+        is_created = await provider.create_collection(collection_name="collection_4_1" , embedding_size=EMBEDDING_SIZE)
+        return (second_ids , is_deleted_existed , is_other_existed , is_created ,
+                await fetch_rows(db_client , "collection_4"))
+
+    second_ids , is_deleted_existed , is_other_existed , is_created , rows = run_with_database(scenario)
+    assert not is_deleted_existed
+    assert is_other_existed
+    assert is_created
+    assert rows == [(chunk_id , 2 , f"collection_4_2 {chunk_id}") for chunk_id in second_ids]
@@ -0,0 +1,154 @@
+from datetime import datetime , timedelta , timezone
+import pytest
+
+# postgres backed , see run_with_database in conftest.py
+processing_job_module = pytest.importorskip("models.ProcessingJobModel")
+ProcessingJobModel , JobLockLostError = processing_job_module.ProcessingJobModel , processing_job_module.JobLockLostError
+from models.db_schemes import Project , Asset , ProcessingJob , DataChunk
+from models.enums.ProcessingJobEnum import ProcessingJobStatusEnum , ProcessingJobFileStatusEnum
+from sqlalchemy import update , select , func
+
+STALE_TIMEOUT = 600
+
+async def add_project(db_client , project_id: int , assets_count: int = 2):
+    async with db_client() as session:
+        async with session.begin():
+            session.add(Project(project_id=project_id))
+            await session.flush()
+            assets = [
+                Asset(asset_type="file" , asset_name=f"file_{project_id}_{i}.txt" , asset_size=10 ,
+                      asset_project_id=project_id)
+                for i in range(assets_count)
+            ]
+            session.add_all(assets)
+        await session.commit()
+    return [asset.asset_id for asset in assets]
+
+async def add_job(job_model , project_id: int , asset_ids: list):
+    job = await job_model.create_job(job=ProcessingJob(job_project_id=project_id , job_params={}) , asset_ids=asset_ids)
+    return job.job_id
+
+async def make_stale(db_client , job_id: int):
+    # the worker holding the job stopped sending heartbeats
+    async with db_client() as session:
+        async with session.begin():
+            await session.execute(update(ProcessingJob).where(ProcessingJob.job_id == job_id).values(
+                job_heartbeat_at=datetime.now(timezone.utc) - timedelta(seconds=STALE_TIMEOUT + 60)
+            ))
+        await session.commit()
+
+def chunk_row(project_id: int , asset_id: int , chunk_order: int):
+    return {
+        "chunk_text": f"chunk {chunk_order}",
+        "chunk_metadata": {},
+        "chunk_order": chunk_order,
+        "chunk_project_id": project_id,
+        "chunk_asset_id": asset_id,
+    }
+
+def test_claim_locks_the_oldest_pending_job(run_with_database):
+    async def scenario(db_client):
+        job_model = ProcessingJobModel(db_client=db_client)
+        asset_ids = await add_project(db_client , project_id=1)
+        first_job_id = await add_job(job_model , project_id=1 , asset_ids=asset_ids)
+
+        claimed = await job_model.claim_next_job(worker_id="worker-a" , stale_timeout=STALE_TIMEOUT)
+        other_claim = await job_model.claim_next_job(worker_id="worker-b" , stale_timeout=STALE_TIMEOUT)
+        return first_job_id , claimed , other_claim
+
+    first_job_id , claimed , other_claim = run_with_database(scenario)
+    assert claimed.job_id == first_job_id
+    assert claimed.job_status == ProcessingJobStatusEnum.RUNNING.value
+    assert claimed.job_locked_by == "worker-a"
+    assert claimed.job_attempts == 1
+    assert other_claim is None
+
+def test_one_running_job_per_project(run_with_database):
+    async def scenario(db_client):
+        job_model = ProcessingJobModel(db_client=db_client)
+        first_assets = await add_project(db_client , project_id=1)
+        second_assets = await add_project(db_client , project_id=2)
+        first_job_id = await add_job(job_model , project_id=1 , asset_ids=first_assets)
+        second_job_id = await add_job(job_model , project_id=1 , asset_ids=first_assets)
+        other_project_job_id = await add_job(job_model , project_id=2 , asset_ids=second_assets)
+
+        claims = [
+            await job_model.claim_next_job(worker_id="worker-a" , stale_timeout=STALE_TIMEOUT),
+            # the second job of project 1 waits , the job of project 2 runs next to the first one
+            await job_model.claim_next_job(worker_id="worker-b" , stale_timeout=STALE_TIMEOUT),
+            await job_model.claim_next_job(worker_id="worker-c" , stale_timeout=STALE_TIMEOUT),
+        ]
+        is_finished = await job_model.finish_job(job_id=first_job_id , worker_id="worker-a" ,
+                                                 job_status=ProcessingJobStatusEnum.COMPLETED.value)
+        claims.append(await job_model.claim_next_job(worker_id="worker-c" , stale_timeout=STALE_TIMEOUT))
+        return [first_job_id , other_project_job_id , None , second_job_id] , claims , is_finished
+
+    expected_job_ids , claims , is_finished = run_with_database(scenario)
+    assert [claim.job_id if claim else None for claim in claims] == expected_job_ids
+    assert is_finished
+
+def test_stale_job_is_taken_over(run_with_database):
+    async def scenario(db_client):
+        job_model = ProcessingJobModel(db_client=db_client)
+        asset_ids = await add_project(db_client , project_id=1 , assets_count=1)
+        job_id = await add_job(job_model , project_id=1 , asset_ids=asset_ids)
+        _ = await job_model.claim_next_job(worker_id="worker-a" , stale_timeout=STALE_TIMEOUT)
+        (job_file ,) = await job_model.get_job_files(job_id=job_id)
+        _ = await job_model.start_job_file(job_file_id=job_file.job_file_id)
+        _ = await job_model.add_job_file_chunks(job_file_id=job_file.job_file_id , worker_id="worker-a" ,
+                                                chunks=[chunk_row(1 , asset_ids[0] , 1)] , return_ids=True)
+
+        await make_stale(db_client , job_id=job_id)
+        taken_over = await job_model.claim_next_job(worker_id="worker-b" , stale_timeout=STALE_TIMEOUT)
+
+        results = {
+            "taken_over": taken_over,
+            # the old worker finds out at its next heartbeat , nothing it writes is accepted anymore
+            "old_touch": await job_model.touch_job(job_id=job_id , worker_id="worker-a"),
+            "old_complete": await job_model.complete_job_file(job_file_id=job_file.job_file_id , worker_id="worker-a"),
+            "old_finish": await job_model.finish_job(job_id=job_id , worker_id="worker-a" ,
+                                                     job_status=ProcessingJobStatusEnum.FAILED.value),
+        }
+        with pytest.raises(JobLockLostError):
+            await job_model.add_job_file_chunks(job_file_id=job_file.job_file_id , worker_id="worker-a" ,
+                                                chunks=[chunk_row(1 , asset_ids[0] , 2)])
+
+        # the new worker drops what the dead attempt flushed , then owns the file
+        results["discarded"] = await job_model.discard_job_file_chunks(job_file_id=job_file.job_file_id)
+        results["new_touch"] = await job_model.touch_job(job_id=job_id , worker_id="worker-b")
+        results["new_complete"] = await job_model.complete_job_file(job_file_id=job_file.job_file_id , worker_id="worker-b")
+        async with db_client() as session:
+            results["chunks_count"] = (await session.execute(select(func.count(DataChunk.chunk_id)))).scalar()
+        results["job"] = await job_model.get_job(job_id=job_id)
+        results["file_status"] = (await job_model.get_job_files(job_id=job_id))[0].job_file_status
+        return results
+
+    results = run_with_database(scenario)
+    assert results["taken_over"].job_locked_by == "worker-b"
+    assert results["taken_over"].job_attempts == 2
+    assert not results["old_touch"]
+    assert not results["old_complete"]
+    assert not results["old_finish"]
+    assert results["discarded"] == 1
+    assert results["new_touch"]
+    assert results["new_complete"]
+    assert results["chunks_count"] == 0
+    assert results["job"].job_status == ProcessingJobStatusEnum.RUNNING.value
+    assert results["file_status"] == ProcessingJobFileStatusEnum.COMPLETED.value
+
+def test_released_job_goes_back_to_the_queue(run_with_database):
+    async def scenario(db_client):
+        job_model = ProcessingJobModel(db_client=db_client)
+        asset_ids = await add_project(db_client , project_id=1)
+        job_id = await add_job(job_model , project_id=1 , asset_ids=asset_ids)
+        _ = await job_model.claim_next_job(worker_id="worker-a" , stale_timeout=STALE_TIMEOUT)
+        await job_model.release_job(job_id=job_id , worker_id="worker-a")
+        released = await job_model.get_job(job_id=job_id)
+        claimed = await job_model.claim_next_job(worker_id="worker-b" , stale_timeout=STALE_TIMEOUT)
+        return job_id , released , claimed
+
+    job_id , released , claimed = run_with_database(scenario)
+    assert released.job_status == ProcessingJobStatusEnum.PENDING.value
+    assert released.job_locked_by is None
+    assert claimed.job_id == job_id
+    assert claimed.job_locked_by == "worker-b"
@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+
+# the qdrant provider needs qdrant-client , see requirements.txt
+# the tests run on the embedded storage (AsyncQdrantClient(path=...)) , no qdrant server needed
+qdrant_module = pytest.importorskip("stores.vectordb.providers.QdrantDBProvider")
+QdrantDBProvider , TENANT_FIELD = qdrant_module.QdrantDBProvider , qdrant_module.TENANT_FIELD
+from stores.vectordb.QdrantTenantMigration import migrate_collection
+from stores.vectordb.VectorDBEnums import DistanceMethodEnums
+
+EMBEDDING_SIZE = 4
+
+@pytest.fixture
+def run_with_qdrant(tmp_path):
+    def run(scenario , multi_tenant: bool = True):
+        # scenario(provider) runs on an empty embedded storage , in its own event loop
+        async def run_scenario():
+            provider = QdrantDBProvider(db_client=str(tmp_path / "qdrant") , default_vector_size=EMBEDDING_SIZE ,
+                                        distance_method=DistanceMethodEnums.COSINE.value , multi_tenant=multi_tenant)
+            await provider.connect()
+            try:
+                return await scenario(provider)
+            finally:
+                await provider.disconnect()
+        return asyncio.run(run_scenario())
+    return run
+
+def make_vector(i: int):
+    return [1.0 , float(i) , 0.5 , 0.0]
+
+async def push_project(provider , collection_name: str , record_ids: list):
+    _ = await provider.create_collection(collection_name=collection_name , embedding_size=EMBEDDING_SIZE)
+    return await provider.upsert_many(
+        collection_name=collection_name,
+        texts=[f"{collection_name} {record_id}" for record_id in record_ids],
+        vectors=[make_vector(i) for i in range(len(record_ids))],
+        record_ids=record_ids
+    )
+
+async def search_texts(provider , collection_name: str):
+    results = await provider.search_by_vector(collection_name=collection_name , vector=make_vector(0) , limit=100)
+    return sorted(result.text for result in results or [])
+
+def test_projects_do_not_see_each_other(run_with_qdrant):
+    async def scenario(provider):
+        _ = await push_project(provider , "collection_4_1" , [1 , 2 , 3])
+        _ = await push_project(provider , "collection_4_2" , [4 , 5])
+        collections = await provider.list_all_collections()
+        return ([collection.name for collection in collections.collections] ,
+                await search_texts(provider , "collection_4_1") , await search_texts(provider , "collection_4_2"))
+
+    collections_names , first_texts , second_texts = run_with_qdrant(scenario)
+    # one shared collection for the embedding size
+    assert collections_names == ["collection_4"]
+    assert first_texts == ["collection_4_1 1" , "collection_4_1 2" , "collection_4_1 3"]
+    assert second_texts == ["collection_4_2 4" , "collection_4_2 5"]
+
+def test_delete_collection_removes_one_project(run_with_qdrant):
+    async def scenario(provider):
+        _ = await push_project(provider , "collection_4_1" , [1 , 2 , 3])
+        _ = await push_project(provider , "collection_4_2" , [4 , 5])
+        _ = await provider.delete_collection(collection_name="collection_4_1")
+        return (await provider.is_collection_existed(collection_name="collection_4_1") ,
+                await provider.is_collection_existed(collection_name="collection_4") ,
+                await search_texts(provider , "collection_4_1") , await search_texts(provider , "collection_4_2"))
+
+    is_deleted_existed , is_shared_existed , first_texts , second_texts = run_with_qdrant(scenario)
+    assert not is_deleted_existed
+    assert is_shared_existed
+    assert first_texts == []
+    assert second_texts == ["collection_4_2 4" , "collection_4_2 5"]
+
+def test_project_without_points_is_a_new_collection(run_with_qdrant):
+    async def scenario(provider):
+        _ = await push_project(provider , "collection_4_1" , [1 , 2])
+        # the shared collection exists already , the project has no points in it
+        is_new_created = await provider.create_collection(collection_name="collection_4_2" , embedding_size=EMBEDDING_SIZE)
+        is_pushed_created = await provider.create_collection(collection_name="collection_4_1" , embedding_size=EMBEDDING_SIZE)
+        is_reset_created = await provider.create_collection(collection_name="collection_4_1" , embedding_size=EMBEDDING_SIZE ,
+                                                            do_reset=1)
+        return is_new_created , is_pushed_created , is_reset_created
+
+    is_new_created , is_pushed_created , is_reset_created = run_with_qdrant(scenario)
+    assert is_new_created
+    assert not is_pushed_created
+    assert is_reset_created
+
+def test_migration_moves_the_points_with_their_ids(run_with_qdrant):
+    async def scenario(provider):
+        # a per-project collection of the layout before the shared collections
+        _ = await provider.create_qdrant_collection(collection_name="collection_4_7" , embedding_size=EMBEDDING_SIZE)
+        _ = await provider.client.upsert(
+            collection_name="collection_4_7",
+            points=provider.build_points(
+                texts=[f"legacy {record_id}" for record_id in [11 , 12 , 13]],
+                vectors=[make_vector(i) for i in range(3)],
+                record_ids=[11 , 12 , 13]
+            )
+        )
+        moved_count = await migrate_collection(provider=provider , collection_name="collection_4_7" , batch_size=2)
+
+        records , _ = await provider.client.scroll(collection_name="collection_4" , limit=100 , with_payload=True)
+        is_legacy_existed = await provider.client.collection_exists(collection_name="collection_4_7")
+        return moved_count , records , is_legacy_existed , await search_texts(provider , "collection_4_7")
+
+    moved_count , records , is_legacy_existed , texts = run_with_qdrant(scenario)
+    assert moved_count == 3
+    assert sorted((record.id , record.payload["text"] , record.payload[TENANT_FIELD]) for record in records) == [
+        (11 , "legacy 11" , "7"),
+        (12 , "legacy 12" , "7"),
+        (13 , "legacy 13" , "7"),
+    ]
+    assert not is_legacy_existed
+    assert texts == ["legacy 11" , "legacy 12" , "legacy 13"]
@@ -0,0 +1,167 @@
+import asyncio
+import pytest
+
+# stores.llm imports the provider SDKs and Utils.metrics (prometheus_client) , all in requirements.txt
+rate_governor = pytest.importorskip("stores.llm.RateGovernor")
+RateGovernor = rate_governor.RateGovernor
+
+class RateLimitError(Exception):
+    pass
+
+class InternalServerError(Exception):
+    pass
+
+class HTTPError(Exception):
+    def __init__(self , status_code: int , headers: dict = None):
+        super().__init__(f"http {status_code}")
+        self.status_code = status_code
+        self.response = type("Response" , (object ,) , {"headers": headers or {}})()
+
+def make_governor(name: str , **config):
+    # no backoff sleeps in the tests
+    config = {"backoff_base": 0 , "backoff_max": 0 , **config}
+    return RateGovernor(backend="test" , model_id=name , **config)
+
+def make_call(outcomes: list):
+    # every call takes the next outcome , an exception is raised and anything else is returned
+    calls = []
+
+    async def call():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome , Exception):
+            raise outcome
+        return outcome
+    return call , calls
+
+@pytest.mark.parametrize("error , expected" , [
+    (HTTPError(429) , rate_governor.RATE_LIMIT_ERROR),
+    (RateLimitError() , rate_governor.RATE_LIMIT_ERROR),
+    (HTTPError(503) , rate_governor.UNAVAILABLE_ERROR),
+    (InternalServerError() , rate_governor.UNAVAILABLE_ERROR),
+    (HTTPError(400) , None),
+    (ValueError("bad request") , None),
+])
+def test_get_error_kind(error , expected):
+    assert rate_governor.get_error_kind(error) == expected
+
+def test_get_retry_after():
+    assert rate_governor.get_retry_after(HTTPError(429 , {"retry-after": "2.5"})) == 2.5
+    assert rate_governor.get_retry_after(HTTPError(429 , {"retry-after": "soon"})) is None
+    assert rate_governor.get_retry_after(HTTPError(429)) is None
+    assert rate_governor.get_retry_after(ValueError()) is None
+
+def test_retries_until_success():
+    governor = make_governor("retry")
+    call , calls = make_call([HTTPError(429) , HTTPError(503) , "answer"])
+
+    assert asyncio.run(governor.run(call=call)) == "answer"
+    assert len(calls) == 3
+    assert governor.in_flight == 0
+
+def test_final_errors_are_not_retried():
+    governor = make_governor("final")
+    call , calls = make_call([HTTPError(400) , "answer"])
+
+    assert asyncio.run(governor.run(call=call)) is None
+    assert len(calls) == 1
+
+def test_gives_up_after_max_retries():
+    governor = make_governor("give-up" , max_retries=2 , breaker_failures=100)
+    call , calls = make_call([HTTPError(503)] * 5)
+
+    assert asyncio.run(governor.run(call=call)) is None
+    assert len(calls) == 3
+
+def test_rate_limit_halves_the_concurrency():
+    governor = make_governor("aimd" , initial_concurrency=16 , min_concurrency=2 , max_retries=3)
+    call , calls = make_call([HTTPError(429)] * 4)
+
+    assert asyncio.run(governor.run(call=call)) is None
+    assert len(calls) == 4
+    # 16 -> 8 -> 4 -> 2 , never below min_concurrency
+    assert governor.concurrency_limit == 2
+
+def test_success_raises_the_concurrency():
+    governor = make_governor("increase" , initial_concurrency=4 , max_concurrency=5 , target_latency=60)
+    call , _ = make_call(["answer"] * 50)
+
+    async def run_all():
+        for _ in range(50):
+            await governor.run(call=call)
+    asyncio.run(run_all())
+
+    assert governor.concurrency_limit == 5
+
+def test_concurrency_limit_is_respected():
+    governor = make_governor("limit" , initial_concurrency=3 , max_concurrency=3)
+    running = []
+    max_running = []
+
+    async def call():
+        running.append(1)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+        return True
+
+    async def run_all():
+        return await asyncio.gather(*[governor.run(call=call) for _ in range(12)])
+
+    assert all(asyncio.run(run_all()))
+    assert max(max_running) == 3
+
+def test_circuit_opens_then_recovers(monkeypatch):
+    governor = make_governor("circuit" , max_retries=0 , breaker_failures=2 , breaker_cooldown=30)
+    call , calls = make_call([HTTPError(503) , HTTPError(503) , "probe" , "answer"])
+
+    assert asyncio.run(governor.run(call=call)) is None
+    assert asyncio.run(governor.run(call=call)) is None
+    assert governor.circuit_state == rate_governor.CIRCUIT_OPEN
+
+    # open : rejected without calling the backend
+    assert asyncio.run(governor.run(call=call)) is None
+    assert len(calls) == 2
+
+    # after the cooldown a single probe goes through and closes the circuit
+    opened_at = governor.circuit_opened_at
+    monkeypatch.setattr(rate_governor.time , "monotonic" , lambda: opened_at + 31)
+    assert asyncio.run(governor.run(call=call)) == "probe"
+    assert governor.circuit_state == rate_governor.CIRCUIT_CLOSED
+    assert asyncio.run(governor.run(call=call)) == "answer"
+
+def test_half_open_allows_one_probe():
+    governor = make_governor("probe")
+    governor.circuit_state = rate_governor.CIRCUIT_HALF_OPEN
+
+    assert governor.allow_request()
+    assert not governor.allow_request()
+    governor.record_unavailable()
+    assert governor.circuit_state == rate_governor.CIRCUIT_OPEN
+
+def test_requests_window(monkeypatch):
+    governor = make_governor("window" , requests_per_minute=2)
+    now = [1000.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_governor.time , "monotonic" , lambda: now[0])
+    monkeypatch.setattr(rate_governor.asyncio , "sleep" , fake_sleep)
+
+    async def run_all():
+        for _ in range(3):
+            await governor.wait_for_window(tokens=1)
+    asyncio.run(run_all())
+
+    # the third request waits for the first one to leave the one minute window
+    assert sleeps == [60]
+
+def test_tokens_window_lets_a_big_request_through_alone(monkeypatch):
+    governor = make_governor("tokens" , tokens_per_minute=100)
+    monkeypatch.setattr(rate_governor.time , "monotonic" , lambda: 1000.0)
+
+    asyncio.run(governor.wait_for_window(tokens=500))
+    assert governor.window_tokens == 500
@@ -0,0 +1,47 @@
+import pytest
+
+# the worker pool imports the controllers and the sqlalchemy models , see requirements.txt
+worker_pool_module = pytest.importorskip("workers.ProcessingWorkerPool")
+from models.db_schemes import Asset
+
+CONFIG = {"content_hash": "abc" , "chunk_size": 100 , "chunk_overlap": 20 , "splitter_mode": "separator"}
+MODIFIED_CONFIG = {**CONFIG , "content_hash": "def"}
+RECHUNKED_CONFIG = {**CONFIG , "chunk_size": 200}
+
+@pytest.fixture
+def worker_pool():
+    return worker_pool_module.ProcessingWorkerPool(app=None)
+
+def make_asset(processing_config: dict = None):
+    asset_config = {"processing": processing_config} if processing_config is not None else None
+    return Asset(asset_id=1 , asset_name="file.pdf" , asset_config=asset_config)
+
+@pytest.mark.parametrize("params , expected" , [
+    # defaults : unchanged assets are skipped , modified ones are processed again
+    ({} , False),
+    ({"do_reset": 0} , False),
+    ({"force_reprocess": 1} , True),
+    # do_reset wiped the project chunks , every selected asset is processed
+    ({"do_reset": 1} , True),
+    ({"do_reset": 1 , "reprocess_modified": 0} , True),
+])
+def test_unchanged_asset(worker_pool , params , expected):
+    asset = make_asset(processing_config=CONFIG)
+    assert worker_pool.should_process_asset(asset=asset , processing_config=dict(CONFIG) , params=params) is expected
+
+@pytest.mark.parametrize("new_config" , [MODIFIED_CONFIG , RECHUNKED_CONFIG])
+@pytest.mark.parametrize("params , expected" , [
+    ({} , True),
+    ({"reprocess_modified": 1} , True),
+    ({"reprocess_modified": 0} , False),
+    ({"reprocess_modified": 0 , "force_reprocess": 1} , True),
+    ({"reprocess_modified": 0 , "do_reset": 1} , True),
+])
+def test_modified_asset(worker_pool , new_config , params , expected):
+    asset = make_asset(processing_config=CONFIG)
+    assert worker_pool.should_process_asset(asset=asset , processing_config=new_config , params=params) is expected
+
+@pytest.mark.parametrize("params" , [{} , {"reprocess_modified": 0} , {"do_reset": 0}])
+def test_never_processed_asset(worker_pool , params):
+    for asset in [make_asset() , Asset(asset_id=2 , asset_name="other.txt" , asset_config={"other": 1})]:
+        assert worker_pool.should_process_asset(asset=asset , processing_config=CONFIG , params=params) is True
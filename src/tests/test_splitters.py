@@ -0,0 +1,134 @@
+from splitters import SplitterFactory
+from splitters.BaseSplitter import Document
+from splitters.CharacterSplitter import CharacterSplitter
+from splitters.SeparatorSplitter import SeparatorSplitter
+from splitters.SplitterEnums import SplitterEnums
+import asyncio
+import random
+import pytest
+
+WORDS = ["retrieval", "augmented", "generation", "vector", "chunk", "the", "of", "a"]
+
+def make_pages(pages_count: int = 12 , seed: int = 3):
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(pages_count):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(2 , 15))) + rng.choice([".", ""])
+                 for _ in range(rng.randint(3 , 12))]
+        pages.append("\n".join(lines))
+    return pages
+
+def check_offsets(chunks , full_text: str):
+    # every chunk is the exact slice of the document given by its offsets
+    for chunk in chunks:
+        start_offset , end_offset = chunk.metadata["start_offset"] , chunk.metadata["end_offset"]
+        assert full_text[start_offset:end_offset] == chunk.page_content
+
+def check_coverage(chunks , full_text: str):
+    covered = [False] * len(full_text)
+    for chunk in chunks:
+        for i in range(chunk.metadata["start_offset"] , chunk.metadata["end_offset"]):
+            covered[i] = True
+    assert all(covered[i] for i , char in enumerate(full_text) if not char.isspace())
+
+@pytest.mark.parametrize("splitter_class" , [CharacterSplitter , SeparatorSplitter])
+@pytest.mark.parametrize("chunk_size , chunk_overlap" , [(50 , 0) , (120 , 30) , (400 , 100)])
+def test_chunks_are_bounded_slices_covering_the_text(splitter_class , chunk_size , chunk_overlap):
+    pages = make_pages()
+    full_text = "\n".join(pages)
+    chunks = list(splitter_class(chunk_size=chunk_size , chunk_overlap=chunk_overlap).split_texts(pages))
+
+    assert chunks
+    assert all(len(chunk.page_content) <= chunk_size for chunk in chunks)
+    check_offsets(chunks , full_text)
+    check_coverage(chunks , full_text)
+
+@pytest.mark.parametrize("splitter_class" , [CharacterSplitter , SeparatorSplitter])
+def test_page_boundaries_do_not_change_the_chunks(splitter_class):
+    pages = make_pages()
+    full_text = "\n".join(pages)
+    paged_chunks = list(splitter_class(chunk_size=150 , chunk_overlap=40).split_texts(pages))
+    whole_chunks = list(splitter_class(chunk_size=150 , chunk_overlap=40).split_texts([full_text]))
+
+    assert [chunk.page_content for chunk in paged_chunks] == [chunk.page_content for chunk in whole_chunks]
+
+def test_character_overlap():
+    text = "".join(chr(ord("a") + i % 26) for i in range(100))
+    chunks = list(CharacterSplitter(chunk_size=20 , chunk_overlap=5).split_texts([text]))
+
+    for previous , current in zip(chunks , chunks[1:]):
+        assert current.metadata["start_offset"] == previous.metadata["end_offset"] - 5
+        assert previous.page_content[-5:] == current.page_content[:5]
+    assert chunks[-1].metadata["end_offset"] == len(text)
+
+def test_character_without_overlap_is_a_partition():
+    text = "x" * 95
+    chunks = list(CharacterSplitter(chunk_size=20).split_texts([text]))
+
+    assert [len(chunk.page_content) for chunk in chunks] == [20 , 20 , 20 , 20 , 15]
+
+def test_overlap_is_capped_below_chunk_size():
+    splitter = CharacterSplitter(chunk_size=10 , chunk_overlap=50)
+    assert splitter.chunk_overlap == 9
+    # every step still moves forward , the split ends
+    chunks = list(splitter.split_texts(["y" * 200]))
+    assert chunks[-1].metadata["end_offset"] == 200
+
+def test_separator_cuts_on_the_strongest_separator():
+    paragraphs = ["first paragraph\nline two" , "second paragraph here" , "third paragraph is last"]
+    text = "\n\n".join(paragraphs)
+    chunks = list(SeparatorSplitter(chunk_size=30).split_texts([text]))
+
+    assert [chunk.page_content for chunk in chunks] == paragraphs
+
+def test_separator_overlap_starts_on_a_word():
+    text = " ".join(["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"] * 10)
+    chunks = list(SeparatorSplitter(chunk_size=40 , chunk_overlap=12).split_texts([text]))
+
+    for chunk in chunks[1:]:
+        start_offset = chunk.metadata["start_offset"]
+        assert start_offset == 0 or text[start_offset - 1] == " "
+    check_offsets(chunks , text)
+
+def test_pages_metadata():
+    pages = ["a" * 30 , "b" * 30 , "c" * 30]
+    metadatas = [{"page": 1} , {"page": 2} , {"page": 3}]
+    chunks = list(CharacterSplitter(chunk_size=40).split_texts(pages , metadatas))
+
+    assert (chunks[0].metadata["page"] , chunks[0].metadata["last_page"]) == (1 , 2)
+    assert (chunks[-1].metadata["page"] , chunks[-1].metadata["last_page"]) == (3 , 3)
+
+def test_blank_text_gives_no_chunk():
+    assert list(SeparatorSplitter(chunk_size=10).split_texts(["   " , "\n\n"])) == []
+
+def test_invalid_chunk_size():
+    with pytest.raises(ValueError):
+        CharacterSplitter(chunk_size=0)
+
+def test_split_pages_matches_split_texts():
+    pages = make_pages(pages_count=5)
+
+    async def iter_pages():
+        for page_number , page in enumerate(pages , start=1):
+            yield Document(page_content=page , metadata={"page": page_number})
+
+    async def collect():
+        splitter = SeparatorSplitter(chunk_size=100 , chunk_overlap=20)
+        return [chunk async for chunk in splitter.split_pages(iter_pages())]
+
+    expected = list(SeparatorSplitter(chunk_size=100 , chunk_overlap=20).split_texts(
+        pages , [{"page": page_number} for page_number in range(1 , len(pages) + 1)]
+    ))
+    assert asyncio.run(collect()) == expected
+
+def test_splitter_is_reusable_after_finish():
+    splitter = SeparatorSplitter(chunk_size=60 , chunk_overlap=10)
+    pages = make_pages(pages_count=3)
+
+    assert list(splitter.split_texts(pages)) == list(splitter.split_texts(pages))
+
+def test_factory():
+    factory = SplitterFactory()
+    assert isinstance(factory.create(mode=SplitterEnums.CHARACTER.value , chunk_size=10) , CharacterSplitter)
+    assert isinstance(factory.create(mode=SplitterEnums.SEPARATOR.value , chunk_size=10) , SeparatorSplitter)
+    assert factory.create(mode="unknown" , chunk_size=10) is None
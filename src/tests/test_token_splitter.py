@@ -0,0 +1,83 @@
+from splitters.TokenSplitter import TokenSplitter , get_tokenizer
+import re
+import pytest
+
+class WordTokenizer:
+    # one token per word with its leading whitespace , same interface as a tiktoken Encoding
+    def encode(self , text: str , disallowed_special=()):
+        return re.findall(r"\s*\S+|\s+" , text)
+
+    def decode_with_offsets(self , tokens):
+        offsets = []
+        position = 0
+        for token in tokens:
+            offsets.append(position)
+            position += len(token)
+        return "".join(tokens) , offsets
+
+def make_text(words_count: int):
+    return " ".join(f"w{i}" for i in range(words_count))
+
+def test_chunks_have_chunk_size_tokens():
+    text = make_text(100)
+    chunks = list(TokenSplitter(chunk_size=10 , tokenizer=WordTokenizer()).split_texts([text]))
+
+    assert [chunk.metadata["token_count"] for chunk in chunks] == [10] * 10
+    assert chunks[0].page_content == make_text(10)
+    for chunk in chunks:
+        assert text[chunk.metadata["start_offset"]:chunk.metadata["end_offset"]] == chunk.page_content
+
+def test_token_overlap():
+    text = make_text(50)
+    chunks = list(TokenSplitter(chunk_size=10 , chunk_overlap=3 , tokenizer=WordTokenizer()).split_texts([text]))
+
+    for previous , current in zip(chunks , chunks[1:]):
+        assert previous.page_content.split()[-3:] == current.page_content.split()[:3]
+    assert chunks[-1].page_content.endswith("w49")
+
+def test_words_cut_by_a_page_are_not_split():
+    # "w1" + "2" : the word continues on the next page , it must not become two tokens
+    pages = ["w0 w1" , "2 w3 w4 w5 w6 w7"]
+    chunks = list(TokenSplitter(chunk_size=3 , tokenizer=WordTokenizer() , page_separator="").split_texts(pages))
+
+    assert [chunk.page_content for chunk in chunks] == ["w0 w12 w3" , "w4 w5 w6" , "w7"]
+
+def test_page_boundaries_do_not_change_the_chunks():
+    words = make_text(200).split(" ")
+    pages = [" ".join(words[i:i + 17]) for i in range(0 , len(words) , 17)]
+    paged = list(TokenSplitter(chunk_size=25 , chunk_overlap=5 , tokenizer=WordTokenizer()).split_texts(pages))
+    whole = list(TokenSplitter(chunk_size=25 , chunk_overlap=5 , tokenizer=WordTokenizer()).split_texts(["\n".join(pages)]))
+
+    assert [chunk.page_content.split() for chunk in paged] == [chunk.page_content.split() for chunk in whole]
+
+class CountingTokenizer(WordTokenizer):
+    def __init__(self):
+        self.encoded_chars = 0
+
+    def encode(self , text: str , disallowed_special=()):
+        self.encoded_chars += len(text)
+        return super().encode(text , disallowed_special=disallowed_special)
+
+def test_pages_are_tokenized_once():
+    words = make_text(2000).split(" ")
+    pages = [" ".join(words[i:i + 7]) for i in range(0 , len(words) , 7)]
+    tokenizer = CountingTokenizer()
+    chunks = list(TokenSplitter(chunk_size=300 , chunk_overlap=50 , tokenizer=tokenizer).split_texts(pages))
+
+    text_length = len("\n".join(pages))
+    assert chunks[-1].page_content.endswith("w1999")
+    # only the boundary word of each page is encoded a second time
+    assert tokenizer.encoded_chars <= text_length + len(pages) * 8
+
+def test_tiktoken_encoding():
+    try:
+        tokenizer = get_tokenizer(model_id="text-embedding-3-small")
+    except Exception as e:
+        # the BPE table is downloaded on first use
+        pytest.skip(f"tiktoken encoding not available: {e}")
+
+    text = "Retrieval augmented generation splits documents into chunks. " * 40
+    chunks = list(TokenSplitter(chunk_size=64 , chunk_overlap=8 , tokenizer=tokenizer).split_texts([text]))
+
+    assert all(len(tokenizer.encode(chunk.page_content)) <= 64 for chunk in chunks)
+    assert chunks[-1].metadata["end_offset"] == len(text.rstrip())
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import pickle
+import shutil
+import socket
+import tempfile
+import pytest
+
+# the vector db modules import models.db_schemes (sqlalchemy) , see requirements.txt
+broker_module = pytest.importorskip("stores.vectordb.VectorDBBroker")
+provider_module = pytest.importorskip("stores.vectordb.providers.VectorDBBrokerProvider")
+FRAME_HEADER , FrameSender , read_frame = broker_module.FRAME_HEADER , broker_module.FrameSender , broker_module.read_frame
+VectorDBBroker = broker_module.VectorDBBroker
+VectorDBBrokerProvider = provider_module.VectorDBBrokerProvider
+
+class FakeProvider:
+    # answers the few methods the tests call , the broker only needs the coroutines
+    def __init__(self):
+        self.collections = {"collection_384_1"}
+        self.calls = []
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def is_collection_existed(self , collection_name: str):
+        self.calls.append(collection_name)
+        return collection_name in self.collections
+
+    async def delete_collection(self , collection_name: str):
+        raise ValueError(f"collection {collection_name} is locked")
+
+@pytest.fixture
+def socket_path():
+    # unix socket paths are limited to ~100 characters , the pytest tmp_path can be longer
+    directory = tempfile.mkdtemp(prefix="broker")
+    yield os.path.join(directory , "broker.sock")
+    shutil.rmtree(directory , ignore_errors=True)
+
+async def open_socket_pair():
+    left , right = socket.socketpair()
+    left_reader , left_writer = await asyncio.open_connection(sock=left)
+    right_reader , right_writer = await asyncio.open_connection(sock=right)
+    return (left_reader , left_writer) , (right_reader , right_writer)
+
+def test_frame_sender_batches_the_queued_messages():
+    async def scenario():
+        (_ , writer) , (reader , _) = await open_socket_pair()
+        sender = FrameSender(writer=writer , max_batch=3)
+        for message_id in range(5):
+            sender.queue.put_nowait({"id": message_id})
+        sender_task = asyncio.create_task(sender.run())
+        try:
+            first_frame = await read_frame(reader)
+            second_frame = await read_frame(reader)
+        finally:
+            sender_task.cancel()
+            writer.close()
+        return first_frame , second_frame
+
+    first_frame , second_frame = asyncio.run(scenario())
+    # everything waiting in the queue leaves together , at most max_batch messages per frame
+    assert [message["id"] for message in first_frame] == [0 , 1 , 2]
+    assert [message["id"] for message in second_frame] == [3 , 4]
+
+def test_read_frame():
+    async def scenario():
+        reader = asyncio.StreamReader()
+        data = pickle.dumps([{"id": 7 , "result": [1.5 , 2.5]}])
+        reader.feed_data(FRAME_HEADER.pack(len(data)) + data[:10])
+        reader.feed_data(data[10:])
+        messages = await read_frame(reader)
+
+        truncated_reader = asyncio.StreamReader()
+        truncated_reader.feed_data(FRAME_HEADER.pack(100) + b"short")
+        truncated_reader.feed_eof()
+        with pytest.raises(asyncio.IncompleteReadError):
+            await read_frame(truncated_reader)
+        return messages
+
+    assert asyncio.run(scenario()) == [{"id": 7 , "result": [1.5 , 2.5]}]
+
+def test_calls_through_the_broker(socket_path):
+    async def scenario():
+        provider = FakeProvider()
+        broker = VectorDBBroker(provider=provider , socket_path=socket_path)
+        await broker.start()
+        client = VectorDBBrokerProvider(socket_path=socket_path , timeout=5)
+        try:
+            results = await asyncio.gather(*[
+                client.is_collection_existed(collection_name=name)
+                for name in ["collection_384_1" , "collection_384_2"] * 20
+            ])
+            with pytest.raises(RuntimeError , match="locked"):
+                await client.delete_collection(collection_name="collection_384_1")
+            with pytest.raises(RuntimeError , match="Unknown vector db method"):
+                await client.call("connect")
+        finally:
+            await client.disconnect()
+            await broker.stop()
+        return results , provider.calls
+
+    results , calls = asyncio.run(scenario())
+    assert results == [True , False] * 20
+    assert len(calls) == 40
+
+def test_broker_restart_fails_the_pending_calls_and_reconnects(socket_path):
+    async def scenario():
+        provider = FakeProvider()
+        slow_call = asyncio.Event()
+
+        async def is_collection_existed(collection_name: str):
+            await slow_call.wait()
+            return True
+        provider.is_collection_existed = is_collection_existed
+
+        broker = VectorDBBroker(provider=provider , socket_path=socket_path)
+        await broker.start()
+        client = VectorDBBrokerProvider(socket_path=socket_path , timeout=30)
+        pending_call = asyncio.create_task(client.is_collection_existed(collection_name="collection_384_1"))
+        await asyncio.sleep(0.1)
+        old_tasks = list(client.tasks)
+
+        await broker.stop()
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        with pytest.raises(ConnectionError):
+            await pending_call
+        failed_after = loop.time() - start_time
+
+        # the next call reaches the restarted broker
+        provider.is_collection_existed = FakeProvider().is_collection_existed
+        broker = VectorDBBroker(provider=provider , socket_path=socket_path)
+        await broker.start()
+        try:
+            is_existed = await client.is_collection_existed(collection_name="collection_384_1")
+            await asyncio.sleep(0)
+            old_tasks_done = all(task.done() for task in old_tasks)
+        finally:
+            await client.disconnect()
+            await broker.stop()
+        return failed_after , is_existed , old_tasks_done
+
+    failed_after , is_existed , old_tasks_done = asyncio.run(scenario())
+    # the waiting call fails as soon as the connection drops , not after the timeout
+    assert failed_after < 5
+    assert is_existed
+    assert old_tasks_done
+
+def test_unreadable_frame_fails_the_pending_calls(socket_path):
+    async def handle_connection(reader , writer):
+        await read_frame(reader)
+        writer.write(FRAME_HEADER.pack(3) + b"xyz")
+        await writer.drain()
+        # the connection stays open , only the frame is broken
+        await asyncio.sleep(30)
+
+    async def scenario():
+        server = await asyncio.start_unix_server(handle_connection , path=socket_path)
+        client = VectorDBBrokerProvider(socket_path=socket_path , timeout=30)
+        try:
+            loop = asyncio.get_running_loop()
+            start_time = loop.time()
+            with pytest.raises(ConnectionError):
+                await client.is_collection_existed(collection_name="collection_384_1")
+            failed_after = loop.time() - start_time
+            is_connected = client.is_connected
+        finally:
+            await client.disconnect()
+            server.close()
+        return failed_after , is_connected
+
+    failed_after , is_connected = asyncio.run(scenario())
+    assert failed_after < 5
+    assert not is_connected
@@ -0,0 +1,165 @@
+from controllers import NLPController
+from models.ChunkModel import ChunkModel
+from Utils.metrics import INDEXING_STAGE_CHUNKS , INDEXING_STAGE_LATENCY , INDEXING_QUEUE_DEPTH
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger('uvicorn.error')
+
+class IndexingPipeline:
+    """
+    Pushes the chunks of a project to the vector db in three overlapping stages :
+    fetch (keyset pages from postgres) -> embed -> insert into the collection.
+    Each stage runs its own workers and the stages are linked by bounded queues ,
+    so a slow stage applies back pressure instead of buffering the whole project.
+    """
+    def __init__(self , nlp_controller:NLPController , chunk_model:ChunkModel , collection_name:str ,
+                 page_size:int = 500 , use_server_cursor:bool = False , fetch_concurrency:int = 1 ,
+                 embed_concurrency:int = 4 , insert_concurrency:int = 2 , queue_size:int = 8 ,
+                 on_inserted = None , only_unindexed:bool = True):
+        self.nlp_controller = nlp_controller
+        self.chunk_model = chunk_model
+        self.collection_name = collection_name
+        self.page_size = page_size
+        self.use_server_cursor = use_server_cursor
+        self.fetch_concurrency = max(fetch_concurrency , 1)
+        self.embed_concurrency = max(embed_concurrency , 1)
+        self.insert_concurrency = max(insert_concurrency , 1)
+        self.queue_size = queue_size
+        # called with the number of chunks of every inserted batch (progress bar)
+        self.on_inserted = on_inserted
+        # incremental push : only the chunks without chunk_indexed_at , they are marked once inserted
+        self.only_unindexed = only_unindexed
+
+    async def put(self , queue:asyncio.Queue , queue_name:str , item):
+        await queue.put(item)
+        INDEXING_QUEUE_DEPTH.labels(queue=queue_name).set(queue.qsize())
+
+    async def get(self , queue:asyncio.Queue , queue_name:str):
+        item = await queue.get()
+        INDEXING_QUEUE_DEPTH.labels(queue=queue_name).set(queue.qsize())
+        return item
+
+    def split_id_range(self , min_chunk_id:int , max_chunk_id:int):
+        # every fetch worker scans its own (after_chunk_id , max_chunk_id] slice with keyset pages
+        span = max_chunk_id - min_chunk_id + 1
+        step = -(-span // self.fetch_concurrency)
+        bounds = []
+        after_chunk_id = min_chunk_id - 1
+        while after_chunk_id < max_chunk_id:
+            upper_chunk_id = min(after_chunk_id + step , max_chunk_id)
+            bounds.append((after_chunk_id , upper_chunk_id))
+            after_chunk_id = upper_chunk_id
+        return bounds
+
+    async def fetch_stage(self , project_id:int , after_chunk_id:int , max_chunk_id:int , embed_queue:asyncio.Queue):
+        start_time = time.perf_counter()
+        async for page_chunks in self.chunk_model.iter_project_chunks(
+            project_id=project_id, page_size=self.page_size, use_server_cursor=self.use_server_cursor,
+            after_chunk_id=after_chunk_id, max_chunk_id=max_chunk_id, only_unindexed=self.only_unindexed
+        ):
+            INDEXING_STAGE_LATENCY.labels(stage="fetch").observe(time.perf_counter() - start_time)
+            INDEXING_STAGE_CHUNKS.labels(stage="fetch").inc(len(page_chunks))
+            batch = {
+                "texts": [chunk.chunk_text for chunk in page_chunks],
+                "metadata": [chunk.chunk_metadata for chunk in page_chunks],
+                "chunks_ids": [chunk.chunk_id for chunk in page_chunks],
+            }
+            await self.put(embed_queue , "embed" , batch)
+            start_time = time.perf_counter()
+
+    async def embed_stage(self , embed_queue:asyncio.Queue , insert_queue:asyncio.Queue):
+        while True:
+            batch = await self.get(embed_queue , "embed")
+            if batch is None:
+                return
+
+            start_time = time.perf_counter()
+            vectors = await self.nlp_controller.embed_documents(texts=batch["texts"])
+            if not vectors or len(vectors) != len(batch["texts"]):
+                raise ValueError(f"Embedding failed for {len(batch['texts'])} chunks")
+            INDEXING_STAGE_LATENCY.labels(stage="embed").observe(time.perf_counter() - start_time)
+            INDEXING_STAGE_CHUNKS.labels(stage="embed").inc(len(vectors))
+
+            batch["vectors"] = vectors
+            await self.put(insert_queue , "insert" , batch)
+
+    async def insert_stage(self , insert_queue:asyncio.Queue):
+        inserted_count = 0
+        while True:
+            batch = await self.get(insert_queue , "insert")
+            if batch is None:
+                return inserted_count
+
+            start_time = time.perf_counter()
+            is_inserted = await self.nlp_controller.vectordb_client.upsert_many(
+                collection_name=self.collection_name,
+                texts=batch["texts"],
+                metadata=batch["metadata"],
+                vectors=batch["vectors"],
+                record_ids=batch["chunks_ids"],
+                batch_size=len(batch["texts"])
+            )
+            if is_inserted is False:
+                raise ValueError(f"Inserting {len(batch['texts'])} chunks into {self.collection_name} failed")
+            if self.only_unindexed:
+                _ = await self.chunk_model.mark_chunks_indexed(chunks_ids=batch["chunks_ids"])
+            INDEXING_STAGE_LATENCY.labels(stage="insert").observe(time.perf_counter() - start_time)
+            INDEXING_STAGE_CHUNKS.labels(stage="insert").inc(len(batch["texts"]))
+
+            inserted_count += len(batch["texts"])
+            if self.on_inserted is not None:
+                self.on_inserted(len(batch["texts"]))
+
+    async def close_queue_after(self , tasks:list , queue:asyncio.Queue , queue_name:str , consumers_count:int):
+        # one end marker per consumer once every producer of the queue is done
+        await asyncio.gather(*tasks)
+        for _ in range(consumers_count):
+            await self.put(queue , queue_name , None)
+
+    async def run(self , project_id:int):
+        min_chunk_id , max_chunk_id = await self.chunk_model.get_project_chunk_id_range(
+            project_id=project_id, only_unindexed=self.only_unindexed
+        )
+        if min_chunk_id is None:
+            return 0
+
+        embed_queue = asyncio.Queue(maxsize=self.queue_size)
+        insert_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        fetchers = [
+            asyncio.create_task(self.fetch_stage(
+                project_id=project_id, after_chunk_id=after_chunk_id, max_chunk_id=upper_chunk_id, embed_queue=embed_queue
+            ))
+            for after_chunk_id , upper_chunk_id in self.split_id_range(min_chunk_id , max_chunk_id)
+        ]
+        embedders = [
+            asyncio.create_task(self.embed_stage(embed_queue=embed_queue, insert_queue=insert_queue))
+            for _ in range(self.embed_concurrency)
+        ]
+        inserters = [
+            asyncio.create_task(self.insert_stage(insert_queue=insert_queue))
+            for _ in range(self.insert_concurrency)
+        ]
+        closers = [
+            asyncio.create_task(self.close_queue_after(fetchers , embed_queue , "embed" , self.embed_concurrency)),
+            asyncio.create_task(self.close_queue_after(embedders , insert_queue , "insert" , self.insert_concurrency)),
+        ]
+
+        all_tasks = fetchers + embedders + inserters + closers
+        try:
+            # the first failure in any stage stops the whole pipeline
+            await asyncio.gather(*all_tasks)
+        except BaseException:
+            for task in all_tasks:
+                task.cancel()
+            await asyncio.gather(*all_tasks, return_exceptions=True)
+            raise
+        finally:
+            INDEXING_QUEUE_DEPTH.labels(queue="embed").set(0)
+            INDEXING_QUEUE_DEPTH.labels(queue="insert").set(0)
+
+        inserted_count = sum(task.result() for task in inserters)
+        logger.info(f"Indexed {inserted_count} chunks into {self.collection_name}")
+        return inserted_count
@@ -0,0 +1,118 @@
+from controllers.ProcessController import load_pdf_pages , load_text_block , hash_file
+from models import ProcessingEnum
+from Utils.metrics import FILE_PARSE_LATENCY
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger('uvicorn.error')
+
+# runs inside the pool process , returns the result with the time spent on it
+def timed_call(func , *args):
+    start_time = time.perf_counter()
+    result = func(*args)
+    return result , time.perf_counter() - start_time
+
+class ParsePool:
+    """
+    Process pool for the blocking document parsing (PyMuPDF / text decoding),
+    so a big PDF never stalls the event loop of the uvicorn worker.
+    """
+    def __init__(self , max_workers:int = 2 , max_in_flight:int = 4 , max_files_per_worker:int = 50 ,
+                 pdf_pages_per_batch:int = 8 , text_block_size:int = 512000):
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.max_files_per_worker = max_files_per_worker
+        self.pdf_pages_per_batch = pdf_pages_per_batch
+        self.text_block_size = text_block_size
+
+        self.executor = None
+        self.semaphore = None
+        # files parsed since the executor was created , and the tasks running on it right now
+        self.parsed_files = 0
+        self.running_tasks = 0
+        self.idle = None
+
+    def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self.semaphore = asyncio.Semaphore(self.max_in_flight)
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.parsed_files = 0
+        self.running_tasks = 0
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def recycle(self):
+        # replace the executor with a fresh one , the old processes finish
+        # their current files and exit , which releases whatever a parser leaked
+        old_executor = self.executor
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self.parsed_files = 0
+        old_executor.shutdown(wait=False)
+        logger.info("Parse pool workers recycled")
+
+    async def wait_for_recycle(self):
+        # once enough files went through the pool , the new tasks wait for the running ones
+        # and the executor is replaced while it is idle , no batch of a file in progress is cut off
+        while self.parsed_files >= self.max_workers * self.max_files_per_worker:
+            if self.running_tasks:
+                self.idle.clear()
+                await self.idle.wait()
+                continue
+            self.recycle()
+
+    async def run(self , func , *args):
+        async with self.semaphore:
+            await self.wait_for_recycle()
+            self.running_tasks += 1
+
+            executor = self.executor
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(executor, timed_call, func, *args)
+            except BrokenProcessPool:
+                # a parser crashed the process (segfault , OOM kill ...) , start a new pool for the next files
+                if self.executor is executor:
+                    self.recycle()
+                raise
+            finally:
+                self.running_tasks -= 1
+                if not self.running_tasks:
+                    self.idle.set()
+
+    async def iter_file_pages(self , file_path:str):
+        # pages are parsed one bounded batch at a time , so memory does not grow with the document size
+        file_ext = os.path.splitext(file_path)[-1]
+        if file_ext == ProcessingEnum.PDF.value:
+            load_batch , batch_size = load_pdf_pages , self.pdf_pages_per_batch
+        elif file_ext == ProcessingEnum.TEXT.value:
+            load_batch , batch_size = load_text_block , self.text_block_size
+        else:
+            raise ValueError(f"Unsupported file type: {file_ext}")
+
+        cursor = 0
+        parse_time = 0
+        try:
+            while cursor is not None:
+                (pages , cursor) , batch_time = await self.run(load_batch, file_path, cursor, batch_size)
+                parse_time += batch_time
+                for page in pages:
+                    yield page
+        finally:
+            # the recycling counts files , however many page batches each one took
+            self.parsed_files += 1
+
+        FILE_PARSE_LATENCY.labels(file_type=file_ext.lstrip(".")).observe(parse_time)
+        logger.info(f"Parsed {os.path.basename(file_path)} in {parse_time:.2f}s")
+
+    async def hash_file(self , file_path:str):
+        # sha256 of the file currently on disk , read in blocks inside the pool
+        file_hash , _ = await self.run(hash_file, file_path, self.text_block_size)
+        return file_hash
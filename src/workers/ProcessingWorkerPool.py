@@ -0,0 +1,379 @@
+from controllers import ProcessController , NLPController
+from models.ProcessingJobModel import ProcessingJobModel , JobLockLostError
+from models.AssetModel import AssetModel
+from models.ChunkModel import ChunkModel
+from models.db_schemes import ProcessingJob , ProcessingJobFile , Asset
+from models.enums.ProcessingJobEnum import ProcessingJobStatusEnum , ProcessingJobFileStatusEnum
+from splitters.SplitterEnums import SplitterEnums
+import asyncio
+import logging
+import os
+import socket
+
+logger = logging.getLogger('uvicorn.error')
+
+class ProcessingWorkerPool:
+    """
+    Background workers that consume the processing_jobs queue.
+    Every uvicorn process runs its own pool , the jobs table (FOR UPDATE SKIP LOCKED)
+    makes sure each job is handled by a single worker at a time.
+    """
+    def __init__(self , app , workers_count:int = 2 , files_concurrency:int = 4 ,
+                 poll_interval:float = 2.0 , stale_timeout:int = 600 , max_attempts:int = 3 ,
+                 chunks_batch_size:int = 200 , build_index_after_ingest:bool = True):
+        self.app = app
+        self.workers_count = workers_count
+        self.files_concurrency = files_concurrency
+        self.poll_interval = poll_interval
+        self.stale_timeout = stale_timeout
+        self.max_attempts = max_attempts
+        self.chunks_batch_size = chunks_batch_size
+        # fused ingest jobs start the vector index build when they are done , as /nlp/index/push does
+        self.build_index_after_ingest = build_index_after_ingest
+
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.tasks = []
+        self.stop_event = None
+
+    async def start(self):
+        self.stop_event = asyncio.Event()
+        for worker_index in range(self.workers_count):
+            worker_id = f"{self.worker_prefix}:{worker_index}"
+            self.tasks.append(asyncio.create_task(self.run_worker(worker_id=worker_id)))
+        logger.info(f"Started {self.workers_count} processing workers")
+
+    async def stop(self):
+        if self.stop_event is None:
+            return
+        self.stop_event.set()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def wait_for_next_poll(self):
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run_worker(self , worker_id:str):
+        job_model = await ProcessingJobModel.create_instance(db_client=self.app.db_client)
+
+        while not self.stop_event.is_set():
+            try:
+                job = await job_model.claim_next_job(worker_id=worker_id, stale_timeout=self.stale_timeout)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} could not claim a job: {e}")
+                job = None
+
+            if job is None:
+                await self.wait_for_next_poll()
+                continue
+
+            await self.run_job(job=job, worker_id=worker_id, job_model=job_model)
+
+    async def send_heartbeats(self , job_id:int , worker_id:str , job_model:ProcessingJobModel , job_task:asyncio.Task):
+        # returns (after cancelling the job) when another worker took the job over
+        interval = max(self.stale_timeout / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                is_job_held = await job_model.touch_job(job_id=job_id, worker_id=worker_id)
+            except Exception as e:
+                logger.error(f"Heartbeat failed for job {job_id}: {e}")
+                continue
+            if not is_job_held:
+                logger.error(f"Job {job_id} was taken over by another worker , worker {worker_id} stops it")
+                job_task.cancel()
+                return
+
+    async def run_job(self , job:ProcessingJob , worker_id:str , job_model:ProcessingJobModel):
+        if job.job_attempts > self.max_attempts:
+            logger.error(f"Job {job.job_id} exceeded {self.max_attempts} attempts")
+            await job_model.finish_job(
+                job_id=job.job_id,
+                worker_id=worker_id,
+                job_status=ProcessingJobStatusEnum.FAILED.value,
+                job_error=f"Job exceeded the maximum number of attempts ({self.max_attempts})"
+            )
+            return
+
+        logger.info(f"Worker {worker_id} started job {job.job_id} (attempt {job.job_attempts})")
+        job_task = asyncio.create_task(self.process_job(job=job, worker_id=worker_id, job_model=job_model))
+        heartbeat = asyncio.create_task(self.send_heartbeats(
+            job_id=job.job_id, worker_id=worker_id, job_model=job_model, job_task=job_task
+        ))
+        try:
+            job_status = await job_task
+            is_finished = await job_model.finish_job(job_id=job.job_id, worker_id=worker_id, job_status=job_status)
+            if is_finished:
+                logger.info(f"Job {job.job_id} finished with status {job_status}")
+            else:
+                logger.error(f"Job {job.job_id} was taken over by another worker , its status is left to it")
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled():
+                # the heartbeat found the job held by another worker and stopped it , nothing to write
+                return
+            # shutting down : put the job back in the queue for the next worker
+            await job_model.release_job(job_id=job.job_id, worker_id=worker_id)
+            raise
+        except JobLockLostError as e:
+            logger.error(f"Job {job.job_id} stopped: {e}")
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}")
+            await job_model.finish_job(
+                job_id=job.job_id,
+                worker_id=worker_id,
+                job_status=ProcessingJobStatusEnum.FAILED.value,
+                job_error=str(e)
+            )
+        finally:
+            heartbeat.cancel()
+            job_task.cancel()
+
+    async def process_job(self , job:ProcessingJob , worker_id:str , job_model:ProcessingJobModel):
+        params = job.job_params or {}
+        project_id = job.job_project_id
+
+        job_files = await job_model.get_job_files(job_id=job.job_id, only_unfinished=True)
+
+        asset_model = await AssetModel.create_instance(db_client=self.app.db_client)
+        chunk_model = await ChunkModel.create_instance(db_client=self.app.db_client)
+        assets = await asset_model.get_assets_by_ids(asset_ids=[job_file.job_file_asset_id for job_file in job_files])
+        assets = {asset.asset_id: asset for asset in assets}
+
+        nlp_controller = NLPController(
+            generation_client=self.app.generation_client,
+            embedding_client=self.app.embedding_client,
+            vectordb_client=self.app.vectordb_client,
+            template_parser=self.app.template_parser,
+            embedding_cache=self.app.embedding_cache,
+            embedding_batcher=self.app.embedding_batcher
+        )
+        collection_name = nlp_controller.create_collection_name(project_id=project_id)
+
+        # do_reset : the project starts again from nothing. only before the first file of the job started ,
+        # a job taken over from a dead worker keeps the files it already completed
+        if params.get("do_reset") == 1:
+            all_job_files = await job_model.get_job_files(job_id=job.job_id)
+            if all(job_file.started_at is None for job_file in all_job_files):
+                _ = await self.app.vectordb_client.delete_collection(collection_name=collection_name)
+                _ = await chunk_model.delete_chunks_by_project_id(project_id=project_id)
+                # the assets left out of this job have no chunks anymore , they must not be skipped next time
+                _ = await asset_model.reset_project_processing_configs(asset_project_id=project_id)
+
+        # fused ingest : every flushed batch of chunks is embedded and pushed to the vector db right away
+        if params.get("index_chunks") == 1:
+            is_collection_created = await self.app.vectordb_client.create_collection(
+                collection_name=collection_name,
+                embedding_size=self.app.embedding_client.embedding_size,
+                do_reset=0
+            )
+            # the older chunks of the project are not in the new collection , the next push picks them up
+            if is_collection_created:
+                _ = await chunk_model.reset_project_chunks_indexed(project_id=project_id)
+
+        process_controller = ProcessController(project_id=project_id)
+        semaphore = asyncio.Semaphore(self.files_concurrency)
+
+        async def process_with_limit(job_file:ProcessingJobFile):
+            async with semaphore:
+                await self.process_job_file(
+                    job_file=job_file,
+                    worker_id=worker_id,
+                    asset=assets.get(job_file.job_file_asset_id),
+                    project_id=project_id,
+                    collection_name=collection_name,
+                    params=params,
+                    process_controller=process_controller,
+                    nlp_controller=nlp_controller,
+                    job_model=job_model,
+                    asset_model=asset_model,
+                    chunk_model=chunk_model
+                )
+
+        file_tasks = [asyncio.create_task(process_with_limit(job_file)) for job_file in job_files]
+        try:
+            await asyncio.gather(*file_tasks)
+        except BaseException:
+            # the job lost its lock (or is stopped) : no file of it keeps writing
+            for file_task in file_tasks:
+                file_task.cancel()
+            raise
+
+        progress = await job_model.get_job_progress(job_id=job.job_id)
+        if params.get("index_chunks") == 1 and progress["inserted_chunks"] and self.build_index_after_ingest:
+            # in the background , a build already running (in any worker) is left alone
+            _ = await self.app.vectordb_client.start_vector_index_build(collection_name=collection_name)
+        if progress[ProcessingJobFileStatusEnum.FAILED.value] == 0:
+            return ProcessingJobStatusEnum.COMPLETED.value
+        if progress[ProcessingJobFileStatusEnum.COMPLETED.value] + progress[ProcessingJobFileStatusEnum.SKIPPED.value] == 0:
+            return ProcessingJobStatusEnum.FAILED.value
+        return ProcessingJobStatusEnum.COMPLETED_WITH_ERRORS.value
+
+    def should_process_asset(self , asset:Asset , processing_config:dict , params:dict):
+        previous_config = (asset.asset_config or {}).get("processing")
+        if previous_config is None or params.get("do_reset") == 1 or params.get("force_reprocess") == 1:
+            return True
+        # same content and same chunking parameters : the current chunks are still valid
+        if previous_config == processing_config:
+            return False
+        # modified assets are replaced unless the caller asked to keep them
+        return params.get("reprocess_modified" , 1) == 1
+
+    async def remove_asset_chunks(self , asset_id:int , job_file_id:int , collection_name:str , chunk_model:ChunkModel):
+        # drop the chunks of the previous processing (every chunk of the asset not written by this job file)
+        # with their vectors , the vectors of the other assets of the project stay in place.
+        # the jobs of a project run one at a time (claim_next_job) , no other job writes chunks of this asset
+        while True:
+            chunks_ids = await chunk_model.get_asset_chunks_ids(
+                asset_id=asset_id, exclude_job_file_id=job_file_id, limit=self.chunks_batch_size
+            )
+            if not len(chunks_ids):
+                break
+            # vectors first , the pgvector tables reference the chunks
+            _ = await self.app.vectordb_client.delete_by_record_ids(collection_name=collection_name, record_ids=chunks_ids)
+            _ = await chunk_model.delete_chunks_by_ids(chunks_ids=chunks_ids)
+
+    async def discard_file_attempt(self , job_file:ProcessingJobFile , collection_name:str ,
+                                   index_chunks:bool , job_model:ProcessingJobModel , chunk_model:ChunkModel):
+        # drop the chunks a file attempt already flushed , and their vectors when the job indexes its chunks
+        if index_chunks:
+            while True:
+                chunks_ids = await chunk_model.get_job_file_chunks_ids(
+                    job_file_id=job_file.job_file_id, limit=self.chunks_batch_size
+                )
+                if not len(chunks_ids):
+                    break
+                _ = await self.app.vectordb_client.delete_by_record_ids(collection_name=collection_name, record_ids=chunks_ids)
+                _ = await chunk_model.delete_chunks_by_ids(chunks_ids=chunks_ids)
+
+        return await job_model.discard_job_file_chunks(job_file_id=job_file.job_file_id)
+
+    async def flush_chunks(self , job_file:ProcessingJobFile , worker_id:str , file_chunks_records:list , collection_name:str ,
+                           index_chunks:bool , job_model:ProcessingJobModel , nlp_controller:NLPController ,
+                           chunk_model:ChunkModel):
+        if not index_chunks:
+            return await job_model.add_job_file_chunks(
+                job_file_id=job_file.job_file_id, worker_id=worker_id, chunks=file_chunks_records
+            )
+
+        # the rows are committed first (the pgvector tables reference them) , then the same batch
+        # is embedded and inserted with the returned ids , the text is never read back from the database
+        chunks_ids = await job_model.add_job_file_chunks(
+            job_file_id=job_file.job_file_id, worker_id=worker_id, chunks=file_chunks_records, return_ids=True
+        )
+        is_inserted = await nlp_controller.index_texts_into_vector_db(
+            collection_name=collection_name,
+            texts=[record["chunk_text"] for record in file_chunks_records],
+            metadata=[record["chunk_metadata"] for record in file_chunks_records],
+            chunks_ids=chunks_ids
+        )
+        if not is_inserted:
+            raise ValueError(f"Error while indexing the chunks of asset {job_file.job_file_asset_id}")
+        _ = await chunk_model.mark_chunks_indexed(chunks_ids=chunks_ids)
+        return len(chunks_ids)
+
+    async def process_job_file(self , job_file:ProcessingJobFile , worker_id:str , asset:Asset , project_id:int , collection_name:str ,
+                               params:dict , process_controller:ProcessController , nlp_controller:NLPController ,
+                               job_model:ProcessingJobModel , asset_model:AssetModel , chunk_model:ChunkModel):
+        asset_id = job_file.job_file_asset_id
+        file_id = asset.asset_name if asset is not None else None
+        index_chunks = params.get("index_chunks") == 1
+
+        # a previous attempt of this file died halfway , drop what it already flushed
+        if job_file.started_at is not None:
+            _ = await self.discard_file_attempt(
+                job_file=job_file, collection_name=collection_name,
+                index_chunks=index_chunks, job_model=job_model, chunk_model=chunk_model
+            )
+
+        # every failure is recorded on the file row , one broken file never stops the rest of the job
+        _ = await job_model.start_job_file(job_file_id=job_file.job_file_id)
+        try:
+            if asset is None:
+                raise ValueError(f"Asset {asset_id} was not found")
+
+            file_path = process_controller.get_file_path(file_id=file_id)
+            if not os.path.exists(file_path):
+                raise ValueError(f"File {file_id} was not found on disk")
+
+            # hash what is on disk now , the file may have been replaced since the upload
+            content_hash = await self.app.parse_pool.hash_file(file_path=file_path)
+            if content_hash != asset.asset_hash:
+                await asset_model.update_asset_hash(asset_id=asset_id, asset_hash=content_hash)
+
+            splitter_mode = params.get("splitter_mode") or SplitterEnums.SEPARATOR.value
+            processing_config = process_controller.get_processing_config(
+                content_hash=content_hash,
+                chunk_size=params.get("chunk_size"),
+                chunk_overlap=params.get("overlap_size"),
+                splitter_mode=splitter_mode
+            )
+            if not self.should_process_asset(asset=asset, processing_config=processing_config, params=params):
+                _ = await job_model.skip_job_file(job_file_id=job_file.job_file_id, worker_id=worker_id)
+                return
+
+            # the chunks of the previous processing stay until the new ones are written
+
+            # pages are parsed lazily in the parse pool processes and chunked as they arrive ,
+            # chunks are flushed to the database in bounded batches
+            file_pages = self.app.parse_pool.iter_file_pages(file_path=file_path)
+            file_chunks = process_controller.process_file_content(
+                file_pages=file_pages,
+                file_id=file_id,
+                chunk_size=params.get("chunk_size"),
+                chunk_overlap=params.get("overlap_size"),
+                splitter_mode=splitter_mode
+            )
+
+            chunk_order = 0
+            inserted_chunks = 0
+            file_chunks_records = []
+            async for chunk in file_chunks:
+                chunk_order += 1
+                # plain rows , they go to the database through COPY without ORM objects
+                file_chunks_records.append({
+                    "chunk_text": chunk.page_content,
+                    "chunk_metadata": chunk.metadata,
+                    "chunk_order": chunk_order,
+                    "chunk_project_id": project_id,
+                    "chunk_asset_id": asset_id,
+                })
+                if len(file_chunks_records) >= self.chunks_batch_size:
+                    inserted_chunks += await self.flush_chunks(
+                        job_file=job_file, worker_id=worker_id, file_chunks_records=file_chunks_records, collection_name=collection_name,
+                        index_chunks=index_chunks, job_model=job_model, nlp_controller=nlp_controller,
+                        chunk_model=chunk_model
+                    )
+                    file_chunks_records = []
+
+            if len(file_chunks_records):
+                inserted_chunks += await self.flush_chunks(
+                    job_file=job_file, worker_id=worker_id, file_chunks_records=file_chunks_records, collection_name=collection_name,
+                    index_chunks=index_chunks, job_model=job_model, nlp_controller=nlp_controller,
+                    chunk_model=chunk_model
+                )
+
+            if inserted_chunks == 0:
+                raise ValueError(f"No chunks were produced for file {file_id}")
+
+            await self.remove_asset_chunks(
+                asset_id=asset_id, job_file_id=job_file.job_file_id,
+                collection_name=collection_name, chunk_model=chunk_model
+            )
+            _ = await asset_model.set_asset_processing_config(asset_id=asset_id, processing_config=processing_config)
+
+            _ = await job_model.complete_job_file(job_file_id=job_file.job_file_id, worker_id=worker_id)
+
+        except (asyncio.CancelledError , JobLockLostError):
+            # the new holder of the job discards what this attempt wrote
+            raise
+        except Exception as e:
+            logger.error(f"Error while processing file {file_id}: {e}")
+            _ = await self.discard_file_attempt(
+                job_file=job_file, collection_name=collection_name,
+                index_chunks=index_chunks, job_model=job_model, chunk_model=chunk_model
+            )
+            _ = await job_model.fail_job_file(job_file_id=job_file.job_file_id, worker_id=worker_id, job_file_error=str(e))
@@ -0,0 +1,3 @@
+from .ProcessingWorkerPool import ProcessingWorkerPool
+from .ParsePool import ParsePool
+from .IndexingPipeline import IndexingPipeline